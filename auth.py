@@ -1,26 +1,79 @@
+import hashlib
+import hmac
+import secrets
 from datetime import datetime, timedelta
 from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from passlib.context import CryptContext
-from sqlalchemy.orm import Session
-from database import get_db, User
-from schemas import TokenData
+from sqlalchemy import event, inspect, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, object_session
+from cache import TTLCache
+from config import settings
+from hashing import HasherSaturated, password_hasher
+from metrics import auth_duration, password_duration, timed
+from database import get_db, get_async_db, RefreshToken, User
+from schemas import Principal, TokenData, User as UserSchema
 
 # Configuration
 SECRET_KEY = "votre-clé-secrète-très-sécurisée"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+# Session glissante : chaque renouvellement repousse l'expiration
+REFRESH_TOKEN_EXPIRE_DAYS = 14
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
+# Utilisateurs authentifiés récemment, indexés par le `sub` (email) du token.
+# On garde un instantané Pydantic plutôt que l'objet ORM, lié à sa session.
+user_cache = TTLCache(
+    maxsize=settings.user_cache_max_size,
+    ttl=settings.user_cache_ttl_seconds,
+)
+
+# État de révocation (token_version, is_active) par id d'utilisateur : seule
+# information à relire pour valider un token qui porte déjà `uid` et `ver`.
+token_state_cache = TTLCache(
+    maxsize=settings.user_cache_max_size,
+    ttl=settings.user_cache_ttl_seconds,
+)
+
+def _too_many_requests(error: HasherSaturated):
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Too many password operations in progress, retry later",
+        headers={"Retry-After": str(error.retry_after)},
+    )
+
+# bcrypt s'exécute dans le pool de processus de hashing.py (429 si saturé)
+@timed(password_duration.labels("verify"), phase="password")
 def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+    try:
+        return password_hasher.verify(plain_password, hashed_password)
+    except HasherSaturated as e:
+        raise _too_many_requests(e)
 
+@timed(password_duration.labels("hash"), phase="password")
 def get_password_hash(password):
-    return pwd_context.hash(password)
+    try:
+        return password_hasher.hash(password)
+    except HasherSaturated as e:
+        raise _too_many_requests(e)
+
+@timed(password_duration.labels("verify"), phase="password")
+async def verify_password_async(plain_password, hashed_password):
+    try:
+        return await password_hasher.verify_async(plain_password, hashed_password)
+    except HasherSaturated as e:
+        raise _too_many_requests(e)
+
+@timed(password_duration.labels("hash"), phase="password")
+async def get_password_hash_async(password):
+    try:
+        return await password_hasher.hash_async(password)
+    except HasherSaturated as e:
+        raise _too_many_requests(e)
 
 def get_user_by_email(db: Session, email: str):
     return db.query(User).filter(User.email == email).first()
@@ -41,21 +94,198 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    credentials_exception = HTTPException(
+def token_claims(user: User) -> dict:
+    """Claims d'un access token : email, id et version des tokens de l'utilisateur."""
+    return {"sub": user.email, "uid": user.id, "ver": user.token_version}
+
+def _credentials_exception():
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+def decode_token_data(token: str) -> TokenData:
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
         if email is None:
-            raise credentials_exception
-        token_data = TokenData(email=email)
+            raise _credentials_exception()
+        return TokenData(email=email, user_id=payload.get("uid"), version=payload.get("ver"))
     except JWTError:
-        raise credentials_exception
+        raise _credentials_exception()
+
+def _cache_user(user: User) -> UserSchema:
+    current_user = UserSchema.model_validate(user)
+    user_cache.set(user.email, current_user)
+    return current_user
+
+# Dépendance volontairement synchrone : la requête SQL bloquante s'exécute
+# dans le threadpool de FastAPI et non sur la boucle d'événements.
+@timed(auth_duration.labels("get_current_user"), phase="auth")
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    token_data = decode_token_data(token)
+    cached_user = user_cache.get(token_data.email)
+    if cached_user is not None:
+        return cached_user
     user = get_user_by_email(db, email=token_data.email)
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
+    return _cache_user(user)
+
+def token_state_query(user_id: int):
+    return select(User.token_version, User.is_active).where(User.id == user_id)
+
+def load_token_state(db: Session, user_id: int):
+    state = token_state_cache.get(user_id)
+    if state is None:
+        row = db.execute(token_state_query(user_id)).first()
+        if row is not None:
+            state = tuple(row)
+            token_state_cache.set(user_id, state)
+    return state
+
+def _check_token_state(token_data: TokenData, state) -> Principal:
+    # Un token est révoqué dès que la version de l'utilisateur a changé
+    if state is None or not state[1] or state[0] != token_data.version:
+        raise _credentials_exception()
+    return Principal(id=token_data.user_id, email=token_data.email)
+
+@timed(auth_duration.labels("get_current_principal"), phase="auth")
+def get_current_principal(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    """
+    Identité de l'appelant pour les routes qui n'ont besoin que de son id.
+
+    La signature du token suffit à établir l'identité ; seul l'état de
+    révocation est vérifié, depuis le cache (une requête par clé primaire
+    à l'expiration). Les tokens émis sans `uid` passent par get_current_user.
+    """
+    token_data = decode_token_data(token)
+    if token_data.user_id is None:
+        user = get_current_user(token, db)
+        return Principal(id=user.id, email=user.email)
+    return _check_token_state(token_data, load_token_state(db, token_data.user_id))
+
+def revoke_tokens(db: Session, user: User) -> None:
+    """Invalide tous les tokens (access et refresh) déjà émis pour `user` (sans commit)."""
+    user.token_version = User.token_version + 1
+    db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.user_id == user.id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.utcnow())
+    )
+
+# Refresh tokens : une empreinte HMAC et une recherche indexée remplacent
+# la vérification bcrypt du mot de passe à chaque renouvellement.
+def hash_refresh_token(token: str) -> str:
+    return hmac.new(SECRET_KEY.encode(), token.encode(), hashlib.sha256).hexdigest()
+
+def issue_refresh_token(db, user_id: int, family_id: Optional[str] = None) -> str:
+    """Crée un refresh token (sans commit) ; utilisable en session sync ou async."""
+    token = secrets.token_urlsafe(32)
+    db.add(RefreshToken(
+        token_hash=hash_refresh_token(token),
+        family_id=family_id or secrets.token_hex(16),
+        user_id=user_id,
+        expires_at=datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+    ))
+    return token
+
+def rotate_refresh_token(db: Session, token: str):
+    """
+    Échange un refresh token contre un nouveau de la même famille.
+
+    Renvoie (utilisateur, nouveau token), ou lève 401 si le token est
+    inconnu, expiré ou révoqué. Un token déjà échangé signale un vol
+    probable : toute sa famille est alors révoquée.
+    """
+    now = datetime.utcnow()
+    stored = db.scalar(
+        select(RefreshToken).where(RefreshToken.token_hash == hash_refresh_token(token))
+    )
+    if stored is None or stored.revoked_at is not None or stored.expires_at <= now:
+        raise _credentials_exception()
+    # UPDATE conditionnel : deux échanges concurrents ne peuvent pas réussir tous les deux
+    claimed = db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.id == stored.id, RefreshToken.used_at.is_(None))
+        .values(used_at=now)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not claimed:
+        db.execute(
+            update(RefreshToken)
+            .where(RefreshToken.family_id == stored.family_id, RefreshToken.revoked_at.is_(None))
+            .values(revoked_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        raise _credentials_exception()
+    user = db.get(User, stored.user_id)
+    if user is None or not user.is_active:
+        db.rollback()
+        raise _credentials_exception()
+    new_token = issue_refresh_token(db, user.id, stored.family_id)
+    return user, new_token
+
+# Équivalents asynchrones pour les routes du mode ASYNC_DATABASE
+async def get_user_by_email_async(db: AsyncSession, email: str):
+    return await db.scalar(select(User).where(User.email == email))
+
+async def authenticate_user_async(db: AsyncSession, email: str, password: str):
+    user = await get_user_by_email_async(db, email)
+    if not user or not await verify_password_async(password, user.hashed_password):
+        return False
     return user
+
+@timed(auth_duration.labels("get_current_user"), phase="auth")
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)
+):
+    token_data = decode_token_data(token)
+    cached_user = user_cache.get(token_data.email)
+    if cached_user is not None:
+        return cached_user
+    user = await get_user_by_email_async(db, email=token_data.email)
+    if user is None:
+        raise _credentials_exception()
+    return _cache_user(user)
+
+async def load_token_state_async(db: AsyncSession, user_id: int):
+    state = token_state_cache.get(user_id)
+    if state is None:
+        row = (await db.execute(token_state_query(user_id))).first()
+        if row is not None:
+            state = tuple(row)
+            token_state_cache.set(user_id, state)
+    return state
+
+@timed(auth_duration.labels("get_current_principal"), phase="auth")
+async def get_current_principal_async(
+    token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)
+):
+    token_data = decode_token_data(token)
+    if token_data.user_id is None:
+        user = await get_current_user_async(token, db)
+        return Principal(id=user.id, email=user.email)
+    return _check_token_state(token_data, await load_token_state_async(db, token_data.user_id))
+
+# Invalidation du cache : toute modification ou suppression d'un utilisateur
+# est notée pendant le flush puis appliquée une fois la transaction validée.
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _mark_user_changed(mapper, connection, target):
+    session = object_session(target)
+    if session is None:
+        return
+    emails = session.info.setdefault("changed_user_emails", set())
+    emails.add(target.email)
+    emails.update(inspect(target).attrs.email.history.deleted)
+    session.info.setdefault("changed_user_ids", set()).add(target.id)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session):
+    for email in session.info.pop("changed_user_emails", ()):
+        user_cache.invalidate(email)
+    for user_id in session.info.pop("changed_user_ids", ()):
+        token_state_cache.invalidate(user_id)
@@ -0,0 +1,36 @@
+"""
+Compare la création de tâches une par une (POST /tasks/) et en masse
+(POST /tasks/bulk).
+
+    python -m benchmarks.bulk_create --count 5000
+"""
+import argparse
+
+from benchmarks.common import login, make_client, timer
+from routers.tasks import BULK_MAX_ITEMS
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=2000)
+    parser.add_argument("--database-url", default="sqlite://")
+    args = parser.parse_args()
+
+    client, _ = make_client(args.database_url)
+    login(client)
+    payload = [{"title": f"Tâche {i}", "description": "benchmark"} for i in range(args.count)]
+    results = {}
+
+    with timer(results, "per_item"):
+        for task in payload:
+            client.post("/tasks/", json=task).raise_for_status()
+
+    with timer(results, "bulk"):
+        for start in range(0, args.count, BULK_MAX_ITEMS):
+            client.post("/tasks/bulk", json=payload[start:start + BULK_MAX_ITEMS]).raise_for_status()
+
+    for name, seconds in results.items():
+        print(f"{name:>9}: {seconds:8.3f}s  {args.count / seconds:10.0f} tâches/s")
+    print(f"  speedup: {results['per_item'] / results['bulk']:8.1f}x")
+
+if __name__ == "__main__":
+    main()
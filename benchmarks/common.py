@@ -0,0 +1,48 @@
+"""Outils partagés par les scripts de benchmark (python -m benchmarks.<nom>)."""
+import time
+from contextlib import contextmanager
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from main import app
+from database import Base, get_db
+
+BENCH_USER = {"email": "bench@example.com", "password": "benchpassword"}
+
+def make_client(database_url: str = "sqlite://"):
+    """Client de test branché sur une base dédiée (en mémoire par défaut)."""
+    connect_args = {"check_same_thread": False} if database_url.startswith("sqlite") else {}
+    engine = create_engine(
+        database_url,
+        connect_args=connect_args,
+        poolclass=StaticPool if database_url == "sqlite://" else None,
+    )
+    Base.metadata.create_all(bind=engine)
+    BenchSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def override_get_db():
+        db = BenchSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    return TestClient(app), engine
+
+def login(client: TestClient, user: dict = BENCH_USER) -> TestClient:
+    client.post("/users/register", json=user)
+    response = client.post(
+        "/users/token", data={"username": user["email"], "password": user["password"]}
+    )
+    client.headers.update({"Authorization": f"Bearer {response.json()['access_token']}"})
+    return client
+
+@contextmanager
+def timer(results: dict, name: str):
+    start = time.perf_counter()
+    yield
+    results[name] = time.perf_counter() - start
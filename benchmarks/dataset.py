@@ -0,0 +1,250 @@
+"""
+Jeu de données synthétique des benchmarks, écrit directement dans les
+tables (sans l'API, sans bcrypt par utilisateur) et reproductible : même
+graine, mêmes lignes.
+
+Les lignes sont générées par colonne, titres et descriptions tirés de
+réserves précalculées (loi de Zipf sur benchmarks.search.VOCABULARY) ;
+le chargement passe par executemany du pilote (COPY sous PostgreSQL +
+psycopg2), index secondaires et recherche plein texte reconstruits en
+une passe à la fin. Outil en ligne de commande : benchmarks/seed.py.
+"""
+import io
+import itertools
+import random
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select, text
+
+from database import (
+    Task, User, create_search_index, drop_search_index, init_db, rebuild_task_counters
+)
+from hashing import hash_password
+from benchmarks.search import CUM_WEIGHTS, VOCABULARY
+
+BENCH_PASSWORD = "benchpassword"
+STATUSES = ("todo", "in_progress", "done")
+STATUS_WEIGHTS = (5, 2, 3)
+CREATED_DISTRIBUTIONS = ("uniform", "recent")
+
+# Titres et descriptions distincts : assez pour couvrir la traîne du vocabulaire
+TEXT_POOL_SIZE = 1 << 15
+
+COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+def user_email(user_id: int) -> str:
+    return f"user{user_id}@bench.local"
+
+def insert_rows(connection, table, columns: dict) -> None:
+    """
+    Insère des lignes données par colonne ({nom: liste de valeurs}) :
+    executemany du pilote, sans la couche ORM ni Core par ligne.
+    """
+    dialect = connection.dialect
+    if dialect.driver == "psycopg2":
+        return copy_rows(connection, table, columns)
+
+    compiled = table.insert().compile(dialect=dialect, column_keys=list(columns))
+    converted, processed = {}, {}
+    for key, values in columns.items():
+        column_type = table.c[key].type.dialect_impl(dialect)
+        processor = column_type.bind_processor(dialect)
+        if processor:
+            # Même liste pour plusieurs colonnes (created_at / updated_at) : convertie une fois
+            cache_key = (id(values), type(column_type))
+            if cache_key not in processed:
+                processed[cache_key] = list(map(processor, values))
+            values = processed[cache_key]
+        converted[key] = values
+    if compiled.positional:
+        parameters = list(zip(*(converted[key] for key in compiled.positiontup)))
+    else:
+        parameters = [dict(zip(converted, row)) for row in zip(*converted.values())]
+    connection.exec_driver_sql(str(compiled), parameters)
+
+def copy_value(value) -> str:
+    if value is None:
+        return "\\N"
+    if isinstance(value, str):
+        return value.translate(COPY_ESCAPES)
+    return str(value)
+
+def copy_rows(connection, table, columns: dict) -> None:
+    """COPY ... FROM STDIN (format texte), dans la transaction de `connection`."""
+    buffer = io.StringIO()
+    for row in zip(*(map(copy_value, values) for values in columns.values())):
+        buffer.write("\t".join(row))
+        buffer.write("\n")
+    buffer.seek(0)
+    cursor = connection.connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN", buffer)
+    finally:
+        cursor.close()
+
+def disable_search_index(connection) -> None:
+    # Les triggers FTS5 (SQLite) et l'index GIN (PostgreSQL) sont reconstruits
+    # en une passe après le chargement, bien plus vite que ligne par ligne
+    if connection.dialect.name == "sqlite":
+        for trigger in ("tasks_fts_insert", "tasks_fts_delete", "tasks_fts_update"):
+            connection.execute(text(f"DROP TRIGGER IF EXISTS {trigger}"))
+        drop_search_index(connection)
+    elif connection.dialect.name == "postgresql":
+        connection.execute(text("DROP INDEX IF EXISTS ix_tasks_search"))
+
+def text_pool(rng: random.Random, words: int, size: int = TEXT_POOL_SIZE) -> list:
+    return [
+        " ".join(rng.choices(VOCABULARY, cum_weights=CUM_WEIGHTS, k=words)) for _ in range(size)
+    ]
+
+def owner_batches(rng: random.Random, users: int, tasks: int, batch: int, skew: float,
+                  heavy_owners: int, heavy_tasks: int):
+    """
+    Propriétaires des tâches, par lot. Les utilisateurs 1..heavy_owners
+    reçoivent heavy_tasks tâches chacun ; le reste est réparti entre les
+    autres selon une loi de Zipf d'exposant `skew` (0 : uniforme).
+    """
+    for owner_id in range(1, heavy_owners + 1):
+        for first in range(0, heavy_tasks, batch):
+            yield [owner_id] * min(batch, heavy_tasks - first)
+
+    owners = range(heavy_owners + 1, users + 1)
+    remaining = tasks - heavy_owners * heavy_tasks
+    cum_weights = None
+    if skew:
+        cum_weights = list(itertools.accumulate(
+            1 / rank ** skew for rank in range(1, len(owners) + 1)
+        ))
+    for first in range(0, remaining, batch):
+        yield rng.choices(owners, cum_weights=cum_weights, k=min(batch, remaining - first))
+
+def created_dates(rng: random.Random, count: int, now: datetime, days: int, distribution: str) -> list:
+    """Dates de création sur les `days` derniers jours ("recent" : décroissance exponentielle)."""
+    span = days * 24 * 3600
+    if distribution == "recent":
+        # Moyenne span / 6 : environ la moitié des tâches dans le dernier huitième
+        rate = 6 / span
+        offsets = [int(rng.expovariate(rate)) % span for _ in range(count)]
+    else:
+        offsets = [int(rng.random() * span) for _ in range(count)]
+    return [now - timedelta(seconds=offset) for offset in offsets]
+
+def bulk_load(connection):
+    """
+    Réglages de chargement massif sur cette connexion : SQLite sans fsync
+    ni attente d'écriture, grand cache pour la reconstruction des index.
+    Renvoie une fonction qui rétablit les réglages précédents.
+    """
+    if connection.dialect.name != "sqlite":
+        return lambda: None
+    pragmas = {"synchronous": "OFF", "cache_size": -256 * 1024, "temp_store": "MEMORY"}
+    previous = {
+        name: connection.exec_driver_sql(f"PRAGMA {name}").scalar() for name in pragmas
+    }
+    for name, value in pragmas.items():
+        connection.exec_driver_sql(f"PRAGMA {name}={value}")
+    connection.commit()
+
+    def restore():
+        for name, value in previous.items():
+            connection.exec_driver_sql(f"PRAGMA {name}={value}")
+        connection.commit()
+    return restore
+
+def seed(engine, users: int, tasks: int, seed: int = 42, batch: int = 50000,
+         statuses: dict = None, days: int = 365, created: str = "uniform",
+         skew: float = 0.0, heavy_owners: int = 0, heavy_tasks: int = 0) -> None:
+    """
+    Crée `users` utilisateurs (ids 1..users) et `tasks` tâches réparties
+    entre eux. `statuses` : poids relatif de chaque statut ; `days`,
+    `created` : étendue et loi des dates de création ; `skew`,
+    `heavy_owners`, `heavy_tasks` : répartition des tâches (voir owner_batches).
+    """
+    if heavy_owners > users or heavy_owners * heavy_tasks > tasks:
+        raise ValueError("heavy_owners doit tenir dans users, heavy_owners * heavy_tasks dans tasks")
+    if heavy_owners == users and heavy_owners * heavy_tasks < tasks:
+        raise ValueError("aucun utilisateur pour les tâches hors heavy_owners")
+    if created not in CREATED_DISTRIBUTIONS:
+        raise ValueError(f"created : {', '.join(CREATED_DISTRIBUTIONS)}")
+    statuses = statuses or dict(zip(STATUSES, STATUS_WEIGHTS))
+    status_names = list(statuses)
+    status_weights = list(itertools.accumulate(statuses.values()))
+
+    rng = random.Random(seed)
+    init_db(engine)
+    start = time.perf_counter()
+    # Un seul hachage bcrypt, partagé par tous les comptes
+    hashed_password = hash_password(BENCH_PASSWORD)
+    now = datetime.utcnow().replace(microsecond=0)
+    titles = text_pool(rng, 3)
+    descriptions = text_pool(rng, 12)
+    indexes = list(Task.__table__.indexes)
+
+    with engine.connect() as connection:
+        restore = bulk_load(connection)
+        try:
+            with connection.begin():
+                disable_search_index(connection)
+                # Index secondaires reconstruits après le chargement (tri unique)
+                for index in indexes:
+                    index.drop(connection, checkfirst=True)
+                for first in range(1, users + 1, batch):
+                    count = min(batch, users + 1 - first)
+                    ids = range(first, first + count)
+                    insert_rows(connection, User.__table__, {
+                        "id": list(ids),
+                        "email": [user_email(user_id) for user_id in ids],
+                        "hashed_password": [hashed_password] * count,
+                        "is_active": [True] * count,
+                        "token_version": [0] * count,
+                        "tasks_version": [0] * count,
+                    })
+                if connection.dialect.name == "postgresql":
+                    # Ids explicites : la séquence doit repartir après le dernier
+                    connection.execute(text(
+                        "SELECT setval(pg_get_serial_sequence('users', 'id'), (SELECT max(id) FROM users))"
+                    ))
+
+            loaded = 0
+            for owners in owner_batches(rng, users, tasks, batch, skew, heavy_owners, heavy_tasks):
+                count = len(owners)
+                created_at = created_dates(rng, count, now, days, created)
+                # Une transaction par lot : la progression survit à une interruption
+                with connection.begin():
+                    insert_rows(connection, Task.__table__, {
+                        "title": rng.choices(titles, k=count),
+                        "description": rng.choices(descriptions, k=count),
+                        "status": rng.choices(status_names, cum_weights=status_weights, k=count),
+                        "created_at": created_at,
+                        "updated_at": created_at,
+                        "owner_id": owners,
+                        "version": [0] * count,
+                    })
+                loaded += count
+                if tasks >= 10 * batch:
+                    elapsed = time.perf_counter() - start
+                    print(f"seed: {loaded}/{tasks} tâches ({loaded / elapsed:,.0f}/s)", end="\r", flush=True)
+            if tasks >= 10 * batch:
+                print()
+        finally:
+            with connection.begin():
+                for index in indexes:
+                    index.create(connection, checkfirst=True)
+                create_search_index(connection)
+                rebuild_task_counters(connection)
+            restore()
+
+    elapsed = time.perf_counter() - start
+    print(f"seed: {users} utilisateurs, {tasks} tâches en {elapsed:.1f}s "
+          f"({(users + tasks) / elapsed * 60:,.0f} lignes/min)")
+
+def dataset_size(engine) -> tuple:
+    """(utilisateurs amorcés, tâches) d'une base existante ; (0, 0) si vide."""
+    init_db(engine)
+    with engine.connect() as connection:
+        users = connection.execute(
+            select(func.max(User.id)).where(User.email.like("user%@bench.local"))
+        ).scalar()
+        tasks = connection.execute(select(func.count()).select_from(Task.__table__)).scalar()
+    return users or 0, tasks
@@ -0,0 +1,78 @@
+"""
+Mémoire et débit de l'export en flux (export.export_tasks) sur une base
+SQLite synthétique.
+
+    python -m benchmarks.export --tasks 1000000 --format ndjson
+"""
+import argparse
+import os
+import resource
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+from sqlalchemy import create_engine
+
+from database import init_db
+from export import export_tasks
+
+def seed(engine, tasks: int, batch: int = 50000):
+    now = datetime.utcnow().isoformat(sep=" ")
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.execute(
+            "INSERT INTO users (id, email, hashed_password, is_active) "
+            "VALUES (1, 'export@bench.local', 'x', 1)"
+        )
+        for start in range(0, tasks, batch):
+            cursor.executemany(
+                "INSERT INTO tasks (title, description, status, created_at, owner_id, version) "
+                "VALUES (?, ?, 'todo', ?, 1, 0)",
+                [
+                    (f"Tâche {i}", f"Description de la tâche {i}", now)
+                    for i in range(start, min(start + batch, tasks))
+                ],
+            )
+        connection.commit()
+    finally:
+        connection.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=1_000_000)
+    parser.add_argument("--format", choices=("ndjson", "csv"), default="ndjson")
+    parser.add_argument(
+        "--database", help="fichier SQLite à réutiliser (amorcé s'il n'existe pas)"
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = args.database or os.path.join(directory, "export.db")
+        exists = os.path.exists(path)
+        engine = create_engine(f"sqlite:///{path}")
+        if not exists:
+            init_db(engine)
+            start = time.perf_counter()
+            seed(engine, args.tasks)
+            print(f"seed: {args.tasks} tâches en {time.perf_counter() - start:.1f}s")
+
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        tracemalloc.start()
+        start = time.perf_counter()
+        size = sum(len(chunk) for chunk in export_tasks(engine, 1, args.format))
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        # ru_maxrss est en Kio sous Linux
+        rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+        print(f"export {args.format}: {size / 1e6:.0f} Mo en {elapsed:.1f}s "
+              f"({args.tasks / elapsed:,.0f} lignes/s)")
+        print(f"pic Python (tracemalloc): {peak / 1024:.0f} Kio")
+        print(f"pic RSS: {rss_before / 1024:.0f} -> {rss_after / 1024:.0f} Mio")
+        engine.dispose()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""
+Garde-fou de performance : mesure des micro-benchmarks (routes et couche
+données), intervalles de confiance à 95 %, et comparaison avec la
+référence versionnée benchmarks/baseline.json. Code de sortie 1 si une
+mesure régresse au-delà du seuil.
+
+    python -m benchmarks.gate                     # compare à la référence
+    python -m benchmarks.gate --threshold 0.2     # tolère +20 %
+    python -m benchmarks.gate --update            # réécrit la référence
+
+Une mesure régresse si sa moyenne dépasse celle de la référence de plus
+du seuil ET si les deux intervalles de confiance sont disjoints : un
+écart dans le bruit de mesure ne fait pas échouer. Les temps dépendant
+de la machine, la référence se régénère (--update) sur la machine qui
+exécute le garde-fou.
+"""
+import argparse
+import gc
+import json
+import math
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+
+from benchmarks.common import make_client
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# Quantiles 0,975 de la loi de Student, par degré de liberté
+T_975 = {
+    1: 12.706, 2: 4.303, 3: 3.182, 4: 2.776, 5: 2.571, 6: 2.447, 7: 2.365, 8: 2.306,
+    9: 2.262, 10: 2.228, 11: 2.201, 12: 2.179, 13: 2.160, 14: 2.145, 15: 2.131,
+    16: 2.120, 17: 2.110, 18: 2.101, 19: 2.093, 20: 2.086, 25: 2.060, 30: 2.042,
+}
+
+def t_critical(df: int) -> float:
+    if df in T_975:
+        return T_975[df]
+    smaller = [known for known in T_975 if known < df]
+    return T_975[max(smaller)] if df <= 30 else 1.96
+
+def summarize(samples: list) -> dict:
+    """Moyenne et intervalle de confiance à 95 % de la moyenne (en secondes par opération)."""
+    mean = statistics.fmean(samples)
+    half_width = t_critical(len(samples) - 1) * statistics.stdev(samples) / math.sqrt(len(samples))
+    return {
+        "mean": mean,
+        "ci_low": mean - half_width,
+        "ci_high": mean + half_width,
+        "median": statistics.median(samples),
+        "samples": len(samples),
+    }
+
+def calibrate(operation, min_sample_seconds: float) -> int:
+    """Appels par échantillon pour qu'il dure au moins `min_sample_seconds` (comme timeit.autorange)."""
+    operation()
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            operation()
+        if time.perf_counter() - start >= min_sample_seconds:
+            return number
+        number *= 2
+
+def measure(operations: dict, repeats: int, min_sample_seconds: float) -> dict:
+    """
+    Temps par opération, `repeats` échantillons par mesure. Les mesures
+    sont entrelacées (un échantillon de chacune par tour) : une dérive de
+    la machine pendant l'exécution touche toutes les mesures, pas la
+    dernière seule. Ramasse-miettes suspendu pendant un échantillon.
+    """
+    numbers = {name: calibrate(operation, min_sample_seconds) for name, operation in operations.items()}
+    samples = {name: [] for name in operations}
+    for _ in range(repeats):
+        for name, operation in operations.items():
+            number = numbers[name]
+            gc.collect()
+            gc.disable()
+            try:
+                start = time.perf_counter()
+                for _ in range(number):
+                    operation()
+                elapsed = time.perf_counter() - start
+            finally:
+                gc.enable()
+            samples[name].append(elapsed / number)
+    return {
+        name: {**summarize(samples[name]), "number": numbers[name]} for name in operations
+    }
+
+def benchmarks() -> dict:
+    """Opérations mesurées, sur une base SQLite en mémoire amorcée."""
+    from sqlalchemy.orm import Session, selectinload
+    from auth import create_access_token, get_current_principal, token_claims, token_state_cache
+    from benchmarks.dataset import seed
+    from database import Task, User
+    from routers.tasks import TaskListParams, build_task_list_query, owned_task_query
+    import schemas
+
+    client, engine = make_client()
+    seed(engine, users=10, tasks=10000)
+    db = Session(engine)
+    user = db.get(User, 1)
+    token = create_access_token(data=token_claims(user))
+    client.headers.update({"Authorization": f"Bearer {token}"})
+    task = db.scalar(owned_task_query(db.scalars(
+        build_task_list_query(user.id, TaskListParams(limit=1))
+    ).first().id, user.id).options(selectinload(Task.owner)))
+    list_params = TaskListParams(include_owner=False)
+
+    def task_insert():
+        db.add(Task(title="Tâche", description="benchmark", owner_id=user.id))
+        db.commit()
+
+    def list_page():
+        db.scalars(build_task_list_query(user.id, list_params)).all()
+
+    def auth_dependency():
+        get_current_principal(token, db)
+
+    def auth_dependency_cold():
+        token_state_cache.clear()
+        get_current_principal(token, db)
+
+    def token_creation():
+        create_access_token(data=token_claims(user))
+
+    def serialize_task():
+        schemas.Task.model_validate(task).model_dump_json()
+
+    def route_create_task():
+        client.post("/tasks/", json={"title": "Tâche", "description": "benchmark"})
+
+    def route_read_tasks():
+        client.get("/tasks/")
+
+    return {
+        "task_insert": task_insert,
+        "list_page": list_page,
+        "auth_dependency": auth_dependency,
+        "auth_dependency_cold": auth_dependency_cold,
+        "token_creation": token_creation,
+        "serialize_task": serialize_task,
+        "route_create_task": route_create_task,
+        "route_read_tasks": route_read_tasks,
+    }
+
+def compare(baseline: dict, current: dict, threshold: float) -> list:
+    """Une ligne par mesure : (nom, référence, actuelle, variation, verdict)."""
+    rows = []
+    for name in sorted(set(baseline) | set(current)):
+        before, after = baseline.get(name), current.get(name)
+        if before is None or after is None:
+            rows.append((name, before, after, None, "new" if before is None else "missing"))
+            continue
+        change = after["mean"] / before["mean"] - 1
+        if change > threshold and after["ci_low"] > before["ci_high"]:
+            verdict = "REGRESSION"
+        elif change < -threshold and after["ci_high"] < before["ci_low"]:
+            verdict = "faster"
+        else:
+            verdict = "ok"
+        rows.append((name, before, after, change, verdict))
+    return rows
+
+def format_stat(stat) -> str:
+    if stat is None:
+        return "-"
+    half_width = (stat["ci_high"] - stat["ci_low"]) / 2
+    return f"{stat['mean'] * 1e6:10.1f} ± {half_width * 1e6:7.1f} µs"
+
+def report(rows: list, threshold: float) -> str:
+    lines = [
+        f"{'mesure':<22} {'référence':>24} {'actuelle':>24} {'écart':>8}  verdict",
+    ]
+    for name, before, after, change, verdict in rows:
+        change_text = "-" if change is None else f"{change:+.1%}"
+        lines.append(
+            f"{name:<22} {format_stat(before):>24} {format_stat(after):>24} {change_text:>8}  {verdict}"
+        )
+    regressions = [row[0] for row in rows if row[4] == "REGRESSION"]
+    if regressions:
+        lines.append(
+            f"\n{len(regressions)} régression(s) au-delà de {threshold:.0%} : {', '.join(regressions)}"
+        )
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--threshold", type=float, default=0.10, help="régression tolérée (0.10 = +10 %%)")
+    parser.add_argument("--repeats", type=int, default=10, help="échantillons par mesure")
+    parser.add_argument("--min-sample", type=float, default=0.05, help="durée minimale d'un échantillon (s)")
+    parser.add_argument("--only", nargs="*", help="noms des mesures à exécuter")
+    parser.add_argument("--update", action="store_true", help="écrit les mesures comme nouvelle référence")
+    parser.add_argument("--output", help="fichier JSON des mesures actuelles")
+    args = parser.parse_args()
+    if args.repeats < 2:
+        parser.error("--repeats doit valoir au moins 2")
+
+    operations = benchmarks()
+    if args.only:
+        operations = {name: operations[name] for name in args.only if name in operations}
+    current = measure(operations, args.repeats, args.min_sample)
+    for name, stat in current.items():
+        print(f"{name:>22}: {format_stat(stat)}", file=sys.stderr)
+
+    results = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeats": args.repeats,
+        },
+        "metrics": current,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.update:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+        print(f"référence écrite : {args.baseline}")
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)["metrics"]
+    if args.only:
+        baseline = {name: stat for name, stat in baseline.items() if name in args.only}
+    rows = compare(baseline, current, args.threshold)
+    print(report(rows, args.threshold))
+    if any(verdict == "REGRESSION" for *_, verdict in rows):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Latence de la recherche plein texte (search.search_tasks) sur un corpus
+synthétique SQLite.
+
+    python -m benchmarks.search --tasks 1000000 --owners 100
+"""
+import argparse
+import itertools
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from database import init_db
+from search import search_tasks
+
+# Vocabulaire de tâches courant complété de mots synthétiques, tirés selon
+# une loi de Zipf : quelques mots très fréquents, une longue traîne de rares.
+COMMON_WORDS = (
+    "rapport réunion client facture budget projet sprint revue code test "
+    "déploiement serveur base données migration sécurité audit design "
+    "maquette contrat livraison support incident analyse planning formation "
+    "recrutement marketing campagne newsletter produit roadmap objectif"
+).split()
+VOCABULARY = COMMON_WORDS + [f"mot{i}" for i in range(20000)]
+CUM_WEIGHTS = list(itertools.accumulate(1 / rank for rank in range(1, len(VOCABULARY) + 1)))
+
+QUERIES = [
+    "rapport", "rap", "facture client", "déploiement serveur", "migr",
+    "audit sécurité", "mot150", "mot42 mot7",
+]
+
+def seed(engine, tasks: int, owners: int, batch: int = 50000):
+    rng = random.Random(42)
+    now = datetime.utcnow().isoformat(sep=" ")
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.executemany(
+            "INSERT INTO users (id, email, hashed_password, is_active) VALUES (?, ?, 'x', 1)",
+            [(i, f"owner{i}@bench.local") for i in range(1, owners + 1)],
+        )
+        for start in range(0, tasks, batch):
+            rows = [
+                (
+                    " ".join(rng.choices(VOCABULARY, cum_weights=CUM_WEIGHTS, k=3)),
+                    " ".join(rng.choices(VOCABULARY, cum_weights=CUM_WEIGHTS, k=12)),
+                    rng.choice(("todo", "in_progress", "done")),
+                    now,
+                    rng.randint(1, owners),
+                )
+                for _ in range(min(batch, tasks - start))
+            ]
+            cursor.executemany(
+                "INSERT INTO tasks (title, description, status, created_at, owner_id) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+        connection.commit()
+    finally:
+        connection.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=1_000_000)
+    parser.add_argument("--owners", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument(
+        "--database", help="fichier SQLite à réutiliser (amorcé s'il n'existe pas)"
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = args.database or os.path.join(directory, "search.db")
+        exists = os.path.exists(path)
+        engine = create_engine(f"sqlite:///{path}")
+        if not exists:
+            init_db(engine)
+            start = time.perf_counter()
+            seed(engine, args.tasks, args.owners)
+            print(f"seed: {args.tasks} tâches en {time.perf_counter() - start:.1f}s")
+
+        rng = random.Random(7)
+        with Session(engine) as db:
+            for q in QUERIES:
+                latencies = []
+                for _ in range(args.repeat):
+                    owner_id = rng.randint(1, args.owners)
+                    begin = time.perf_counter()
+                    search_tasks(db, owner_id, q)
+                    latencies.append((time.perf_counter() - begin) * 1000)
+                latencies.sort()
+                p95 = latencies[int(len(latencies) * 0.95) - 1]
+                print(f"{q!r:>24}: p50 {statistics.median(latencies):7.1f} ms  p95 {p95:7.1f} ms")
+        engine.dispose()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Amorçage d'une base avec des données synthétiques volumineuses, écrites
+directement dans les tables (benchmarks.dataset.seed) : utilisateurs
+user<id>@bench.local (mot de passe "benchpassword"), tâches réparties
+selon les lois demandées.
+
+    python -m benchmarks.seed --database bench.db --users 10000 --tasks 5000000
+    python -m benchmarks.seed --database-url postgresql://... \\
+        --users 1000 --tasks 3000000 --heavy-owners 1 --heavy-tasks 1000000 \\
+        --skew 1.1 --statuses todo=6,in_progress=1,done=3 --created recent
+
+La base doit être vide : les ids des utilisateurs sont fixés (1..users).
+"""
+import argparse
+import os
+import sys
+
+from sqlalchemy import create_engine, func, select
+
+from benchmarks.dataset import CREATED_DISTRIBUTIONS, STATUS_WEIGHTS, STATUSES, seed
+from database import User, init_db
+
+def parse_statuses(value: str) -> dict:
+    """"todo=5,in_progress=2,done=3" -> {"todo": 5.0, ...}"""
+    statuses = {}
+    try:
+        for entry in value.split(","):
+            name, weight = entry.split("=")
+            statuses[name.strip()] = float(weight)
+    except ValueError:
+        raise argparse.ArgumentTypeError("format attendu : statut=poids,statut=poids")
+    if not statuses or any(weight < 0 for weight in statuses.values()) or not sum(statuses.values()):
+        raise argparse.ArgumentTypeError("poids positifs, de somme non nulle")
+    return statuses
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--database", help="fichier SQLite (créé s'il n'existe pas)")
+    target.add_argument("--database-url", help="URL SQLAlchemy (PostgreSQL...)")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--tasks", type=int, default=1_000_000)
+    parser.add_argument(
+        "--statuses", type=parse_statuses,
+        default=",".join(f"{name}={weight}" for name, weight in zip(STATUSES, STATUS_WEIGHTS)),
+        help="poids relatifs des statuts (défaut : %(default)s)",
+    )
+    parser.add_argument("--days", type=int, default=365, help="étendue des dates de création")
+    parser.add_argument("--created", choices=CREATED_DISTRIBUTIONS, default="uniform",
+                        help="loi des dates de création (recent : décroissance exponentielle)")
+    parser.add_argument("--skew", type=float, default=0.0,
+                        help="exposant de Zipf de la répartition des tâches (0 : uniforme)")
+    parser.add_argument("--heavy-owners", type=int, default=0,
+                        help="utilisateurs 1..N recevant chacun --heavy-tasks tâches")
+    parser.add_argument("--heavy-tasks", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch", type=int, default=50000, help="lignes par transaction")
+    args = parser.parse_args()
+
+    database_url = args.database_url or f"sqlite:///{os.path.abspath(args.database)}"
+    engine = create_engine(database_url)
+    init_db(engine)
+    with engine.connect() as connection:
+        if connection.execute(select(func.count()).select_from(User.__table__)).scalar():
+            sys.exit("la base contient déjà des utilisateurs : amorcer une base vide")
+    try:
+        seed(
+            engine, args.users, args.tasks, seed=args.seed, batch=args.batch,
+            statuses=args.statuses, days=args.days, created=args.created,
+            skew=args.skew, heavy_owners=args.heavy_owners, heavy_tasks=args.heavy_tasks,
+        )
+    except ValueError as exc:
+        parser.error(str(exc))
+    finally:
+        engine.dispose()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,379 @@
+"""
+Latence (p50/p95/p99) et débit de chaque route de routers/tasks.py et
+routers/users.py sur un jeu de données synthétique, en écrivant les
+résultats en JSON pour comparer deux commits.
+
+L'application est appelée soit dans le processus (transport ASGI de
+httpx), soit à travers un vrai serveur uvicorn lancé pour l'occasion.
+
+    python -m benchmarks.suite --users 10000 --tasks 10000000 --database bench.db
+    python -m benchmarks.suite --target uvicorn --concurrency 16 --output results.json
+
+La base est amorcée au premier lancement puis réutilisée. Les variables
+d'environnement de l'application (SQLITE_PROFILE, PASSWORD_HASH_WORKERS...)
+s'appliquent aux deux cibles.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class Scenario:
+    """Une route à mesurer : `build(ctx, i)` renvoie les arguments de la i-ème requête."""
+
+    def __init__(self, name, method, route, build, prepare=None, expected=(200,), streaming=False):
+        self.name = name
+        self.method = method
+        self.route = route
+        self.build = build
+        # Préparation hors mesure (lignes à supprimer, refresh tokens...),
+        # appelée avec le nombre total de requêtes
+        self.prepare = prepare
+        self.expected = expected
+        # Flux sans fin (SSE) : mesuré jusqu'au premier octet reçu
+        self.streaming = streaming
+
+class Context:
+    """Sessions (utilisateurs amorcés, tokens frappés localement) et données préparées."""
+
+    def __init__(self, engine, users: int, sessions: int, run_id: str):
+        from sqlalchemy import select
+        from sqlalchemy.orm import Session
+        from database import Task
+
+        self.engine = engine
+        self.run_id = run_id
+        self.rng = random.Random(7)
+        # Utilisateurs dédiés à la révocation, pris à la fin de la plage
+        self.session_ids = self.rng.sample(range(1, users // 2 + 1), min(sessions, users // 2))
+        self.spare_ids = list(range(users, users // 2, -1))
+        self.prepared = {}
+        with Session(engine) as db:
+            self.task_ids = {
+                user_id: db.scalars(
+                    select(Task.id).where(Task.owner_id == user_id).order_by(Task.id).limit(200)
+                ).all()
+                for user_id in self.session_ids
+            }
+        self.headers = {user_id: self.auth_headers(user_id) for user_id in self.session_ids}
+
+    def auth_headers(self, user_id: int) -> dict:
+        # Même SECRET_KEY que l'application : pas de bcrypt pour ouvrir une session
+        from sqlalchemy.orm import Session
+        from auth import create_access_token, token_claims
+        from database import User
+
+        with Session(self.engine) as db:
+            token = create_access_token(data=token_claims(db.get(User, user_id)))
+        return {"Authorization": f"Bearer {token}"}
+
+    def session(self, i: int):
+        user_id = self.session_ids[i % len(self.session_ids)]
+        return user_id, self.headers[user_id]
+
+    def task_id(self, i: int) -> int:
+        user_id, _ = self.session(i)
+        ids = self.task_ids[user_id]
+        return ids[(i // len(self.session_ids)) % len(ids)]
+
+    def create_tasks(self, owner_id: int, count: int) -> list:
+        """Tâches à supprimer, créées hors mesure et rendues par id."""
+        from sqlalchemy import insert
+        from sqlalchemy.orm import Session
+        from database import Task
+
+        with Session(self.engine) as db:
+            ids = db.scalars(
+                insert(Task).returning(Task.id),
+                [{"title": f"À supprimer {k}", "owner_id": owner_id} for k in range(count)],
+            ).all()
+            db.commit()
+        return sorted(ids)
+
+def prepare_deletions(per_request: int):
+    def prepare(ctx: Context, total: int):
+        ids = {}
+        for i in range(total):
+            user_id, _ = ctx.session(i)
+            ids.setdefault(user_id, []).append(i)
+        ctx.prepared["delete"] = {}
+        for user_id, requests in ids.items():
+            created = iter(ctx.create_tasks(user_id, len(requests) * per_request))
+            for i in requests:
+                ctx.prepared["delete"][i] = [next(created) for _ in range(per_request)]
+    return prepare
+
+def prepare_refresh_tokens(ctx: Context, total: int):
+    from sqlalchemy.orm import Session
+    from auth import issue_refresh_token
+
+    with Session(ctx.engine) as db:
+        ctx.prepared["refresh"] = [
+            issue_refresh_token(db, ctx.session(i)[0]) for i in range(total)
+        ]
+        db.commit()
+
+def prepare_revocations(ctx: Context, total: int):
+    if total > len(ctx.spare_ids):
+        raise SystemExit("revoke : pas assez d'utilisateurs libres, augmenter --users")
+    ctx.prepared["revoke"] = [ctx.auth_headers(ctx.spare_ids[i]) for i in range(total)]
+
+def import_body(i: int) -> bytes:
+    return "".join(
+        json.dumps({"title": f"Import {i}-{k}", "description": "benchmark"}) + "\n"
+        for k in range(100)
+    ).encode()
+
+def scenarios() -> list:
+    from benchmarks.dataset import BENCH_PASSWORD, user_email
+
+    return [
+        # routers/users.py
+        Scenario("register", "POST", "/users/register", lambda ctx, i: {
+            "json": {"email": f"new-{ctx.run_id}-{i}@bench.local", "password": BENCH_PASSWORD}
+        }),
+        Scenario("login", "POST", "/users/token", lambda ctx, i: {
+            "data": {"username": user_email(ctx.session(i)[0]), "password": BENCH_PASSWORD}
+        }),
+        Scenario("refresh", "POST", "/users/token/refresh", lambda ctx, i: {
+            "json": {"refresh_token": ctx.prepared["refresh"][i]}
+        }, prepare=prepare_refresh_tokens),
+        Scenario("revoke", "POST", "/users/token/revoke", lambda ctx, i: {
+            "headers": ctx.prepared["revoke"][i]
+        }, prepare=prepare_revocations),
+        # routers/tasks.py
+        Scenario("create", "POST", "/tasks/", lambda ctx, i: {
+            "headers": ctx.session(i)[1], "json": {"title": f"Tâche {i}", "description": "benchmark"}
+        }),
+        Scenario("bulk_create", "POST", "/tasks/bulk", lambda ctx, i: {
+            "headers": ctx.session(i)[1],
+            "json": [{"title": f"Lot {i}-{k}"} for k in range(100)],
+        }),
+        Scenario("bulk_update", "PATCH", "/tasks/bulk", lambda ctx, i: {
+            "headers": ctx.session(i)[1],
+            "json": {"ids": ctx.task_ids[ctx.session(i)[0]][:20], "changes": {"status": "in_progress"}},
+        }),
+        Scenario("bulk_delete", "DELETE", "/tasks/bulk", lambda ctx, i: {
+            "headers": ctx.session(i)[1], "json": {"ids": ctx.prepared["delete"][i]},
+        }, prepare=prepare_deletions(20)),
+        Scenario("list", "GET", "/tasks/", lambda ctx, i: {"headers": ctx.session(i)[1]}),
+        Scenario("list_filtered", "GET", "/tasks/", lambda ctx, i: {
+            "headers": ctx.session(i)[1],
+            "params": {"status": "done", "sort": "created_at", "order": "desc",
+                       "limit": 50, "include_owner": False},
+        }),
+        Scenario("search", "GET", "/tasks/search", lambda ctx, i: {
+            "headers": ctx.session(i)[1], "params": {"q": ("rapport", "client fac", "mot42")[i % 3]},
+        }),
+        Scenario("stats", "GET", "/tasks/stats", lambda ctx, i: {"headers": ctx.session(i)[1]}),
+        Scenario("changes", "GET", "/tasks/changes", lambda ctx, i: {"headers": ctx.session(i)[1]}),
+        Scenario("export", "GET", "/tasks/export", lambda ctx, i: {
+            "headers": ctx.session(i)[1], "params": {"format": ("ndjson", "csv")[i % 2]},
+        }),
+        Scenario("import", "POST", "/tasks/import", lambda ctx, i: {
+            "headers": {**ctx.session(i)[1], "Content-Type": "application/x-ndjson"},
+            "content": import_body(i),
+        }),
+        Scenario("events", "GET", "/tasks/events", lambda ctx, i: {
+            "headers": ctx.session(i)[1],
+        }, streaming=True),
+        Scenario("read", "GET", "/tasks/{task_id}", lambda ctx, i: {
+            "url": f"/tasks/{ctx.task_id(i)}", "headers": ctx.session(i)[1],
+        }),
+        Scenario("update", "PUT", "/tasks/{task_id}", lambda ctx, i: {
+            "url": f"/tasks/{ctx.task_id(i)}", "headers": ctx.session(i)[1],
+            "json": {"title": f"Modifiée {i}"},
+        }),
+        Scenario("delete", "DELETE", "/tasks/{task_id}", lambda ctx, i: {
+            "url": f"/tasks/{ctx.prepared['delete'][i][0]}", "headers": ctx.session(i)[1],
+        }, prepare=prepare_deletions(1)),
+    ]
+
+async def send(client: httpx.AsyncClient, scenario: Scenario, kwargs: dict) -> int:
+    url = kwargs.pop("url", scenario.route)
+    if scenario.streaming:
+        async with client.stream(scenario.method, url, **kwargs) as response:
+            async for _ in response.aiter_raw():
+                break
+            return response.status_code
+    response = await client.request(scenario.method, url, **kwargs)
+    return response.status_code
+
+async def run_scenario(client, scenario: Scenario, ctx: Context, requests: int, warmup: int,
+                       concurrency: int) -> dict:
+    if scenario.prepare is not None:
+        scenario.prepare(ctx, warmup + requests)
+    for i in range(warmup):
+        await send(client, scenario, scenario.build(ctx, i))
+
+    latencies, errors = [], 0
+    counter = itertools.count(warmup)
+
+    async def worker():
+        nonlocal errors
+        while (i := next(counter)) < warmup + requests:
+            kwargs = scenario.build(ctx, i)
+            start = time.perf_counter()
+            status = await send(client, scenario, kwargs)
+            latencies.append(time.perf_counter() - start)
+            if status not in scenario.expected:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    percentiles = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "method": scenario.method,
+        "route": scenario.route,
+        "requests": len(latencies),
+        "errors": errors,
+        "p50_ms": round(percentiles[49] * 1000, 3),
+        "p95_ms": round(percentiles[94] * 1000, 3),
+        "p99_ms": round(percentiles[98] * 1000, 3),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3),
+        "max_ms": round(max(latencies) * 1000, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+    }
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def start_uvicorn(port: int) -> subprocess.Popen:
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1",
+         "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=os.environ.copy(),
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health").status_code == 200:
+                return server
+        except httpx.TransportError:
+            time.sleep(0.2)
+    server.terminate()
+    raise SystemExit("uvicorn n'a pas démarré")
+
+def git_revision() -> dict:
+    def git(*args):
+        return subprocess.run(
+            ["git", *args], cwd=ROOT, capture_output=True, text=True
+        ).stdout.strip()
+    return {"commit": git("rev-parse", "HEAD"), "dirty": bool(git("status", "--porcelain", "-uno"))}
+
+async def run(args, ctx: Context, client: httpx.AsyncClient) -> dict:
+    results = {}
+    for scenario in scenarios():
+        if args.scenarios and scenario.name not in args.scenarios:
+            continue
+        if scenario.streaming and args.target == "asgi":
+            # Le transport ASGI de httpx attend la fin de la réponse
+            print(f"{scenario.name:>14}: ignoré (flux sans fin, --target uvicorn)")
+            continue
+        result = await run_scenario(
+            client, scenario, ctx, args.requests, args.warmup, args.concurrency
+        )
+        results[scenario.name] = result
+        print(f"{scenario.name:>14}: p50 {result['p50_ms']:8.1f} ms  p95 {result['p95_ms']:8.1f} ms  "
+              f"p99 {result['p99_ms']:8.1f} ms  {result['throughput_rps']:8.1f} req/s"
+              + (f"  {result['errors']} erreurs" if result["errors"] else ""))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    # Volumes de l'amorçage (ignorés si la base contient déjà le jeu de données)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--tasks", type=int, default=100_000)
+    parser.add_argument("--database", help="fichier SQLite à réutiliser (amorcé s'il est vide)")
+    parser.add_argument("--database-url", help="autre base (PostgreSQL...), amorcée si vide")
+    parser.add_argument("--target", choices=("asgi", "uvicorn"), default="asgi")
+    parser.add_argument("--requests", type=int, default=200, help="requêtes mesurées par route")
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--sessions", type=int, default=50, help="utilisateurs authentifiés")
+    parser.add_argument("--scenarios", nargs="*", help="noms des routes à mesurer (toutes par défaut)")
+    parser.add_argument("--output", help="fichier JSON des résultats")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        database_url = args.database_url or (
+            f"sqlite:///{os.path.abspath(args.database or os.path.join(directory, 'bench.db'))}"
+        )
+        # Avant tout import de config / database : l'application lit l'URL au chargement
+        os.environ["DATABASE_URL"] = database_url
+        from sqlalchemy import create_engine
+        from benchmarks.dataset import dataset_size, seed
+
+        engine = create_engine(database_url)
+        users, tasks = dataset_size(engine)
+        if not users:
+            seed(engine, args.users, args.tasks)
+            users, tasks = dataset_size(engine)
+        ctx = Context(engine, users, args.sessions, run_id=str(int(time.time())))
+
+        server = None
+        if args.target == "uvicorn":
+            port = free_port()
+            server = start_uvicorn(port)
+            client = httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=60)
+        else:
+            from main import app
+            client = httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60
+            )
+
+        async def run_all():
+            async with client:
+                return await run(args, ctx, client)
+
+        try:
+            results = asyncio.run(run_all())
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+            engine.dispose()
+
+    report = {
+        "meta": {
+            **git_revision(),
+            "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "database": database_url.split(":", 1)[0],
+            "users": users,
+            "tasks": tasks,
+            "target": args.target,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+        },
+        "results": results,
+    }
+    output = args.output or os.path.join(
+        ROOT, "benchmarks", "results", f"{args.target}-{report['meta']['commit'][:10]}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"résultats : {output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Coût CPU du renouvellement des access tokens sur un trafic de sessions :
+chaque session se renouvelle puis fait quelques requêtes de tâches, soit
+par re-connexion avec mot de passe (bcrypt), soit par refresh token.
+
+    python -m benchmarks.token_renewal --sessions 200 --requests 5
+
+Le hachage est exécuté dans ce processus (PASSWORD_HASH_WORKERS=0) pour
+que time.process_time() compte aussi le CPU de bcrypt.
+"""
+import argparse
+import time
+
+from benchmarks.common import BENCH_USER, login, make_client
+from hashing import password_hasher
+
+def run(client, sessions: int, requests: int, renew) -> dict:
+    wall, cpu = time.perf_counter(), time.process_time()
+    for _ in range(sessions):
+        headers = {"Authorization": f"Bearer {renew()}"}
+        for _ in range(requests):
+            client.get("/tasks/", headers=headers).raise_for_status()
+    return {
+        "wall": time.perf_counter() - wall,
+        "cpu": time.process_time() - cpu,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=5, help="requêtes de tâches par renouvellement")
+    parser.add_argument("--database-url", default="sqlite://")
+    args = parser.parse_args()
+
+    password_hasher.max_workers = 0
+    client, _ = make_client(args.database_url)
+    login(client)
+    credentials = {"username": BENCH_USER["email"], "password": BENCH_USER["password"]}
+    refresh_token = client.post("/users/token", data=credentials).json()["refresh_token"]
+
+    def renew_with_password():
+        response = client.post("/users/token", data=credentials)
+        response.raise_for_status()
+        return response.json()["access_token"]
+
+    def renew_with_refresh_token():
+        nonlocal refresh_token
+        response = client.post("/users/token/refresh", json={"refresh_token": refresh_token})
+        response.raise_for_status()
+        tokens = response.json()
+        refresh_token = tokens["refresh_token"]
+        return tokens["access_token"]
+
+    results = {
+        "password": run(client, args.sessions, args.requests, renew_with_password),
+        "refresh": run(client, args.sessions, args.requests, renew_with_refresh_token),
+    }
+    for name, result in results.items():
+        print(
+            f"{name:>9}: cpu {result['cpu']:7.2f}s  wall {result['wall']:7.2f}s  "
+            f"{result['cpu'] / args.sessions * 1000:7.1f} ms CPU/session"
+        )
+    print(f"  CPU ratio: {results['password']['cpu'] / results['refresh']['cpu']:8.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import base64
+import json
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import and_, false, or_, select, true, union_all
+from sqlalchemy.orm import Session
+
+from database import Task, TaskTombstone
+
+def encode_sync_token(version: int, task_id: int) -> str:
+    """Position (version, id de tâche) opaque, à repasser dans `since`."""
+    raw = json.dumps([version, task_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+# Entiers JSON des jetons (bool exclu), bornés aux BIGINT signés : un jeton
+# forgé ne doit jamais atteindre la comparaison SQL
+INT64_MIN, INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+def is_int64(value) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool) and INT64_MIN <= value <= INT64_MAX
+
+def decode_sync_token(token: str) -> Tuple[int, int]:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        version, task_id = json.loads(base64.urlsafe_b64decode(padded))
+        if not (is_int64(version) and is_int64(task_id)):
+            raise TypeError
+        return version, task_id
+    except (ValueError, TypeError, OverflowError):
+        raise HTTPException(status_code=400, detail="Invalid sync token")
+
+def after_position(version_column, id_column, version: int, task_id: int):
+    # La borne `>=` seule est exploitable comme intervalle d'index ; le OR
+    # départage ensuite les lignes de la même version
+    return and_(
+        version_column >= version,
+        or_(version_column > version, and_(version_column == version, id_column > task_id)),
+    )
+
+def build_changes_query(
+    owner_id: int, version: int, task_id: int, limit: int, include_deleted: bool = True
+):
+    """
+    Changements (tâches écrites et tombstones) après la position donnée, dans
+    l'ordre des versions. Chaque branche parcourt un intervalle de l'index
+    (owner_id, version, id) : le coût suit le nombre de changements, pas le
+    nombre total de tâches.
+    """
+    written = select(
+        Task.id.label("task_id"), Task.version.label("version"), false().label("deleted")
+    ).where(
+        Task.owner_id == owner_id,
+        after_position(Task.version, Task.id, version, task_id),
+    )
+    removed = select(
+        TaskTombstone.task_id, TaskTombstone.version, true().label("deleted")
+    ).where(
+        TaskTombstone.owner_id == owner_id,
+        after_position(TaskTombstone.version, TaskTombstone.task_id, version, task_id),
+    )
+    changes = (union_all(written, removed) if include_deleted else written).subquery()
+    return (
+        select(changes.c.task_id, changes.c.version, changes.c.deleted)
+        .order_by(changes.c.version, changes.c.task_id)
+        .limit(limit)
+    )
+
+def read_changes(db: Session, owner_id: int, since: Optional[str], limit: int) -> dict:
+    # Sans jeton : tout l'état actuel (les tâches antérieures ont la version 0),
+    # sans les suppressions passées
+    version, task_id = decode_sync_token(since) if since else (-1, 0)
+    page = db.execute(
+        build_changes_query(owner_id, version, task_id, limit + 1, include_deleted=bool(since))
+    ).all()
+    has_more = len(page) > limit
+    page = page[:limit]
+
+    written_ids = [row.task_id for row in page if not row.deleted]
+    tasks = {
+        task.id: task
+        for task in db.scalars(select(Task).where(Task.id.in_(written_ids)))
+    } if written_ids else {}
+    changed: List[Task] = []
+    deleted: List[int] = []
+    for row in page:
+        if row.deleted:
+            deleted.append(row.task_id)
+        elif row.task_id in tasks:
+            changed.append(tasks[row.task_id])
+
+    if page:
+        version, task_id = page[-1].version, page[-1].task_id
+    return {
+        "changed": changed,
+        "deleted": deleted,
+        "next_since": encode_sync_token(max(version, 0), task_id),
+        "has_more": has_more,
+    }
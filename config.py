@@ -8,16 +8,57 @@ class Settings:
         "sqlite:///./tasks.db"
     )
     
+    # Pool de connexions (ignoré pour SQLite en mémoire)
+    db_pool_size: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    db_max_overflow: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    db_pool_timeout: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    db_pool_recycle: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # -1 pour désactiver
+    db_pool_pre_ping: bool = os.getenv("DB_POOL_PRE_PING", "True").lower() == "true"
+    # Timeout par requête côté PostgreSQL (0 pour désactiver)
+    db_statement_timeout_ms: int = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+    
+    # Profil SQLite : "default" ou "production" (WAL + écrivain unique)
+    sqlite_profile: str = os.getenv("SQLITE_PROFILE", "default")
+    
+    # Routes CRUD asynchrones (AsyncSession via aiosqlite / asyncpg)
+    async_database: bool = os.getenv("ASYNC_DATABASE", "False").lower() == "true"
+    
     # Sécurité
     secret_key: str = os.getenv(
         "SECRET_KEY", 
         "votre-clé-secrète-très-sécurisée-changez-en-production"
     )
     
+    # Hachage bcrypt dans un pool de processus dédié (0 : dans le thread de la
+    # requête). Au-delà de PASSWORD_HASH_MAX_PENDING opérations en cours ou en
+    # file, /users/token et /users/register répondent 429 ; garder cette
+    # limite sous les 40 threads du threadpool pour préserver les autres routes.
+    password_hash_workers: int = int(
+        os.getenv("PASSWORD_HASH_WORKERS", str(min(2, os.cpu_count() or 1)))
+    )
+    password_hash_max_pending: int = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "32"))
+    
     access_token_expire_minutes: int = int(
         os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
     )
     
+    # Cache des utilisateurs authentifiés (0 pour désactiver)
+    user_cache_ttl_seconds: int = int(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+    user_cache_max_size: int = int(os.getenv("USER_CACHE_MAX_SIZE", "1024"))
+    
+    # Flux GET /tasks/events : événements gardés pour la reprise (Last-Event-ID)
+    # et taille de la file de chaque client avant de lui demander un rechargement
+    event_buffer_size: int = int(os.getenv("EVENT_BUFFER_SIZE", "10000"))
+    event_queue_size: int = int(os.getenv("EVENT_QUEUE_SIZE", "1000"))
+    
+    # POST /tasks/import : tâches insérées par transaction (paramètre batch_size)
+    import_batch_size: int = int(os.getenv("IMPORT_BATCH_SIZE", "1000"))
+    
+    # Profilage par requête (à réserver au debug) : en-têtes Server-Timing et
+    # X-Query-Count, détail des requêtes SQL via GET /debug/profiles/{id}
+    request_profiling: bool = os.getenv("REQUEST_PROFILING", "False").lower() == "true"
+    profile_buffer_size: int = int(os.getenv("PROFILE_BUFFER_SIZE", "100"))
+    
     # Environnement
     environment: str = os.getenv("ENVIRONMENT", "development")
     debug: bool = os.getenv("DEBUG", "True").lower() == "true"
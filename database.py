@@ -2,18 +2,240 @@ from sqlalchemy.orm import declarative_base, sessionmaker, relationship  # Chang
 
 # ... reste identique
 
-from sqlalchemy import create_engine, Column, Integer, String, Boolean, DateTime, ForeignKey
+import threading
+import time
+from sqlalchemy import create_engine, event, exc, func, inspect, select, text, update, Column, Integer, String, Boolean, DateTime, ForeignKey, Index
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, column_property, sessionmaker, relationship
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from datetime import datetime
+from config import settings
 
-# Configuration SQLite (simple pour débuter)
-SQLALCHEMY_DATABASE_URL = "sqlite:///./tasks.db"
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+def normalize_database_url(url: str) -> str:
+    # Railway / Heroku fournissent encore parfois le schéma "postgres://"
+    if url.startswith("postgres://"):
+        return "postgresql://" + url[len("postgres://"):]
+    return url
+
+SQLALCHEMY_DATABASE_URL = normalize_database_url(settings.database_url)
+
+# Pilotes asynchrones correspondant aux URL synchrones
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+def to_async_url(url: str) -> str:
+    scheme, _, rest = url.partition("://")
+    dialect = scheme.split("+")[0]
+    if dialect not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for '{scheme}'")
+    return f"{ASYNC_DRIVERS[dialect]}://{rest}"
+
+# Métriques du pool de connexions
+class PoolMetrics:
+    """Compteurs agrégés des pools instrumentés (exposés par /health)."""
+
+    def __init__(self):
+        # Les événements du pool arrivent de tous les threads : un += nu perdrait
+        # des incréments. Verrou court, négligeable devant un checkout.
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.connects = 0
+            self.checkouts = 0
+            self.checkins = 0
+            self.timeouts = 0
+            self.wait_seconds_total = 0.0
+            self.wait_seconds_max = 0.0
+
+    def increment(self, name: str):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def record_wait(self, seconds: float):
+        with self._lock:
+            self.wait_seconds_total += seconds
+            if seconds > self.wait_seconds_max:
+                self.wait_seconds_max = seconds
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "checked_out": self.checkouts - self.checkins,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": round(self.wait_seconds_total, 6),
+                "wait_seconds_max": round(self.wait_seconds_max, 6),
+            }
+
+pool_metrics = PoolMetrics()
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool qui mesure le temps d'attente d'une connexion."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            pool_metrics.increment("timeouts")
+            raise
+        finally:
+            pool_metrics.record_wait(time.perf_counter() - start)
+
+class InstrumentedAsyncQueuePool(InstrumentedQueuePool, AsyncAdaptedQueuePool):
+    pass
+
+def _instrument_pool(engine):
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        pool_metrics.increment("connects")
+
+    @event.listens_for(engine, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        pool_metrics.increment("checkouts")
+
+    @event.listens_for(engine, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        pool_metrics.increment("checkins")
+
+def engine_options(url: str, is_async: bool = False) -> dict:
+    """Options de create_engine dérivées de la configuration."""
+    if url.startswith("sqlite"):
+        options = {} if is_async else {"connect_args": {"check_same_thread": False}}
+        if make_url(url).database in (None, "", ":memory:"):
+            return options
+    else:
+        options = {}
+        if settings.db_statement_timeout_ms > 0:
+            timeout = str(settings.db_statement_timeout_ms)
+            options["connect_args"] = (
+                {"server_settings": {"statement_timeout": timeout}} if is_async
+                else {"options": f"-c statement_timeout={timeout}"}
+            )
+    options.update(
+        poolclass=InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping,
+    )
+    return options
+
+def create_db_engine(url: str):
+    db_engine = create_engine(url, **engine_options(url))
+    _instrument_pool(db_engine)
+    return db_engine
+
+def create_async_db_engine(url: str):
+    async_url = to_async_url(url)
+    db_engine = create_async_engine(async_url, **engine_options(async_url, is_async=True))
+    _instrument_pool(db_engine.sync_engine)
+    return db_engine
+
+def pool_status() -> dict:
+    status = pool_metrics.snapshot()
+    for name, db_engine in (("sync", engine), ("async", async_engine)):
+        if db_engine is not None and isinstance(db_engine.pool, QueuePool):
+            status[name] = {
+                "size": db_engine.pool.size(),
+                "checked_out": db_engine.pool.checkedout(),
+                "overflow": db_engine.pool.overflow(),
+            }
+    return status
+
+# Profil SQLite "production" (SQLITE_PROFILE=production) : WAL pour que les
+# lectures ne bloquent jamais, et un seul écrivain à la fois par processus.
+SQLITE_PRODUCTION_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -64 * 1024,  # négatif = taille en Kio
+    "busy_timeout": 5000,
+    "temp_store": "MEMORY",
+}
+
+def apply_sqlite_pragmas(db_engine):
+    @event.listens_for(db_engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in SQLITE_PRODUCTION_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+class SQLiteWriter:
+    """
+    Fait passer les transactions d'écriture par un écrivain unique.
+
+    Une session prend le verrou à son premier flush (ou ordre UPDATE/DELETE/
+    INSERT explicite) et le rend à la fin de sa transaction : les écritures
+    concurrentes attendent leur tour au lieu d'échouer sur "database is
+    locked", et les lectures WAL continuent sans attendre.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def acquire(self, session):
+        if not session.info.get("sqlite_writer"):
+            self._lock.acquire()
+            session.info["sqlite_writer"] = True
+
+    def release(self, session):
+        if session.info.pop("sqlite_writer", False):
+            self._lock.release()
+
+    def install(self, session_factory):
+        @event.listens_for(session_factory, "before_flush")
+        def before_flush(session, flush_context, instances):
+            self.acquire(session)
+
+        @event.listens_for(session_factory, "do_orm_execute")
+        def do_orm_execute(orm_execute_state):
+            if not orm_execute_state.is_select:
+                self.acquire(orm_execute_state.session)
+
+        @event.listens_for(session_factory, "after_transaction_end")
+        def after_transaction_end(session, transaction):
+            if transaction.parent is None:
+                self.release(session)
+
+sqlite_writer = SQLiteWriter()
+
+def configure_sqlite_production(db_engine, session_factory=None):
+    apply_sqlite_pragmas(db_engine)
+    if session_factory is not None:
+        sqlite_writer.install(session_factory)
+
+engine = create_db_engine(SQLALCHEMY_DATABASE_URL)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# Moteur asynchrone, créé uniquement si le mode async est activé
+async_engine = (
+    create_async_db_engine(SQLALCHEMY_DATABASE_URL)
+    if settings.async_database else None
+)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
+if settings.sqlite_profile == "production" and engine.dialect.name == "sqlite":
+    configure_sqlite_production(engine, SessionLocal)
+    if async_engine is not None:
+        # Pas de verrou d'écriture côté async : busy_timeout prend le relais
+        apply_sqlite_pragmas(async_engine.sync_engine)
+
 # Modèles de base de données
 class User(Base):
     __tablename__ = "users"
@@ -22,21 +244,320 @@ class User(Base):
     email = Column(String, unique=True, index=True)
     hashed_password = Column(String)
     is_active = Column(Boolean, default=True)
+    # Incrémenté pour révoquer tous les tokens émis (claim `ver`)
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
+    # Incrémenté à chaque écriture sur ses tâches (ETag des lectures)
+    tasks_version = Column(Integer, nullable=False, default=0, server_default="0")
     
     tasks = relationship("Task", back_populates="owner")
 
+class RefreshToken(Base):
+    """
+    Refresh token opaque, stocké sous forme d'empreinte HMAC. Chaque
+    utilisation le remplace par un nouveau de la même famille ; réutiliser
+    un token déjà échangé révoque toute la famille.
+    """
+    __tablename__ = "refresh_tokens"
+
+    id = Column(Integer, primary_key=True)
+    token_hash = Column(String, unique=True, index=True, nullable=False)
+    family_id = Column(String, index=True, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False)
+    used_at = Column(DateTime)
+    revoked_at = Column(DateTime)
+
 class Task(Base):
     __tablename__ = "tasks"
     
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, index=True)
     description = Column(String)
-    status = Column(String, default="todo")  # todo, in_progress, done
+    # active_history : l'ancienne valeur reste connue pour les compteurs
+    status = column_property(Column(String, default="todo"), active_history=True)  # todo, in_progress, done
     created_at = Column(DateTime, default=datetime.utcnow)
-    owner_id = Column(Integer, ForeignKey("users.id"))
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    owner_id = column_property(Column(Integer, ForeignKey("users.id")), active_history=True)
+    # users.tasks_version du propriétaire lors de la dernière écriture (GET /tasks/changes)
+    version = Column(Integer, nullable=False, default=0, server_default="0")
     
     owner = relationship("User", back_populates="tasks")
 
+    __table_args__ = (
+        # Index composite pour la pagination par curseur (keyset) de GET /tasks/
+        Index("ix_tasks_owner_created_id", "owner_id", "created_at", "id"),
+        # Filtres et tris de GET /tasks/ : une combinaison (filtre status,
+        # tri) par index, l'id en dernier pour départager dans l'ordre
+        Index("ix_tasks_owner_status_created_id", "owner_id", "status", "created_at", "id"),
+        Index("ix_tasks_owner_title_id", "owner_id", "title", "id"),
+        Index("ix_tasks_owner_status_title_id", "owner_id", "status", "title", "id"),
+        Index("ix_tasks_owner_status_id", "owner_id", "status", "id"),
+        # Synchronisation incrémentale : tâches modifiées après une version
+        Index("ix_tasks_owner_version_id", "owner_id", "version", "id"),
+    )
+
+class TaskTombstone(Base):
+    """Trace d'une tâche supprimée, pour la synchronisation incrémentale."""
+    __tablename__ = "task_tombstones"
+
+    id = Column(Integer, primary_key=True)
+    task_id = Column(Integer, nullable=False)
+    owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    version = Column(Integer, nullable=False)
+    deleted_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_task_tombstones_owner_version_task", "owner_id", "version", "task_id"),
+    )
+
+class TaskCounter(Base):
+    """Nombre de tâches par (propriétaire, statut), tenu à jour à chaque écriture."""
+    __tablename__ = "task_counters"
+
+    owner_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    status = Column(String, primary_key=True)
+    task_count = Column(Integer, nullable=False, default=0)
+
+def _counter_upsert(dialect: str):
+    # INSERT ... ON CONFLICT DO UPDATE : incrément atomique, même concurrent
+    return postgresql.insert if dialect == "postgresql" else sqlite.insert
+
+def _on_conflict_add(statement):
+    return statement.on_conflict_do_update(
+        index_elements=[TaskCounter.owner_id, TaskCounter.status],
+        set_={"task_count": TaskCounter.task_count + statement.excluded.task_count},
+    )
+
+def add_task_counts(db, deltas: dict) -> None:
+    """Applique des variations {(owner_id, status): delta} aux compteurs."""
+    rows = [
+        {"owner_id": owner_id, "status": status, "task_count": delta}
+        for (owner_id, status), delta in deltas.items()
+        if delta and owner_id is not None and status is not None
+    ]
+    if rows:
+        insert = _counter_upsert(db.get_bind().dialect.name)
+        db.execute(_on_conflict_add(insert(TaskCounter).values(rows)))
+
+def subtract_task_counts(db, criteria: list) -> None:
+    """Décompte, en une requête, les tâches sélectionnées par `criteria`."""
+    insert = _counter_upsert(db.get_bind().dialect.name)
+    selected = (
+        select(Task.owner_id, Task.status, -func.count())
+        .where(*criteria, Task.status.is_not(None))
+        .group_by(Task.owner_id, Task.status)
+    )
+    db.execute(_on_conflict_add(
+        insert(TaskCounter).from_select(["owner_id", "status", "task_count"], selected)
+    ))
+
+def rebuild_task_counters(connection) -> None:
+    """Recalcule tous les compteurs depuis la table des tâches."""
+    connection.execute(TaskCounter.__table__.delete())
+    connection.execute(TaskCounter.__table__.insert().from_select(
+        ["owner_id", "status", "task_count"],
+        select(Task.owner_id, Task.status, func.count())
+        .where(Task.owner_id.is_not(None), Task.status.is_not(None))
+        .group_by(Task.owner_id, Task.status),
+    ))
+
+def bump_tasks_version(db, owner_ids) -> dict:
+    """
+    Incrémente la version des tâches de ces utilisateurs et renvoie
+    {owner_id: nouvelle version}. Le verrou pris sur la ligne users
+    jusqu'au commit ordonne les écritures d'un même utilisateur : une
+    version visible implique que toutes les précédentes sont validées.
+    """
+    owner_ids = sorted({owner_id for owner_id in owner_ids if owner_id is not None})
+    if not owner_ids:
+        return {}
+    users = User.__table__
+    rows = db.execute(
+        update(users)
+        .where(users.c.id.in_(owner_ids))
+        .values(tasks_version=users.c.tasks_version + 1)
+        .returning(users.c.id, users.c.tasks_version)
+    )
+    return dict(rows.all())
+
+def add_tombstones(db, owner_id: int, version: int, task_ids) -> None:
+    rows = [{"task_id": task_id, "owner_id": owner_id, "version": version} for task_id in task_ids]
+    if rows:
+        db.execute(TaskTombstone.__table__.insert(), rows)
+
+@event.listens_for(Session, "before_flush")
+def _stamp_task_versions(session, flush_context, instances):
+    # Chaque tâche écrite porte la nouvelle version de son propriétaire ;
+    # une suppression (ou un changement de propriétaire) laisse une trace.
+    # Les routes en masse font de même avec bump_tasks_version / add_tombstones.
+    written, removed, recounted = [], [], []
+    for instance in session.new:
+        if isinstance(instance, Task):
+            written.append(instance)
+    for instance in session.dirty:
+        if isinstance(instance, Task) and session.is_modified(instance):
+            written.append(instance)
+            state = inspect(instance)
+            history = state.attrs.owner_id.history
+            if history.deleted and history.deleted[0] != instance.owner_id:
+                removed.append((history.deleted[0], instance.id))
+            if history.has_changes() or state.attrs.status.history.has_changes():
+                recounted.append(instance.id)
+    for instance in session.deleted:
+        if isinstance(instance, Task) and instance.id is not None:
+            removed.append((instance.owner_id, instance.id))
+            recounted.append(instance.id)
+    owners = [task.owner_id for task in written] + [owner_id for owner_id, _ in removed]
+    versions = bump_tasks_version(session, owners)
+    for task in written:
+        task.version = versions.get(task.owner_id, 0)
+    for owner_id, task_id in removed:
+        if owner_id in versions:
+            add_tombstones(session, owner_id, versions[owner_id], [task_id])
+    # Propriétaire et statut relus sous le verrou : les valeurs chargées avant
+    # peuvent dater d'avant une écriture en masse concurrente (compteurs)
+    session.info["counted_tasks"] = {}
+    if recounted:
+        session.info["counted_tasks"] = {
+            task_id: (owner_id, status)
+            for task_id, owner_id, status in session.execute(
+                select(Task.id, Task.owner_id, Task.status).where(Task.id.in_(recounted))
+            )
+        }
+
+@event.listens_for(Session, "after_flush")
+def _count_flushed_tasks(session, flush_context):
+    # Les écritures unitaires (db.add / setattr / db.delete) mettent à jour
+    # les compteurs dans la même transaction ; les routes en masse appellent
+    # add_task_counts / subtract_task_counts elles-mêmes.
+    deltas = {}
+
+    def record(key, delta):
+        deltas[key] = deltas.get(key, 0) + delta
+
+    # Valeurs précédentes : lignes relues sous le verrou (_stamp_task_versions) ;
+    # une ligne absente a déjà été supprimée et décomptée par ailleurs
+    counted = session.info.pop("counted_tasks", {})
+    for instance in session.new:
+        if isinstance(instance, Task):
+            record((instance.owner_id, instance.status), 1)
+    for instance in session.deleted:
+        if isinstance(instance, Task) and instance.id in counted:
+            record(counted[instance.id], -1)
+    for instance in session.dirty:
+        if not isinstance(instance, Task) or instance.id not in counted:
+            continue
+        state = inspect(instance)
+        previous = counted[instance.id]
+        # Attribut non modifié : l'UPDATE a laissé la valeur de la base
+        current = tuple(
+            getattr(instance, key) if state.attrs[key].history.has_changes() else value
+            for key, value in zip(("owner_id", "status"), previous)
+        )
+        if previous != current:
+            record(previous, -1)
+            record(current, 1)
+    add_task_counts(session, deltas)
+
+# Recherche plein texte sur le titre et la description des tâches.
+# SQLite : table FTS5 à contenu externe tenue à jour par des triggers, donc
+# aussi pour les insertions / mises à jour / suppressions en masse. owner_id
+# y est indexé comme un mot pour restreindre la recherche dans FTS5 même,
+# au lieu de classer les correspondances de tous les utilisateurs.
+# PostgreSQL : index GIN sur une expression tsvector.
+SQLITE_SEARCH_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+        title, description, owner_id, content='tasks', content_rowid='id',
+        prefix='2 3', tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN
+        INSERT INTO tasks_fts(rowid, title, description, owner_id)
+        VALUES (new.id, new.title, new.description, new.owner_id);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN
+        INSERT INTO tasks_fts(tasks_fts, rowid, title, description, owner_id)
+        VALUES ('delete', old.id, old.title, old.description, old.owner_id);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF title, description, owner_id ON tasks BEGIN
+        INSERT INTO tasks_fts(tasks_fts, rowid, title, description, owner_id)
+        VALUES ('delete', old.id, old.title, old.description, old.owner_id);
+        INSERT INTO tasks_fts(rowid, title, description, owner_id)
+        VALUES (new.id, new.title, new.description, new.owner_id);
+    END""",
+]
+POSTGRES_SEARCH_VECTOR = (
+    "to_tsvector('simple', coalesce(tasks.title, '') || ' ' || coalesce(tasks.description, ''))"
+)
+POSTGRES_SEARCH_DDL = [
+    "CREATE INDEX IF NOT EXISTS ix_tasks_search ON tasks USING GIN "
+    "((to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(description, ''))))",
+]
+
+def create_search_index(connection):
+    """Crée l'index de recherche (idempotent, utilisable sur une base existante)."""
+    if connection.dialect.name == "sqlite":
+        exists = connection.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE name = 'tasks_fts'"
+        )).first()
+        for statement in SQLITE_SEARCH_DDL:
+            connection.execute(text(statement))
+        if not exists:
+            # Indexe les tâches déjà présentes
+            connection.execute(text("INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')"))
+    elif connection.dialect.name == "postgresql":
+        for statement in POSTGRES_SEARCH_DDL:
+            connection.execute(text(statement))
+
+def drop_search_index(connection):
+    if connection.dialect.name == "sqlite":
+        connection.execute(text("DROP TABLE IF EXISTS tasks_fts"))
+
+@event.listens_for(Task.__table__, "after_create")
+def _create_search_index(target, connection, **kw):
+    create_search_index(connection)
+
+@event.listens_for(Task.__table__, "before_drop")
+def _drop_search_index(target, connection, **kw):
+    drop_search_index(connection)
+
+# Colonnes ajoutées après la création initiale des tables : create_all ne
+# modifie pas une table existante, init_db les ajoute si elles manquent.
+ADDED_COLUMNS = [
+    ("users", "token_version", "INTEGER NOT NULL DEFAULT 0"),
+    ("users", "tasks_version", "INTEGER NOT NULL DEFAULT 0"),
+    ("tasks", "updated_at", "TIMESTAMP"),
+    ("tasks", "version", "INTEGER NOT NULL DEFAULT 0"),
+]
+
+# Index remplacés depuis par une version complétée (voir Task.__table_args__)
+DROPPED_INDEXES = ["ix_tasks_owner_status_created", "ix_tasks_owner_title"]
+
+def add_missing_columns(connection):
+    inspector = inspect(connection)
+    for table_name, column_name, ddl in ADDED_COLUMNS:
+        columns = {column["name"] for column in inspector.get_columns(table_name)}
+        if column_name not in columns:
+            connection.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {column_name} {ddl}"))
+    for index_name in DROPPED_INDEXES:
+        connection.execute(text(f"DROP INDEX IF EXISTS {index_name}"))
+    # Index déclarés depuis sur des tables existantes
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
+
+def init_db(db_engine=None):
+    """Crée les tables manquantes, l'index de recherche et les compteurs (idempotent)."""
+    db_engine = db_engine or engine
+    counters_exist = inspect(db_engine).has_table(TaskCounter.__tablename__)
+    Base.metadata.create_all(bind=db_engine)
+    with db_engine.begin() as connection:
+        add_missing_columns(connection)
+        create_search_index(connection)
+        if not counters_exist:
+            # Compte les tâches déjà présentes
+            rebuild_task_counters(connection)
+
 # Fonction pour obtenir la session DB
 def get_db():
     db = SessionLocal()
@@ -44,3 +565,7 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,148 @@
+import asyncio
+import json
+from abc import ABC, abstractmethod
+import threading
+from collections import deque
+from typing import AsyncIterator, List, Optional
+
+from config import settings
+
+class Subscription:
+    """Abonnement d'un client au flux d'un utilisateur."""
+
+    def __init__(self, broker: "EventBroker", owner_id: int, replay: List[dict], reset: bool):
+        self.broker = broker
+        self.owner_id = owner_id
+        # Événements manqués depuis Last-Event-ID, à envoyer en premier
+        self.replay = replay
+        # Vrai si des événements manqués ne sont plus disponibles : le client
+        # doit recharger ses données au lieu de rejouer
+        self.reset = reset
+        self.overflowed = False
+        self.loop = asyncio.get_running_loop()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=settings.event_queue_size)
+
+    def deliver(self, event: dict):
+        # Appelé depuis n'importe quel thread ; la file appartient à la boucle
+        self.loop.call_soon_threadsafe(self._put, event)
+
+    def _put(self, event: dict):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Client trop lent : on le fera repartir d'un rechargement complet
+            self.overflowed = True
+
+    async def get(self) -> dict:
+        return await self.queue.get()
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+class EventBroker(ABC):
+    """
+    Diffusion des changements de tâches aux flux GET /tasks/events.
+
+    `publish` est appelé après le commit, depuis les threads des routes
+    synchrones comme depuis la boucle. Pour plusieurs workers, une
+    implémentation branchée sur un bus partagé (Redis, LISTEN/NOTIFY...)
+    remplace l'instance par défaut via set_broker() au démarrage. Une
+    implémentation incomplète échoue dès son instanciation.
+    """
+
+    @abstractmethod
+    def publish(self, owner_id: int, event_type: str, data: dict) -> dict:
+        ...
+
+    @abstractmethod
+    def subscribe(self, owner_id: int, last_event_id: Optional[int] = None) -> Subscription:
+        ...
+
+    @abstractmethod
+    def unsubscribe(self, subscription: Subscription) -> None:
+        ...
+
+class InMemoryBroker(EventBroker):
+    """Diffusion dans le processus, avec les derniers événements gardés pour la reprise."""
+
+    def __init__(self, buffer_size: int):
+        self._lock = threading.Lock()
+        self._last_id = 0
+        self._buffer: deque = deque(maxlen=buffer_size)
+        self._subscriptions: dict = {}
+
+    def publish(self, owner_id: int, event_type: str, data: dict) -> dict:
+        with self._lock:
+            self._last_id += 1
+            event = {"id": self._last_id, "owner_id": owner_id, "type": event_type, "data": data}
+            self._buffer.append(event)
+            for subscription in self._subscriptions.get(owner_id, ()):
+                subscription.deliver(event)
+        return event
+
+    def subscribe(self, owner_id: int, last_event_id: Optional[int] = None) -> Subscription:
+        # Sous le verrou : aucun événement ne peut tomber entre la reprise et la file
+        with self._lock:
+            replay, reset = [], False
+            if last_event_id is not None:
+                oldest = self._buffer[0]["id"] if self._buffer else self._last_id + 1
+                # Trou dans l'historique, ou id d'un processus précédent
+                reset = last_event_id < oldest - 1 or last_event_id > self._last_id
+                replay = [
+                    event for event in self._buffer
+                    if event["owner_id"] == owner_id and event["id"] > last_event_id
+                ]
+            subscription = Subscription(self, owner_id, replay, reset)
+            self._subscriptions.setdefault(owner_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.owner_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.owner_id]
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return sum(len(subscriptions) for subscriptions in self._subscriptions.values())
+
+broker: EventBroker = InMemoryBroker(buffer_size=settings.event_buffer_size)
+
+def get_broker() -> EventBroker:
+    return broker
+
+def set_broker(new_broker: EventBroker) -> None:
+    global broker
+    broker = new_broker
+
+def format_event(event: dict) -> str:
+    data = json.dumps(event["data"], default=str)
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {data}\n\n"
+
+async def task_event_stream(
+    request, owner_id: int, last_event_id: Optional[int] = None, heartbeat: float = 15.0
+) -> AsyncIterator[str]:
+    """Flux SSE d'un utilisateur : reprise éventuelle, puis événements en direct."""
+    subscription = get_broker().subscribe(owner_id, last_event_id)
+    try:
+        # Conseil de reconnexion pour EventSource (en millisecondes)
+        yield "retry: 3000\n\n"
+        if subscription.reset:
+            yield "event: reset\ndata: {}\n\n"
+        for event in subscription.replay:
+            yield format_event(event)
+        while not await request.is_disconnected():
+            if subscription.overflowed:
+                subscription.overflowed = False
+                yield "event: reset\ndata: {}\n\n"
+            try:
+                event = await asyncio.wait_for(subscription.get(), heartbeat)
+            except asyncio.TimeoutError:
+                # Commentaire SSE : garde la connexion ouverte derrière les proxys
+                yield ": keepalive\n\n"
+                continue
+            yield format_event(event)
+    finally:
+        subscription.close()
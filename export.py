@@ -0,0 +1,60 @@
+import csv
+import io
+import json
+from typing import Iterator
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from database import Task
+
+EXPORT_BATCH_SIZE = 1000
+
+# Colonnes exportées, dans l'ordre des colonnes CSV
+EXPORT_COLUMNS = [
+    Task.id, Task.title, Task.description, Task.status,
+    Task.created_at, Task.updated_at, Task.owner_id, Task.version,
+]
+EXPORT_FIELDS = [column.key for column in EXPORT_COLUMNS]
+
+def build_export_query(owner_id: int):
+    # Colonnes seules (pas d'objets ORM ni d'identity map) ; stream_results
+    # utilise un curseur serveur quand le pilote le permet (psycopg2, asyncpg)
+    return (
+        select(*EXPORT_COLUMNS)
+        .where(Task.owner_id == owner_id)
+        .order_by(Task.created_at, Task.id)
+        .execution_options(stream_results=True, yield_per=EXPORT_BATCH_SIZE)
+    )
+
+def _value(value):
+    return value.isoformat() if hasattr(value, "isoformat") else value
+
+def ndjson_lines(rows) -> str:
+    return "".join(
+        json.dumps(dict(zip(EXPORT_FIELDS, map(_value, row))), ensure_ascii=False) + "\n"
+        for row in rows
+    )
+
+def csv_lines(rows, header: bool = False) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(EXPORT_FIELDS)
+    writer.writerows([[_value(value) for value in row] for row in rows])
+    return buffer.getvalue()
+
+def export_tasks(bind, owner_id: int, format: str = "ndjson") -> Iterator[str]:
+    """
+    Génère l'export par lots de EXPORT_BATCH_SIZE lignes, en mémoire
+    constante quel que soit le nombre de tâches.
+
+    La session est ouverte ici, sur `bind`, et non reçue de la route : celle
+    de get_db est fermée avant que StreamingResponse ne consomme le flux.
+    """
+    with Session(bind=bind) as db:
+        result = db.execute(build_export_query(owner_id))
+        if format == "csv":
+            yield csv_lines([], header=True)
+        for rows in result.partitions():
+            yield csv_lines(rows) if format == "csv" else ndjson_lines(rows)
@@ -0,0 +1,132 @@
+import asyncio
+import math
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from passlib.context import CryptContext
+from config import settings
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+# Fonctions exécutées dans les processus du pool (importables, donc picklables)
+def hash_password(password: str) -> str:
+    return pwd_context.hash(password)
+
+def check_password(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+class HasherSaturated(Exception):
+    """Trop d'opérations bcrypt en attente : la requête doit être rejetée."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Password hashing pool saturated, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+class PasswordHasher:
+    """
+    Pool de processus dédié au hachage bcrypt, avec contrôle d'admission.
+
+    Chaque hachage ou vérification coûte ~250 ms de CPU : exécutés dans les
+    threads des requêtes, une rafale de connexions ralentit toutes les autres
+    routes. Ici le calcul part dans `max_workers` processus et au plus
+    `max_pending` opérations peuvent être en cours ou en file ; au-delà,
+    `HasherSaturated` est levée immédiatement (429 côté API). Avec
+    `max_workers=0`, le calcul reste dans le thread appelant.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = None
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.seconds_total = 0.0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        executor = self._executor
+        if executor is None:
+            with self._lock:
+                # Double vérification : deux premiers appels simultanés ne
+                # doivent pas créer deux pools (l'un fuirait ses processus)
+                if self._executor is None:
+                    # spawn : pas de fork d'un processus qui a déjà des threads
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+                executor = self._executor
+        return executor
+
+    def retry_after(self) -> int:
+        """Secondes estimées pour écouler la file actuelle."""
+        average = self.seconds_total / self.completed if self.completed else 0.25
+        return max(1, math.ceil(self.pending * average / max(self.max_workers, 1)))
+
+    def submit(self, fn, *args) -> Future:
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise HasherSaturated(self.retry_after())
+            self.pending += 1
+        start = time.perf_counter()
+        try:
+            if self.max_workers > 0:
+                future = self._get_executor().submit(fn, *args)
+            else:
+                future = Future()
+                try:
+                    future.set_result(fn(*args))
+                except Exception as e:
+                    future.set_exception(e)
+        except Exception:
+            self._done(start)
+            raise
+        future.add_done_callback(lambda _: self._done(start))
+        return future
+
+    def _done(self, start: float):
+        with self._lock:
+            self.pending -= 1
+            self.completed += 1
+            self.seconds_total += time.perf_counter() - start
+
+    # Versions bloquantes (routes synchrones, déjà dans le threadpool)
+    def hash(self, password: str) -> str:
+        return self.submit(hash_password, password).result()
+
+    def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return self.submit(check_password, plain_password, hashed_password).result()
+
+    # Versions asynchrones : n'occupent aucun thread pendant le calcul
+    async def hash_async(self, password: str) -> str:
+        return await asyncio.wrap_future(self.submit(hash_password, password))
+
+    async def verify_async(self, plain_password: str, hashed_password: str) -> bool:
+        return await asyncio.wrap_future(
+            self.submit(check_password, plain_password, hashed_password)
+        )
+
+    def shutdown(self):
+        """Arrête les processus du pool (recréé au besoin par le prochain appel)."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def snapshot(self) -> dict:
+        return {
+            "workers": self.max_workers,
+            "pending": self.pending,
+            "queued": max(self.pending - self.max_workers, 0),
+            "max_pending": self.max_pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+password_hasher = PasswordHasher(
+    max_workers=settings.password_hash_workers,
+    max_pending=settings.password_hash_max_pending,
+)
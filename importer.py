@@ -0,0 +1,146 @@
+import asyncio
+import codecs
+import csv
+import json
+from typing import AsyncIterator, List, Optional, Tuple
+
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from database import Task, add_task_counts, bump_tasks_version
+from events import get_broker
+from schemas import BulkItemError, TaskCreate, TaskImportResult, validation_errors
+
+IMPORT_MAX_BATCH_SIZE = 10000
+# Au-delà, les erreurs sont seulement comptées (`rejected`)
+IMPORT_MAX_ERRORS = 100
+# Longueur maximale d'une ligne NDJSON ou d'un enregistrement CSV
+IMPORT_MAX_RECORD_LENGTH = 64 * 1024
+
+Record = Tuple[Optional[dict], Optional[List[dict]]]
+
+def record_too_long():
+    return HTTPException(
+        status_code=413, detail=f"Record too long (max {IMPORT_MAX_RECORD_LENGTH} characters)"
+    )
+
+async def decoded_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Lignes (fin de ligne comprise) d'un corps UTF-8 reçu par morceaux."""
+    # utf-8-sig : ignore le BOM des CSV exportés par les tableurs
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        if len(pending) > IMPORT_MAX_RECORD_LENGTH:
+            raise record_too_long()
+        for line in lines:
+            yield line + "\n"
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+async def ndjson_records(lines: AsyncIterator[str]) -> AsyncIterator[Record]:
+    async for line in lines:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line), None
+        except json.JSONDecodeError as e:
+            yield None, [{"loc": [], "msg": f"Invalid JSON: {e.msg}", "type": "json_invalid"}]
+
+async def csv_records(lines: AsyncIterator[str]) -> AsyncIterator[Record]:
+    """
+    Enregistrements d'un CSV avec en-tête. Un champ entre guillemets peut
+    contenir des retours à la ligne : l'enregistrement n'est complet que
+    lorsque le nombre de guillemets lus est pair.
+    """
+    header, record = None, ""
+    async for line in lines:
+        record += line
+        if record.count('"') % 2:
+            if len(record) > IMPORT_MAX_RECORD_LENGTH:
+                raise record_too_long()
+            continue
+        text, record = record, ""
+        if not text.strip():
+            continue
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        # Champ vide : valeur par défaut (description nulle, statut "todo"...)
+        yield {name: value for name, value in zip(header, values) if value != ""}, None
+    if record.strip():
+        yield None, [{"loc": [], "msg": "Unterminated quoted field", "type": "csv_invalid"}]
+
+def insert_import_batch(db: Session, owner_id: int, tasks: List[TaskCreate]) -> int:
+    """Insère un lot et le valide dans sa propre transaction."""
+    version = bump_tasks_version(db, [owner_id]).get(owner_id, 0)
+    rows = [{**task.model_dump(), "owner_id": owner_id, "version": version} for task in tasks]
+    # Sans RETURNING : executemany du pilote, sans objet ORM par ligne
+    db.execute(Task.__table__.insert(), rows)
+    deltas = {}
+    for row in rows:
+        deltas[(owner_id, row["status"])] = deltas.get((owner_id, row["status"]), 0) + 1
+    add_task_counts(db, deltas)
+    db.commit()
+    return len(rows)
+
+async def import_tasks(
+    db: Session, owner_id: int, records: AsyncIterator[Record], batch_size: int
+) -> TaskImportResult:
+    """
+    Valide les enregistrements au fil de la lecture et insère les tâches
+    valides par lots de `batch_size`, chacun dans sa transaction : la
+    mémoire ne dépend que de la taille d'un lot. Aucune transaction n'est
+    ouverte pendant la lecture du corps ; si l'import est interrompu, les
+    lots déjà validés restent en base.
+    """
+    accepted, rejected, errors = 0, 0, []
+    batch: List[TaskCreate] = []
+    # Insertion du lot précédent, en cours dans le threadpool pendant que le
+    # suivant est lu et validé (le pilote relâche le GIL pendant l'écriture)
+    inserting: Optional[asyncio.Task] = None
+
+    async def wait_inserted():
+        nonlocal accepted, inserting
+        if inserting is not None:
+            count = await inserting
+            inserting = None
+            accepted += count
+            # Pas de détail par tâche : les clients se resynchronisent via
+            # GET /tasks/changes
+            get_broker().publish(owner_id, "imported", {"count": count})
+
+    async def flush():
+        nonlocal batch, inserting
+        await wait_inserted()
+        if batch:
+            inserting = asyncio.create_task(
+                run_in_threadpool(insert_import_batch, db, owner_id, batch)
+            )
+            batch = []
+
+    try:
+        index = 0
+        async for data, record_errors in records:
+            if record_errors is None:
+                try:
+                    batch.append(TaskCreate.model_validate(data))
+                except ValidationError as e:
+                    record_errors = validation_errors(e)
+            if record_errors is not None:
+                rejected += 1
+                if len(errors) < IMPORT_MAX_ERRORS:
+                    errors.append(BulkItemError(index=index, errors=record_errors))
+            if len(batch) >= batch_size:
+                await flush()
+            index += 1
+        await flush()
+    finally:
+        # Jamais deux lots en même temps sur la session, même en cas d'erreur
+        await wait_inserted()
+    return TaskImportResult(accepted=accepted, rejected=rejected, errors=errors)
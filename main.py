@@ -1,13 +1,26 @@
 import os
-from fastapi import FastAPI
-from database import engine, Base
-from routers import users, tasks
+from contextlib import asynccontextmanager
+from fastapi import APIRouter, FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse
+from config import settings
+from database import engine, async_engine, Base, pool_status
+from hashing import password_hasher
+from metrics import REGISTRY, MetricsMiddleware, instrument_engine, instrument_serialization
+from profiling import ProfilingMiddleware, profile_queries, profile_store
+from routers import users, tasks, async_users, async_tasks
 
 # Créer les tables (Railway le fera automatiquement)
 # Base.metadata.create_all(bind=engine)  # Supprimé - fait dans le Dockerfile
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Arrêt ou rechargement : pas de processus bcrypt orphelins
+    password_hasher.shutdown()
+
 # Créer l'application FastAPI
 app = FastAPI(
+    lifespan=lifespan,
     title="Task Manager API",
     description="Une API simple pour gérer les tâches d'équipe - Déployée avec Railway 🚀",
     version="1.0.0",
@@ -15,9 +28,42 @@ app = FastAPI(
     redoc_url="/redoc"
 )
 
-# Inclure les routers
-app.include_router(users.router)
-app.include_router(tasks.router)
+# Métriques (GET /metrics) : requêtes par route, SQL, authentification, sérialisation
+app.add_middleware(MetricsMiddleware)
+instrument_engine(engine)
+if async_engine is not None:
+    instrument_engine(async_engine.sync_engine)
+instrument_serialization()
+
+# Profilage par requête (REQUEST_PROFILING=true) : Server-Timing, X-Query-Count
+app.add_middleware(ProfilingMiddleware, store=profile_store)
+profile_queries(engine)
+if async_engine is not None:
+    profile_queries(async_engine.sync_engine)
+
+def include_sync_fallback(app: FastAPI, router: APIRouter, async_router: APIRouter):
+    """Inclut les routes synchrones qui n'ont pas (encore) d'équivalent async."""
+    mirrored = {
+        (route.path, method) for route in async_router.routes for method in route.methods
+    }
+    fallback = APIRouter()
+    fallback.routes.extend(
+        route for route in router.routes
+        if not any((route.path, method) in mirrored for method in route.methods)
+    )
+    app.include_router(fallback)
+
+# Inclure les routers (version AsyncSession si ASYNC_DATABASE=true)
+if settings.async_database:
+    # Les routes de repli (chemins fixes comme /tasks/bulk) passent avant
+    # /tasks/{task_id} des routes asynchrones
+    include_sync_fallback(app, users.router, async_users.router)
+    include_sync_fallback(app, tasks.router, async_tasks.router)
+    app.include_router(async_users.router)
+    app.include_router(async_tasks.router)
+else:
+    app.include_router(users.router)
+    app.include_router(tasks.router)
 
 @app.get("/")
 def read_root():
@@ -33,5 +79,20 @@ def read_root():
 def health_check():
     return {
         "status": "healthy",
-        "database": "connected" if engine else "disconnected"
-    }
\ No newline at end of file
+        "database": "connected" if engine else "disconnected",
+        "pool": pool_status(),
+        "password_hashing": password_hasher.snapshot()
+    }
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics():
+    # Format texte de Prometheus
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/debug/profiles/{profile_id}", include_in_schema=False)
+def read_profile(profile_id: str):
+    """Requêtes SQL et durées par phase d'une requête profilée (X-Request-Profile)."""
+    profile = profile_store.get(profile_id) if settings.request_profiling else None
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return profile.to_dict()
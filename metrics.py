@@ -0,0 +1,298 @@
+import functools
+import inspect
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List, Sequence, Tuple
+
+from sqlalchemy import event
+
+from profiling import record_phase
+
+# Bornes (en secondes) des histogrammes de latence, de 1 ms à 10 s
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class _Sharded:
+    """
+    Valeurs d'une série réparties par thread : chaque thread écrit dans sa
+    propre liste, sans verrou. Le verrou n'est pris qu'à la création de la
+    liste d'un nouveau thread ; la lecture additionne toutes les listes.
+    """
+
+    def __init__(self, size: int):
+        self._size = size
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards: List[list] = []
+
+    def shard(self) -> list:
+        try:
+            return self._local.values
+        except AttributeError:
+            values = [0] * self._size
+            with self._lock:
+                self._shards.append(values)
+            self._local.values = values
+            return values
+
+    def totals(self) -> list:
+        with self._lock:
+            shards = list(self._shards)
+        return [sum(column) for column in zip(*shards)] if shards else [0] * self._size
+
+class CounterChild(_Sharded):
+    def __init__(self):
+        super().__init__(1)
+
+    def inc(self, amount: float = 1) -> None:
+        self.shard()[0] += amount
+
+    def value(self) -> float:
+        return self.totals()[0]
+
+class HistogramChild(_Sharded):
+    # Liste par thread : un compteur par borne, un pour +Inf, puis la somme
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        super().__init__(len(buckets) + 2)
+
+    def observe(self, value: float) -> None:
+        values = self.shard()
+        values[bisect_left(self.buckets, value)] += 1
+        values[-1] += value
+
+    def snapshot(self) -> Tuple[List[int], int, float]:
+        """(compteurs cumulés par borne, nombre d'observations, somme)"""
+        values = self.totals()
+        cumulative, total = [], 0
+        for count in values[:-1]:
+            total += count
+            cumulative.append(total)
+        return cumulative[:-1], total, values[-1]
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[tuple, object] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values):
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.get(key)
+                if child is None:
+                    child = self._children[key] = self._new_child()
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _label_text(self, key: tuple, extra: Tuple[str, str] = None) -> str:
+        pairs = list(zip(self.labelnames, key))
+        if extra is not None:
+            pairs.append(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for key, child in sorted(self._children.items()):
+            lines.extend(self._render_child(key, child))
+        return lines
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return CounterChild()
+
+    def _render_child(self, key, child):
+        return [f"{self.name}{self._label_text(key)} {_number(child.value())}"]
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return HistogramChild(self.buckets)
+
+    def _render_child(self, key, child):
+        cumulative, count, total = child.snapshot()
+        bounds = [_number(bound) for bound in self.buckets] + ["+Inf"]
+        lines = [
+            f"{self.name}_bucket{self._label_text(key, ('le', bound))} {count_le}"
+            for bound, count_le in zip(bounds, cumulative + [count])
+        ]
+        lines.append(f"{self.name}_sum{self._label_text(key)} {_number(total)}")
+        lines.append(f"{self.name}_count{self._label_text(key)} {count}")
+        return lines
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Registry:
+    def __init__(self):
+        self.metrics: List[_Metric] = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Format texte d'exposition Prometheus (version 0.0.4)."""
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+REGISTRY = Registry()
+
+http_requests = REGISTRY.register(Counter(
+    "http_requests_total", "Requêtes HTTP traitées.", ("method", "route", "status")
+))
+http_errors = REGISTRY.register(Counter(
+    "http_request_errors_total", "Requêtes terminées en erreur serveur (5xx).", ("method", "route")
+))
+http_duration = REGISTRY.register(Histogram(
+    "http_request_duration_seconds", "Durée des requêtes HTTP.", ("method", "route")
+))
+auth_duration = REGISTRY.register(Histogram(
+    "auth_duration_seconds", "Durée de résolution de l'utilisateur courant.", ("step",)
+))
+password_duration = REGISTRY.register(Histogram(
+    "password_hash_duration_seconds",
+    "Durée des opérations bcrypt, attente du pool comprise.",
+    ("operation",),
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+))
+db_duration = REGISTRY.register(Histogram(
+    "db_query_duration_seconds", "Durée d'exécution des requêtes SQL.", ("operation",)
+))
+serialization_duration = REGISTRY.register(Histogram(
+    "response_serialization_duration_seconds",
+    "Durée de validation et de sérialisation des réponses (response_model).",
+))
+
+def timed(child: HistogramChild, phase: str):
+    """
+    Décorateur : durée de chaque appel (fonction synchrone ou coroutine),
+    comptée aussi dans la phase `phase` de la requête profilée en cours.
+    """
+    def observe(start: float):
+        elapsed = time.perf_counter() - start
+        child.observe(elapsed)
+        record_phase(phase, elapsed)
+
+    def decorator(function):
+        if inspect.iscoroutinefunction(function):
+            @functools.wraps(function)
+            async def async_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await function(*args, **kwargs)
+                finally:
+                    observe(start)
+            return async_wrapper
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                observe(start)
+        return wrapper
+    return decorator
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI : nombre, erreurs et durée des requêtes par route.
+
+    La route est le modèle du chemin (/tasks/{task_id}) et non l'URL, pour
+    un nombre de séries borné. Pour une réponse en flux, la durée court
+    jusqu'à la fin du flux.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            # Renseignée par le routage de FastAPI une fois la route trouvée
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            http_requests.labels(method, path, status_code).inc()
+            http_duration.labels(method, path).observe(elapsed)
+            if status_code >= 500:
+                http_errors.labels(method, path).inc()
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._metrics_start = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, "_metrics_start", None)
+    if start is not None:
+        operation = statement.lstrip()[:6].lower()
+        if operation not in ("select", "insert", "update", "delete"):
+            operation = "other"
+        db_duration.labels(operation).observe(time.perf_counter() - start)
+
+def instrument_engine(engine) -> None:
+    """Mesure les requêtes SQL d'un moteur (synchrone, ou sync_engine d'un moteur async)."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+def instrument_serialization() -> None:
+    """
+    Mesure la sérialisation des réponses. FastAPI n'offre pas de point
+    d'extension pour cette étape : on enveloppe fastapi.routing.serialize_response,
+    appelée par chaque route ayant un response_model.
+    """
+    import fastapi.routing
+
+    original = fastapi.routing.serialize_response
+    if getattr(original, "_metrics_wrapped", False):
+        return
+
+    @functools.wraps(original)
+    async def serialize_response(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await original(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            serialization_duration.labels().observe(elapsed)
+            record_phase("serialize", elapsed)
+
+    serialize_response._metrics_wrapped = True
+    fastapi.routing.serialize_response = serialize_response
@@ -0,0 +1,136 @@
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import List, Optional
+
+from sqlalchemy import event
+
+from config import settings
+
+class RequestProfile:
+    """Durées par phase et requêtes SQL d'une requête HTTP."""
+
+    def __init__(self, method: str, path: str):
+        self.id = secrets.token_hex(8)
+        self.method = method
+        self.path = path
+        self.start = time.perf_counter()
+        self.total = 0.0
+        # Secondes par phase : auth, password, db, serialize
+        self.phases: dict = {}
+        self.statements: List[dict] = []
+
+    def add_phase(self, name: str, seconds: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def server_timing(self) -> str:
+        # Les phases se recouvrent : db compte aussi les requêtes faites pendant auth
+        entries = []
+        for name, seconds in self.phases.items():
+            entry = f"{name};dur={seconds * 1000:.3f}"
+            if name == "db":
+                entry += f';desc="{len(self.statements)} queries"'
+            entries.append(entry)
+        entries.append(f"total;dur={(time.perf_counter() - self.start) * 1000:.3f}")
+        return ", ".join(entries)
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "total_ms": round(self.total * 1000, 3),
+            "phases_ms": {name: round(seconds * 1000, 3) for name, seconds in self.phases.items()},
+            "query_count": len(self.statements),
+            "statements": self.statements,
+        }
+
+current_profile: ContextVar[Optional[RequestProfile]] = ContextVar("current_profile", default=None)
+
+def record_phase(name: str, seconds: float) -> None:
+    """Ajoute une durée à la requête profilée en cours (sans effet sinon)."""
+    profile = current_profile.get()
+    if profile is not None:
+        profile.add_phase(name, seconds)
+
+class ProfileStore:
+    """Derniers profils, consultables par id (GET /debug/profiles/{id})."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self._lock = threading.Lock()
+        self._profiles: OrderedDict = OrderedDict()
+
+    def add(self, profile: RequestProfile) -> None:
+        with self._lock:
+            self._profiles[profile.id] = profile
+            while len(self._profiles) > self.size:
+                self._profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> Optional[RequestProfile]:
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+class ProfilingMiddleware:
+    """
+    Middleware ASGI, actif si REQUEST_PROFILING=true : ajoute à chaque
+    réponse les en-têtes Server-Timing (durée par phase, en ms),
+    X-Query-Count et X-Request-Profile, l'id sous lequel le détail des
+    requêtes SQL est gardé dans `store`.
+    """
+
+    def __init__(self, app, store: ProfileStore):
+        self.app = app
+        self.store = store
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.request_profiling:
+            return await self.app(scope, receive, send)
+
+        profile = RequestProfile(scope["method"], scope["path"])
+        token = current_profile.set(profile)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                # Les en-têtes partent après la sérialisation des réponses JSON ;
+                # pour une réponse en flux, seul le début est mesuré
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", profile.server_timing().encode()))
+                headers.append((b"x-query-count", str(len(profile.statements)).encode()))
+                headers.append((b"x-request-profile", profile.id.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_profile.reset(token)
+            profile.total = time.perf_counter() - profile.start
+            self.store.add(profile)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if current_profile.get() is not None:
+        context._profile_start = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = current_profile.get()
+    start = getattr(context, "_profile_start", None)
+    if profile is not None and start is not None:
+        elapsed = time.perf_counter() - start
+        profile.add_phase("db", elapsed)
+        # Sans les paramètres : ils peuvent contenir des hachés ou des jetons
+        profile.statements.append({
+            "statement": statement,
+            "executemany": executemany,
+            "duration_ms": round(elapsed * 1000, 3),
+        })
+
+def profile_queries(engine) -> None:
+    """Enregistre les requêtes SQL d'un moteur dans le profil de la requête en cours."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+profile_store = ProfileStore(size=settings.profile_buffer_size)
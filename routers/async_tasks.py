@@ -0,0 +1,101 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from typing import List, Union
+
+from database import get_async_db, Task
+from schemas import TaskCreate, TaskUpdate, TaskSummary, Task as TaskSchema, Principal
+from auth import get_current_principal_async
+from routers.tasks import (
+    TaskListParams, build_task_list_query, build_task_page, owned_task_query,
+    not_modified, tasks_etag, tasks_version_query, publish_tasks, publish_deleted
+)
+
+# Versions asynchrones des routes de routers/tasks.py (ASYNC_DATABASE=true).
+# Les relations ne pouvant pas être chargées paresseusement en async,
+# `owner` est toujours chargé explicitement avant la sérialisation.
+router = APIRouter(prefix="/tasks", tags=["tasks"])
+
+@router.post("/", response_model=TaskSchema)
+async def create_task(
+    task: TaskCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal_async)
+):
+    db_task = Task(**task.model_dump(), owner_id=current_user.id)
+    db.add(db_task)
+    await db.commit()
+    await db.refresh(db_task, attribute_names=["owner"])
+    publish_tasks(current_user.id, "created", [TaskSummary.model_validate(db_task)])
+    return db_task
+
+@router.get("/", response_model=List[Union[TaskSchema, TaskSummary]])
+async def read_tasks(
+    request: Request,
+    response: Response,
+    params: TaskListParams = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal_async)
+):
+    version = await db.scalar(tasks_version_query(current_user.id))
+    cached = not_modified(request, response, tasks_etag(current_user.id, version))
+    if cached is not None:
+        return cached
+    tasks = (await db.scalars(
+        build_task_list_query(current_user.id, params, db.get_bind().dialect.name)
+    )).all()
+    return build_task_page(response, tasks, params)
+
+@router.get("/{task_id}", response_model=TaskSchema)
+async def read_task(
+    task_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal_async)
+):
+    version = await db.scalar(tasks_version_query(current_user.id))
+    task = await db.scalar(
+        owned_task_query(task_id, current_user.id).options(selectinload(Task.owner))
+    )
+    if task is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    cached = not_modified(request, response, tasks_etag(current_user.id, version, task_id))
+    if cached is not None:
+        return cached
+    return task
+
+@router.put("/{task_id}", response_model=TaskSchema)
+async def update_task(
+    task_id: int,
+    task_update: TaskUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal_async)
+):
+    task = await db.scalar(
+        owned_task_query(task_id, current_user.id).options(selectinload(Task.owner))
+    )
+    if task is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    for field, value in task_update.model_dump(exclude_unset=True).items():
+        setattr(task, field, value)
+
+    await db.commit()
+    publish_tasks(current_user.id, "updated", [TaskSummary.model_validate(task)])
+    return task
+
+@router.delete("/{task_id}")
+async def delete_task(
+    task_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal_async)
+):
+    task = await db.scalar(owned_task_query(task_id, current_user.id))
+    if task is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    await db.delete(task)
+    await db.commit()
+    publish_deleted(current_user.id, [task_id])
+    return {"message": "Task deleted successfully"}
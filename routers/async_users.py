@@ -0,0 +1,59 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import timedelta
+
+from database import get_async_db, User
+from schemas import UserCreate, User as UserSchema, Token
+from auth import (
+    get_password_hash_async,
+    authenticate_user_async,
+    create_access_token,
+    ACCESS_TOKEN_EXPIRE_MINUTES,
+    get_user_by_email_async,
+    token_claims,
+    issue_refresh_token
+)
+
+# Versions asynchrones des routes de routers/users.py (ASYNC_DATABASE=true).
+# Le hachage bcrypt est attendu sans bloquer la boucle (pool de processus).
+router = APIRouter(prefix="/users", tags=["users"])
+
+@router.post("/register", response_model=UserSchema)
+async def create_user(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    db_user = await get_user_by_email_async(db, email=user.email)
+    if db_user:
+        raise HTTPException(
+            status_code=400,
+            detail="Email already registered"
+        )
+
+    hashed_password = await get_password_hash_async(user.password)
+    db_user = User(
+        email=user.email,
+        hashed_password=hashed_password
+    )
+    db.add(db_user)
+    await db.commit()
+    await db.refresh(db_user)
+    return db_user
+
+@router.post("/token", response_model=Token)
+async def login_for_access_token(
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: AsyncSession = Depends(get_async_db)
+):
+    user = await authenticate_user_async(db, form_data.username, form_data.password)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect email or password",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    access_token = create_access_token(
+        data=token_claims(user), expires_delta=access_token_expires
+    )
+    refresh_token = issue_refresh_token(db, user.id)
+    await db.commit()
+    return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
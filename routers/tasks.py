@@ -1,44 +1,567 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+import base64
+import json
+import sys
+from datetime import datetime
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from starlette.datastructures import UploadFile
+from pydantic import ValidationError
+from sqlalchemy import and_, delete, insert, or_, select, union_all, update
+from sqlalchemy.orm import Session, selectinload
+from typing import Any, List, Literal, Optional, Tuple, Union
 
-from database import get_db, Task, User
-from schemas import TaskCreate, TaskUpdate, Task as TaskSchema
-from auth import get_current_user
+from database import (
+    get_db, add_task_counts, add_tombstones, bump_tasks_version, subtract_task_counts, Task, User
+)
+from schemas import (
+    TaskCreate, TaskUpdate, TaskSummary, Task as TaskSchema, Principal,
+    BulkItemError, TaskBulkCreateResult, TaskSelection, TaskBulkUpdate, TaskBulkResult,
+    TaskSearchHit, TaskStats, TaskChanges, TaskImportResult, validation_errors
+)
+from auth import get_current_principal
+from search import search_tasks
+from stats import task_stats
+from events import get_broker, task_event_stream
+from changes import is_int64, read_changes
+from export import export_tasks
+from importer import (
+    IMPORT_MAX_BATCH_SIZE, csv_records, decoded_lines, import_tasks, ndjson_records
+)
+from config import settings
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+BULK_MAX_ITEMS = 1000
+BULK_MAX_IDS = 10000
+
+# Colonnes autorisées pour le tri de GET /tasks/ (l'id départage les égalités)
+SORT_COLUMNS = {
+    "created_at": Task.created_at,
+    "title": Task.title,
+    "status": Task.status,
+}
+
+class TaskListParams:
+    """Paramètres de filtre, tri et pagination de GET /tasks/."""
+
+    def __init__(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        include_owner: bool = True,
+        status: Optional[str] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        title_prefix: Optional[str] = None,
+        sort: Literal["created_at", "title", "status"] = "created_at",
+        order: Literal["asc", "desc"] = "asc",
+    ):
+        self.skip = skip
+        self.limit = limit
+        self.cursor = cursor
+        self.include_owner = include_owner
+        self.status = status
+        self.created_after = created_after
+        self.created_before = created_before
+        self.title_prefix = title_prefix
+        self.sort = sort
+        self.order = order
+
+def encode_cursor(task: Task, sort: str = "created_at", order: str = "asc") -> str:
+    """Encode la position (valeur de tri, id) d'une tâche en curseur opaque."""
+    value = getattr(task, sort)
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps([sort, order, value, task.id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str, sort: str = "created_at", order: str = "asc") -> Tuple[Any, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort, cursor_order, value, task_id = json.loads(base64.urlsafe_b64decode(padded))
+        # Valeur de tri : chaîne (date ISO pour created_at) ou null ; id entier
+        # BIGINT. Un curseur forgé ne doit jamais atteindre la comparaison SQL.
+        if value is not None and not isinstance(value, str):
+            raise TypeError
+        if not is_int64(task_id):
+            raise TypeError
+        if sort == "created_at" and value is not None:
+            value = datetime.fromisoformat(value)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if (cursor_sort, cursor_order) != (sort, order):
+        raise HTTPException(status_code=400, detail="Cursor does not match sort order")
+    return value, task_id
+
+def title_prefix_range(prefix: str):
+    # Préfixe sensible à la casse exprimé en intervalle pour rester indexable.
+    # Borne haute : dernier caractère incrémenté ; U+10FFFF n'a pas de
+    # successeur, on incrémente alors le précédent (sans borne si aucun).
+    stem = prefix.rstrip(chr(sys.maxunicode))
+    if not stem:
+        return Task.title >= prefix
+    upper = stem[:-1] + chr(ord(stem[-1]) + 1)
+    return and_(Task.title >= prefix, Task.title < upper)
+
+# Les colonnes de tri acceptent NULL. L'ordre suit la position naturelle des
+# NULL dans les index (les plus petits sous SQLite, les plus grands sous
+# PostgreSQL), rendue explicite pour que le curseur sache où ils se trouvent.
+def nulls_largest(dialect: Optional[str]) -> bool:
+    return dialect == "postgresql"
+
+def sort_order(column, descending: bool, dialect: Optional[str]):
+    ordered = column.desc() if descending else column.asc()
+    if nulls_largest(dialect) == descending:
+        return ordered.nulls_first()
+    return ordered.nulls_last()
+
+def keyset_after(column, value, task_id: int, descending: bool, dialect: Optional[str]) -> list:
+    """
+    Lignes qui suivent (value, task_id) dans l'ordre (column, id), NULL
+    compris : conditions disjointes, chacune un intervalle d'index (égalités
+    sur value au-delà de task_id, valeurs suivantes, puis NULL).
+    """
+    id_after = Task.id < task_id if descending else Task.id > task_id
+    nulls_at_end = nulls_largest(dialect) != descending
+    if value is None:
+        ties = and_(column.is_(None), id_after)
+        return [ties] if nulls_at_end else [ties, column.is_not(None)]
+    conditions = [
+        and_(column == value, id_after),
+        column < value if descending else column > value,
+    ]
+    if nulls_at_end:
+        conditions.append(column.is_(None))
+    return conditions
+
+# Requêtes partagées avec les routes asynchrones (routers/async_tasks.py)
+def build_task_list_query(owner_id: int, params: TaskListParams, dialect: Optional[str] = None):
+    sort_column = SORT_COLUMNS[params.sort]
+    descending = params.order == "desc"
+    ordering = (sort_order(sort_column, descending, dialect), Task.id.desc() if descending else Task.id)
+    query = select(Task).where(Task.owner_id == owner_id)
+
+    if params.status is not None:
+        query = query.where(Task.status == params.status)
+    if params.created_after is not None:
+        query = query.where(Task.created_at >= params.created_after)
+    if params.created_before is not None:
+        query = query.where(Task.created_at < params.created_before)
+    if params.title_prefix:
+        query = query.where(title_prefix_range(params.title_prefix))
+
+    if params.cursor:
+        value, task_id = decode_cursor(params.cursor, params.sort, params.order)
+        conditions = keyset_after(sort_column, value, task_id, descending, dialect)
+        if params.sort == "status" and params.status is not None:
+            # Tri sur le statut filtré : le curseur porte ce même statut, seules
+            # les égalités peuvent suivre (les autres intervalles sont vides)
+            conditions = conditions[:1]
+        if len(conditions) == 1:
+            query = query.where(conditions[0])
+        else:
+            # Un OR entre les intervalles ferait parcourir l'index depuis le
+            # début : chacun est lu à part (limit lignes au plus), puis fusionné
+            page = union_all(*(
+                query.with_only_columns(Task.id).where(condition)
+                .order_by(*ordering).limit(params.limit).subquery().select()
+                for condition in conditions
+            )).subquery()
+            query = select(Task).where(Task.id.in_(select(page.c.id)))
+    else:
+        query = query.offset(params.skip)
+
+    query = query.order_by(*ordering)
+    if params.include_owner:
+        query = query.options(selectinload(Task.owner))
+    return query.limit(params.limit)
+
+def build_task_page(response: Response, tasks: List[Task], params: TaskListParams):
+    if tasks and len(tasks) == params.limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(tasks[-1], params.sort, params.order)
+    if not params.include_owner:
+        return [TaskSummary.model_validate(task) for task in tasks]
+    return tasks
+
+# ETag des lectures : version des tâches de l'utilisateur, incrémentée à
+# chaque écriture. Elle doit être lue avant les tâches : une écriture
+# intercalée rend l'ETag périmé (simple rechargement), jamais les données.
+def tasks_version_query(owner_id: int):
+    return select(User.tasks_version).where(User.id == owner_id)
+
+def tasks_etag(owner_id: int, version: int, task_id: Optional[int] = None) -> str:
+    # Avec task_id : ETag d'une seule tâche, distinct de celui de la liste
+    if task_id is not None:
+        return f'"tasks-{owner_id}-{version}-{task_id}"'
+    return f'"tasks-{owner_id}-{version}"'
+
+def not_modified(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """Pose l'ETag ; renvoie une réponse 304 si le client a déjà cette version."""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is None:
+        return None
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    if "*" in candidates or etag in candidates:
+        return Response(status_code=304, headers=dict(response.headers))
+    return None
+
+def owned_task_query(task_id: int, owner_id: int):
+    return select(Task).where(Task.id == task_id, Task.owner_id == owner_id)
+
+def insert_tasks(db: Session, owner_id: int, tasks: List[TaskCreate]) -> List[Task]:
+    """Insère plusieurs tâches en un seul INSERT multi-lignes (sans commit)."""
+    if not tasks:
+        return []
+    # Version (ETag, GET /tasks/changes) prise avant l'écriture : elle verrouille
+    # la ligne users et ordonne les écritures concurrentes du même utilisateur
+    version = bump_tasks_version(db, [owner_id]).get(owner_id, 0)
+    rows = [{**task.model_dump(), "owner_id": owner_id, "version": version} for task in tasks]
+    # render_nulls : un seul lot même si certaines descriptions sont nulles.
+    # sort_by_parameter_order forcerait un INSERT par ligne sous SQLite ; les
+    # id auto-incrémentés suffisent à retrouver l'ordre d'insertion.
+    created = sorted(db.scalars(
+        insert(Task).returning(Task),
+        rows,
+        execution_options={"render_nulls": True},
+    ), key=lambda task: task.id)
+    # Compteurs par statut, dans la même transaction que l'insertion
+    deltas = {}
+    for task in created:
+        deltas[(owner_id, task.status)] = deltas.get((owner_id, task.status), 0) + 1
+    add_task_counts(db, deltas)
+    return created
+
+def selection_criteria(owner_id: int, selection: TaskSelection) -> list:
+    """Traduit une sélection (ids et/ou filtres) en clauses WHERE."""
+    criteria = []
+    if selection.ids is not None:
+        if len(selection.ids) > BULK_MAX_IDS:
+            raise HTTPException(status_code=413, detail=f"Too many ids (max {BULK_MAX_IDS})")
+        criteria.append(Task.id.in_(selection.ids))
+    if selection.status is not None:
+        criteria.append(Task.status == selection.status)
+    if selection.created_after is not None:
+        criteria.append(Task.created_at >= selection.created_after)
+    if selection.created_before is not None:
+        criteria.append(Task.created_at < selection.created_before)
+    if not criteria:
+        raise HTTPException(status_code=400, detail="No selection criteria provided")
+    return [Task.owner_id == owner_id, *criteria]
+
+# Flux de changements (GET /tasks/events) : publiés après le commit, pour
+# que les abonnés ne voient jamais une écriture annulée ensuite.
+def publish_tasks(owner_id: int, event_type: str, tasks: List[TaskSummary]):
+    if tasks:
+        get_broker().publish(owner_id, event_type, {
+            "tasks": [task.model_dump(mode="json") for task in tasks]
+        })
+
+def publish_deleted(owner_id: int, task_ids: List[int]):
+    if task_ids:
+        get_broker().publish(owner_id, "deleted", {"ids": task_ids})
+
 @router.post("/", response_model=TaskSchema)
 def create_task(
     task: TaskCreate, 
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     db_task = Task(**task.dict(), owner_id=current_user.id)
     db.add(db_task)
     db.commit()
     db.refresh(db_task)
+    publish_tasks(current_user.id, "created", [TaskSummary.model_validate(db_task)])
     return db_task
 
-@router.get("/", response_model=List[TaskSchema])
+@router.post("/bulk", response_model=TaskBulkCreateResult)
+def create_tasks_bulk(
+    tasks: List[Any] = Body(...),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """
+    Crée jusqu'à 1000 tâches en une seule transaction.
+
+    Chaque élément est validé séparément : les éléments invalides sont
+    renvoyés dans `errors` (avec leur index) sans empêcher l'insertion
+    des autres.
+    """
+    if len(tasks) > BULK_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Too many items (max {BULK_MAX_ITEMS})")
+
+    valid_tasks, errors = [], []
+    for index, item in enumerate(tasks):
+        try:
+            valid_tasks.append(TaskCreate.model_validate(item))
+        except ValidationError as e:
+            errors.append(BulkItemError(index=index, errors=validation_errors(e)))
+
+    # Sérialisé avant le commit, qui expirerait chaque objet inséré
+    created = [
+        TaskSummary.model_validate(task)
+        for task in insert_tasks(db, current_user.id, valid_tasks)
+    ]
+    db.commit()
+    publish_tasks(current_user.id, "created", created)
+    return TaskBulkCreateResult(created=created, errors=errors)
+
+@router.patch("/bulk", response_model=TaskBulkResult)
+def update_tasks_bulk(
+    bulk_update: TaskBulkUpdate,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """
+    Met à jour en un seul UPDATE toutes les tâches sélectionnées par `ids`
+    et/ou par filtre (`status`, `created_after`, `created_before`).
+    """
+    changes = bulk_update.changes.model_dump(exclude_unset=True)
+    if not changes:
+        raise HTTPException(status_code=400, detail="No fields to update")
+    criteria = selection_criteria(current_user.id, bulk_update)
+    # Version d'abord : le verrou sur la ligne users doit précéder la lecture
+    # des lignes décomptées, sinon une écriture concurrente les modifie entre-temps
+    version = bump_tasks_version(db, [current_user.id]).get(current_user.id, 0)
+    if "status" in changes:
+        # Compteurs : retire les anciens statuts, puis ajoute le nouveau
+        subtract_task_counts(db, criteria)
+    # UPDATE ensembliste, sans charger les lignes : le flux d'événements ne
+    # reçoit que leur nombre (sélection par filtre non bornée)
+    affected = db.execute(
+        update(Task)
+        .where(*criteria)
+        .values(**changes, version=version)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if "status" in changes:
+        add_task_counts(db, {(current_user.id, changes["status"]): affected})
+    db.commit()
+    if affected:
+        # Comme pour l'import : les clients se resynchronisent via GET /tasks/changes
+        get_broker().publish(current_user.id, "bulk_updated", {"count": affected})
+    return TaskBulkResult(affected=affected)
+
+@router.delete("/bulk", response_model=TaskBulkResult)
+def delete_tasks_bulk(
+    selection: TaskSelection,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Supprime en un seul DELETE toutes les tâches sélectionnées."""
+    criteria = selection_criteria(current_user.id, selection)
+    # Verrou (version) avant le décompte, comme pour PATCH /tasks/bulk
+    version = bump_tasks_version(db, [current_user.id]).get(current_user.id, 0)
+    subtract_task_counts(db, criteria)
+    deleted_ids = list(db.scalars(
+        delete(Task)
+        .where(*criteria)
+        .returning(Task.id)
+        .execution_options(synchronize_session=False)
+    ))
+    add_tombstones(db, current_user.id, version, deleted_ids)
+    db.commit()
+    publish_deleted(current_user.id, deleted_ids)
+    return TaskBulkResult(affected=len(deleted_ids))
+
+@router.get("/", response_model=List[Union[TaskSchema, TaskSummary]])
 def read_tasks(
-    skip: int = 0, 
-    limit: int = 100,
+    request: Request,
+    response: Response,
+    params: TaskListParams = Depends(),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
-    tasks = db.query(Task).filter(Task.owner_id == current_user.id).offset(skip).limit(limit).all()
-    return tasks
+    """
+    Liste les tâches, filtrées et triées côté base.
+
+    Filtres : `status`, `created_after` / `created_before` et `title_prefix`
+    (préfixe sensible à la casse). Tri : `sort` (created_at, title, status)
+    et `order` (asc, desc), l'id départageant les égalités.
+
+    La pagination recommandée passe par `cursor` : chaque page pleine renvoie
+    l'en-tête `X-Next-Cursor` à repasser tel quel (avec les mêmes `sort` et
+    `order`) pour obtenir la suivante, à coût constant quelle que soit la
+    profondeur. `skip` reste supporté pour compatibilité mais est ignoré
+    lorsqu'un curseur est fourni.
+
+    `include_owner=false` omet l'objet `owner` imbriqué (seul `owner_id`
+    est renvoyé) ; sinon les propriétaires sont chargés en une seule
+    requête plutôt qu'une par tâche.
+
+    La réponse porte un ETag qui change à chaque écriture sur les tâches de
+    l'utilisateur : avec `If-None-Match`, une liste inchangée renvoie 304
+    sans exécuter la requête de liste.
+    """
+    version = db.scalar(tasks_version_query(current_user.id))
+    cached = not_modified(request, response, tasks_etag(current_user.id, version))
+    if cached is not None:
+        return cached
+    tasks = db.scalars(
+        build_task_list_query(current_user.id, params, db.get_bind().dialect.name)
+    ).all()
+    return build_task_page(response, tasks, params)
+
+@router.get("/search", response_model=List[TaskSearchHit])
+def search(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """
+    Recherche plein texte dans le titre et la description des tâches.
+
+    Tous les mots doivent apparaître (en préfixe : `rap` trouve « rapport »),
+    les résultats sont triés par pertinence (`score` décroissant).
+    """
+    return [
+        TaskSearchHit(**TaskSummary.model_validate(task).model_dump(), score=score)
+        for task, score in search_tasks(db, current_user.id, q, limit)
+    ]
+
+@router.get("/stats", response_model=TaskStats)
+def read_task_stats(
+    days: int = Query(30, ge=1, le=366),
+    exact: bool = False,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """
+    Statistiques calculées en base : nombre de tâches par statut (depuis les
+    compteurs maintenus à chaque écriture, ou recompté si `exact=true`),
+    créations par jour sur les `days` derniers jours et percentiles d'âge
+    (p50, p90, p99, en secondes).
+
+    Seuls les comptes par statut sont à coût constant ; les percentiles
+    parcourent l'index jusqu'à leur rang et croissent avec le nombre de tâches.
+    """
+    return task_stats(db, current_user.id, days, exact)
+
+@router.get("/changes", response_model=TaskChanges)
+def read_task_changes(
+    since: Optional[str] = None,
+    limit: int = Query(500, ge=1, le=5000),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """
+    Synchronisation incrémentale : tâches créées ou modifiées (`changed`) et
+    identifiants supprimés (`deleted`) depuis le jeton `since`, dans l'ordre
+    des écritures.
+
+    Sans `since`, renvoie l'état complet. Repasser `next_since` à l'appel
+    suivant ; tant que `has_more` est vrai, d'autres changements attendent.
+    """
+    return read_changes(db, current_user.id, since, limit)
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+@router.get("/export")
+def export(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """
+    Exporte toutes les tâches de l'utilisateur en NDJSON (une tâche par
+    ligne) ou en CSV, en flux : les lignes sont lues et écrites par lots,
+    sans charger l'ensemble en mémoire.
+    """
+    return StreamingResponse(
+        export_tasks(db.get_bind(), current_user.id, format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="tasks.{format}"'},
+    )
+
+async def upload_chunks(upload: UploadFile):
+    while chunk := await upload.read(64 * 1024):
+        yield chunk
+
+@router.post("/import", response_model=TaskImportResult)
+async def import_tasks_upload(
+    request: Request,
+    format: Optional[Literal["ndjson", "csv"]] = None,
+    batch_size: int = Query(settings.import_batch_size, ge=1, le=IMPORT_MAX_BATCH_SIZE),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """
+    Importe des tâches depuis un fichier NDJSON ou CSV (avec en-tête),
+    envoyé tel quel dans le corps ou dans le champ `file` d'un formulaire
+    multipart. Le format est déduit du type de contenu ou de l'extension
+    si `format` n'est pas précisé.
+
+    Le corps est lu et validé au fil de l'eau, et les tâches valides sont
+    insérées par transactions de `batch_size` : les lignes invalides sont
+    comptées dans `rejected` sans bloquer les autres.
+    """
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("multipart/form-data"):
+        # Fichier mis en tampon sur disque par Starlette au-delà de 1 Mo
+        form = await request.form()
+        upload = form.get("file")
+        if not isinstance(upload, UploadFile):
+            raise HTTPException(status_code=400, detail="Missing file field")
+        chunks = upload_chunks(upload)
+        content_type = upload.content_type or ""
+        filename = upload.filename or ""
+    else:
+        chunks = request.stream()
+        filename = ""
+    if format is None:
+        is_csv = content_type.startswith("text/csv") or filename.lower().endswith(".csv")
+        format = "csv" if is_csv else "ndjson"
+
+    lines = decoded_lines(chunks)
+    records = csv_records(lines) if format == "csv" else ndjson_records(lines)
+    return await import_tasks(db, current_user.id, records, batch_size)
+
+@router.get("/events")
+async def task_events(
+    request: Request,
+    last_event_id: Optional[int] = Header(None),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """
+    Flux Server-Sent Events des changements de tâches de l'utilisateur.
+
+    Événements `created` et `updated` (`{"tasks": [...]}`), `deleted`
+    (`{"ids": [...]}`), `bulk_updated` (`{"count": n}`, PATCH /tasks/bulk)
+    et `imported` (`{"count": n}`, un par lot de POST /tasks/import) ; ces
+    deux derniers sans le détail des tâches : recharger la liste.
+    À la reconnexion, l'en-tête `Last-Event-ID` rejoue
+    les événements manqués ; un événement `reset` signale que l'historique
+    ne suffit plus et qu'il faut recharger GET /tasks/.
+    """
+    return StreamingResponse(
+        task_event_stream(request, current_user.id, last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 @router.get("/{task_id}", response_model=TaskSchema)
 def read_task(
     task_id: int, 
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
-    task = db.query(Task).filter(Task.id == task_id, Task.owner_id == current_user.id).first()
+    version = db.scalar(tasks_version_query(current_user.id))
+    # Tâche cherchée avant le 304 : un id inconnu reste une 404, quel que soit If-None-Match
+    task = db.scalar(owned_task_query(task_id, current_user.id))
     if task is None:
         raise HTTPException(status_code=404, detail="Task not found")
+    cached = not_modified(request, response, tasks_etag(current_user.id, version, task_id))
+    if cached is not None:
+        return cached
     return task
 
 @router.put("/{task_id}", response_model=TaskSchema)
@@ -46,9 +569,9 @@ def update_task(
     task_id: int,
     task_update: TaskUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
-    task = db.query(Task).filter(Task.id == task_id, Task.owner_id == current_user.id).first()
+    task = db.scalar(owned_task_query(task_id, current_user.id))
     if task is None:
         raise HTTPException(status_code=404, detail="Task not found")
     
@@ -58,18 +581,20 @@ def update_task(
     
     db.commit()
     db.refresh(task)
+    publish_tasks(current_user.id, "updated", [TaskSummary.model_validate(task)])
     return task
 
 @router.delete("/{task_id}")
 def delete_task(
     task_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
-    task = db.query(Task).filter(Task.id == task_id, Task.owner_id == current_user.id).first()
+    task = db.scalar(owned_task_query(task_id, current_user.id))
     if task is None:
         raise HTTPException(status_code=404, detail="Task not found")
     
     db.delete(task)
     db.commit()
+    publish_deleted(current_user.id, [task_id])
     return {"message": "Task deleted successfully"}
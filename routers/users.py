@@ -4,13 +4,18 @@ from sqlalchemy.orm import Session
 from datetime import timedelta
 
 from database import get_db, User
-from schemas import UserCreate, User as UserSchema, Token
+from schemas import UserCreate, User as UserSchema, Principal, Token, TokenRefresh
 from auth import (
     get_password_hash, 
     authenticate_user, 
     create_access_token,
     ACCESS_TOKEN_EXPIRE_MINUTES,
-    get_user_by_email
+    get_user_by_email,
+    get_current_principal,
+    revoke_tokens,
+    token_claims,
+    issue_refresh_token,
+    rotate_refresh_token
 )
 
 router = APIRouter(prefix="/users", tags=["users"])
@@ -50,6 +55,33 @@ def login_for_access_token(
         )
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
+        data=token_claims(user), expires_delta=access_token_expires
     )
-    return {"access_token": access_token, "token_type": "bearer"}
+    refresh_token = issue_refresh_token(db, user.id)
+    db.commit()
+    return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
+
+@router.post("/token/refresh", response_model=Token)
+def refresh_access_token(body: TokenRefresh, db: Session = Depends(get_db)):
+    """
+    Renouvelle l'access token sans mot de passe (ni bcrypt) : le refresh
+    token fourni est consommé et remplacé par celui de la réponse.
+    """
+    user, refresh_token = rotate_refresh_token(db, body.refresh_token)
+    access_token = create_access_token(
+        data=token_claims(user),
+        expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES),
+    )
+    db.commit()
+    return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
+
+@router.post("/token/revoke")
+def revoke_access_tokens(
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Révoque tous les tokens déjà émis pour l'utilisateur courant."""
+    user = db.get(User, current_user.id)
+    revoke_tokens(db, user)
+    db.commit()
+    return {"message": "Tokens revoked"}
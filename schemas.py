@@ -1,6 +1,6 @@
-from pydantic import BaseModel
-from datetime import datetime
-from typing import Optional
+from pydantic import BaseModel, ValidationError, field_validator
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
 
 # Schémas pour les utilisateurs
 class UserBase(BaseModel):
@@ -25,24 +25,103 @@ class TaskBase(BaseModel):
 class TaskCreate(TaskBase):
     pass
 
+def reject_null(value):
+    # Champ facultatif, mais un null explicite écrirait NULL dans une colonne requise
+    if value is None:
+        raise ValueError("must not be null")
+    return value
+
 class TaskUpdate(BaseModel):
     title: Optional[str] = None
     description: Optional[str] = None
     status: Optional[str] = None
 
-class Task(TaskBase):
+    _not_null = field_validator("title", "status")(reject_null)
+
+class TaskSummary(TaskBase):
     id: int
     created_at: datetime
     owner_id: int
-    owner: User
+    updated_at: Optional[datetime] = None
+    version: int = 0
     
     class Config:  # Gardons l'ancienne syntaxe
         from_attributes = True
 
+class Task(TaskSummary):
+    owner: User
+
+class TaskSearchHit(TaskSummary):
+    score: float
+
+# Opérations en masse
+class BulkItemError(BaseModel):
+    index: int
+    errors: List[Dict[str, Any]]
+
+def validation_errors(error: ValidationError) -> List[Dict[str, Any]]:
+    return [
+        {"loc": list(detail["loc"]), "msg": detail["msg"], "type": detail["type"]}
+        for detail in error.errors()
+    ]
+
+class TaskBulkCreateResult(BaseModel):
+    created: List[TaskSummary]
+    errors: List[BulkItemError]
+
+class TaskImportResult(BaseModel):
+    accepted: int
+    rejected: int
+    # Premières erreurs seulement (voir importer.IMPORT_MAX_ERRORS)
+    errors: List[BulkItemError]
+
+class TaskSelection(BaseModel):
+    ids: Optional[List[int]] = None
+    status: Optional[str] = None
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+
+    _not_null = field_validator("status")(reject_null)
+
+class TaskBulkUpdate(TaskSelection):
+    changes: TaskUpdate
+
+class TaskBulkResult(BaseModel):
+    affected: int
+
+# Synchronisation incrémentale
+class TaskChanges(BaseModel):
+    changed: List[TaskSummary]
+    deleted: List[int]
+    next_since: str
+    has_more: bool
+
+# Statistiques
+class DailyCount(BaseModel):
+    day: date
+    count: int
+
+class TaskStats(BaseModel):
+    total: int
+    by_status: Dict[str, int]
+    created_per_day: List[DailyCount]
+    age_percentiles: Dict[str, float]  # secondes
+
 # Schéma pour l'authentification
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
+
+class TokenRefresh(BaseModel):
+    refresh_token: str
 
 class TokenData(BaseModel):
-    email: Optional[str] = None
\ No newline at end of file
+    email: Optional[str] = None
+    user_id: Optional[int] = None
+    version: Optional[int] = None
+
+class Principal(BaseModel):
+    """Identité portée par un token valide, sans chargement de l'utilisateur."""
+    id: int
+    email: str
\ No newline at end of file
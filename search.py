@@ -0,0 +1,58 @@
+import re
+from typing import List, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import column, func, literal_column, select, table
+from sqlalchemy.orm import Session
+
+from database import POSTGRES_SEARCH_VECTOR, Task
+
+SEARCH_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+tasks_fts = table("tasks_fts", column("rowid"))
+
+def search_terms(q: str) -> List[str]:
+    """Mots de la requête utilisateur, débarrassés de la syntaxe FTS."""
+    return SEARCH_TOKEN.findall(q.lower())
+
+def build_search_query(dialect: str, owner_id: int, terms: List[str], limit: int):
+    """
+    Requête de recherche classée par pertinence : tous les mots doivent être
+    présents, le dernier pouvant n'être que le début d'un mot indexé.
+    """
+    if dialect == "sqlite":
+        # Seul le dernier mot (en cours de saisie) est recherché en préfixe :
+        # les préfixes courts élargissent fortement les listes à fusionner.
+        words = " ".join([f'"{term}"' for term in terms[:-1]] + [f'"{terms[-1]}"*'])
+        match = f'owner_id : "{int(owner_id)}" AND {{title description}} : ({words})'
+        # Poids bm25 : titre, description, owner_id (ignoré)
+        rank = func.bm25(literal_column("tasks_fts"), 2.0, 1.0, 0.0)
+        return (
+            select(Task, (-rank).label("score"))
+            .join(tasks_fts, tasks_fts.c.rowid == Task.id)
+            .where(literal_column("tasks_fts").op("MATCH")(match), Task.owner_id == owner_id)
+            .order_by(rank, Task.id)
+            .limit(limit)
+        )
+    if dialect == "postgresql":
+        vector = literal_column(POSTGRES_SEARCH_VECTOR)
+        query = func.to_tsquery(
+            "simple", " & ".join(terms[:-1] + [f"{terms[-1]}:*"])
+        )
+        rank = func.ts_rank(vector, query)
+        return (
+            select(Task, rank.label("score"))
+            .where(vector.op("@@")(query), Task.owner_id == owner_id)
+            .order_by(rank.desc(), Task.id)
+            .limit(limit)
+        )
+    raise HTTPException(
+        status_code=501, detail=f"Full-text search is not supported on '{dialect}'"
+    )
+
+def search_tasks(db: Session, owner_id: int, q: str, limit: int = 20) -> List[Tuple[Task, float]]:
+    terms = search_terms(q)
+    if not terms:
+        return []
+    query = build_search_query(db.get_bind().dialect.name, owner_id, terms, limit)
+    return [(task, score) for task, score in db.execute(query)]
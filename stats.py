@@ -0,0 +1,83 @@
+import math
+from datetime import datetime, time, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from database import Task, TaskCounter
+
+AGE_PERCENTILES = {"p50": 0.5, "p90": 0.9, "p99": 0.99}
+
+def status_counts(db: Session, owner_id: int, exact: bool = False) -> Dict[str, int]:
+    """
+    Nombre de tâches par statut : lu dans task_counters (quelques lignes par
+    utilisateur, quel que soit le nombre de tâches), ou recompté par
+    GROUP BY sur l'index (owner_id, status) si `exact`.
+    """
+    if exact:
+        query = (
+            select(Task.status, func.count())
+            .where(Task.owner_id == owner_id, Task.status.is_not(None))
+            .group_by(Task.status)
+        )
+    else:
+        query = select(TaskCounter.status, TaskCounter.task_count).where(
+            TaskCounter.owner_id == owner_id, TaskCounter.task_count > 0
+        )
+    return {status: count for status, count in db.execute(query)}
+
+def created_per_day(db: Session, owner_id: int, days: int, now: datetime) -> List[dict]:
+    """Histogramme des créations des `days` derniers jours (jours vides inclus)."""
+    first_day = now.date() - timedelta(days=days - 1)
+    start = datetime.combine(first_day, time.min)
+    day = func.date(Task.created_at)
+    rows = db.execute(
+        select(day, func.count())
+        .where(
+            Task.owner_id == owner_id,
+            Task.created_at >= start,
+            Task.created_at < start + timedelta(days=days),
+        )
+        .group_by(day)
+    )
+    # SQLite renvoie le jour sous forme de chaîne, PostgreSQL sous forme de date
+    counts = {str(value): count for value, count in rows}
+    return [
+        {"day": first_day + timedelta(days=i), "count": counts.get(str(first_day + timedelta(days=i)), 0)}
+        for i in range(days)
+    ]
+
+def age_percentiles(db: Session, owner_id: int, total: int, now: datetime) -> Dict[str, float]:
+    """
+    Percentiles d'âge (en secondes) par rang : chaque percentile est une
+    lecture à décalage sur l'index (owner_id, created_at), sans charger
+    les tâches. Le décalage reste un parcours de l'index jusqu'au rang :
+    coût proportionnel au nombre de tâches, contrairement aux comptes.
+    """
+    percentiles = {}
+    for name, fraction in AGE_PERCENTILES.items():
+        if total <= 0:
+            break
+        rank = max(math.ceil(fraction * total) - 1, 0)
+        created_at: Optional[datetime] = db.scalar(
+            select(Task.created_at)
+            .where(Task.owner_id == owner_id, Task.created_at.is_not(None))
+            .order_by(Task.created_at.desc())
+            .offset(rank)
+            .limit(1)
+        )
+        if created_at is not None:
+            percentiles[name] = round((now - created_at).total_seconds(), 3)
+    return percentiles
+
+def task_stats(db: Session, owner_id: int, days: int = 30, exact: bool = False) -> dict:
+    now = datetime.utcnow()
+    by_status = status_counts(db, owner_id, exact)
+    total = sum(by_status.values())
+    return {
+        "total": total,
+        "by_status": by_status,
+        "created_per_day": created_per_day(db, owner_id, days, now),
+        "age_percentiles": age_percentiles(db, owner_id, total, now),
+    }
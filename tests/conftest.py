@@ -1,12 +1,12 @@
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from main import app
 from database import get_db, Base
-from auth import get_password_hash
+from auth import get_password_hash, token_state_cache, user_cache
 
 # Base de données en mémoire pour les tests
 SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
@@ -31,11 +31,65 @@ app.dependency_overrides[get_db] = override_get_db
 def client():
     # Créer les tables pour chaque test
     Base.metadata.create_all(bind=engine)
+    user_cache.clear()
+    token_state_cache.clear()
     with TestClient(app) as c:
         yield c
     # Nettoyer après chaque test
     Base.metadata.drop_all(bind=engine)
 
+@pytest.fixture
+def db_session(client):
+    """Session sur la base de test"""
+    db = TestingSessionLocal()
+    yield db
+    db.close()
+
+@pytest.fixture
+def query_counter():
+    """Liste des requêtes SQL exécutées sur la base de test"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+@pytest.fixture
+def async_client(tmp_path):
+    """Client pour les routes asynchrones (AsyncSession + aiosqlite)"""
+    from fastapi import FastAPI
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from database import get_async_db
+    from routers import async_users, async_tasks
+
+    database_path = tmp_path / "async.db"
+    sync_engine = create_engine(f"sqlite:///{database_path}")
+    Base.metadata.create_all(bind=sync_engine)
+    sync_engine.dispose()
+
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{database_path}")
+    AsyncTestingSessionLocal = async_sessionmaker(
+        bind=async_engine, autoflush=False, expire_on_commit=False
+    )
+
+    async def override_get_async_db():
+        async with AsyncTestingSessionLocal() as db:
+            yield db
+
+    async_app = FastAPI()
+    async_app.include_router(async_users.router)
+    async_app.include_router(async_tasks.router)
+    async_app.dependency_overrides[get_async_db] = override_get_async_db
+
+    user_cache.clear()
+    token_state_cache.clear()
+    with TestClient(async_app) as c:
+        yield c
+        c.portal.call(async_engine.dispose)
+
 @pytest.fixture
 def test_user():
     """Utilisateur de test"""
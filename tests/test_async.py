@@ -0,0 +1,103 @@
+import pytest
+
+@pytest.fixture
+def authenticated_async_client(async_client, test_user):
+    """Client asynchrone avec utilisateur connecté"""
+    response = async_client.post("/users/register", json=test_user)
+    assert response.status_code == 200
+
+    response = async_client.post("/users/token", data={
+        "username": test_user["email"],
+        "password": test_user["password"]
+    })
+    assert response.status_code == 200
+    token = response.json()["access_token"]
+
+    async_client.headers.update({"Authorization": f"Bearer {token}"})
+    return async_client
+
+def test_async_register_duplicate(async_client, test_user):
+    """Test inscription en double via les routes asynchrones"""
+    async_client.post("/users/register", json=test_user)
+
+    response = async_client.post("/users/register", json=test_user)
+
+    assert response.status_code == 400
+    assert "Email already registered" in response.json()["detail"]
+
+def test_async_login_wrong_password(async_client, test_user):
+    """Test connexion avec mauvais mot de passe via les routes asynchrones"""
+    async_client.post("/users/register", json=test_user)
+
+    response = async_client.post("/users/token", data={
+        "username": test_user["email"],
+        "password": "wrongpassword"
+    })
+
+    assert response.status_code == 401
+
+def test_async_task_crud(authenticated_async_client, test_user):
+    """Test cycle complet création / lecture / mise à jour / suppression"""
+    client = authenticated_async_client
+
+    response = client.post("/tasks/", json={"title": "Tâche async", "description": "Desc"})
+    assert response.status_code == 200
+    created_task = response.json()
+    assert created_task["owner"]["email"] == test_user["email"]
+
+    response = client.get(f"/tasks/{created_task['id']}")
+    assert response.status_code == 200
+    assert response.json()["title"] == "Tâche async"
+
+    response = client.put(f"/tasks/{created_task['id']}", json={"status": "done"})
+    assert response.status_code == 200
+    assert response.json()["status"] == "done"
+    assert response.json()["description"] == "Desc"
+
+    response = client.delete(f"/tasks/{created_task['id']}")
+    assert response.status_code == 200
+
+    response = client.get(f"/tasks/{created_task['id']}")
+    assert response.status_code == 404
+
+def test_async_list_tasks_pagination(authenticated_async_client):
+    """Test liste paginée par curseur via les routes asynchrones"""
+    client = authenticated_async_client
+    for i in range(3):
+        client.post("/tasks/", json={"title": f"Tâche {i}"})
+
+    response = client.get("/tasks/", params={"limit": 2})
+    assert [task["title"] for task in response.json()] == ["Tâche 0", "Tâche 1"]
+    assert "owner" in response.json()[0]
+
+    cursor = response.headers["X-Next-Cursor"]
+    response = client.get("/tasks/", params={"limit": 2, "cursor": cursor, "include_owner": "false"})
+    assert [task["title"] for task in response.json()] == ["Tâche 2"]
+    assert "owner" not in response.json()[0]
+
+def test_sync_fallback_routes():
+    """Test que seules les routes sans équivalent async sont reprises"""
+    from fastapi import FastAPI
+    from main import include_sync_fallback
+    from routers import tasks, async_tasks
+
+    app = FastAPI()
+    include_sync_fallback(app, tasks.router, async_tasks.router)
+
+    routes = {(route.path, method) for route in app.routes for method in route.methods}
+    assert ("/tasks/bulk", "POST") in routes
+    assert ("/tasks/", "GET") not in routes
+    assert ("/tasks/{task_id}", "GET") not in routes
+
+def test_async_get_tasks_etag(authenticated_async_client):
+    """Test ETag / 304 sur les routes asynchrones"""
+    client = authenticated_async_client
+    client.post("/tasks/", json={"title": "Tâche async"})
+    etag = client.get("/tasks/").headers["ETag"]
+
+    assert client.get("/tasks/", headers={"If-None-Match": etag}).status_code == 304
+
+    client.post("/tasks/", json={"title": "Autre"})
+    response = client.get("/tasks/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
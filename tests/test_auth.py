@@ -64,3 +64,311 @@ def test_login_nonexistent_user(client):
     response = client.post("/users/token", data=login_data)
     
     assert response.status_code == 401
+
+def legacy_token(email):
+    """Token émis avant les claims uid / ver : résolu par get_current_user (user_cache)"""
+    from auth import create_access_token
+    return create_access_token(data={"sub": email})
+
+def test_current_user_cached(authenticated_client, query_counter, test_user):
+    """Test que l'utilisateur authentifié est servi depuis le cache"""
+    from auth import user_cache
+
+    authenticated_client.headers["Authorization"] = f"Bearer {legacy_token(test_user['email'])}"
+    authenticated_client.get("/tasks/")
+    misses = user_cache.misses
+    query_counter.clear()
+
+    response = authenticated_client.get("/tasks/")
+
+    assert response.status_code == 200
+    assert user_cache.misses == misses
+    assert user_cache.hits >= 1
+    # Seule la version des tâches (ETag) est lue dans users
+    assert all("users.tasks_version" in statement for statement in query_counter if "FROM users" in statement)
+
+def test_current_user_cached_async(async_client, test_user):
+    """Test que l'utilisateur authentifié est servi depuis le cache (routes asynchrones)"""
+    from auth import user_cache
+
+    async_client.post("/users/register", json=test_user)
+    async_client.headers["Authorization"] = f"Bearer {legacy_token(test_user['email'])}"
+    assert async_client.get("/tasks/").status_code == 200
+    misses = user_cache.misses
+
+    response = async_client.get("/tasks/")
+
+    assert response.status_code == 200
+    assert user_cache.misses == misses
+    assert user_cache.get(test_user["email"]) is not None
+
+def test_current_user_cache_invalidated_on_change(authenticated_client, db_session, test_user):
+    """Test invalidation du cache quand l'utilisateur est modifié"""
+    from auth import user_cache
+    from database import User
+
+    authenticated_client.headers["Authorization"] = f"Bearer {legacy_token(test_user['email'])}"
+    authenticated_client.get("/tasks/")
+    assert user_cache.get(test_user["email"]) is not None
+
+    user = db_session.query(User).filter(User.email == test_user["email"]).first()
+    user.is_active = False
+    db_session.commit()
+
+    assert user_cache.get(test_user["email"]) is None
+
+def test_token_state_cached(authenticated_client, query_counter):
+    """Test que le token est validé sans requête sur users une fois l'état en cache"""
+    from auth import token_state_cache
+
+    authenticated_client.get("/tasks/")
+    misses = token_state_cache.misses
+    query_counter.clear()
+
+    response = authenticated_client.get("/tasks/")
+
+    assert response.status_code == 200
+    assert token_state_cache.misses == misses
+    assert token_state_cache.hits >= 1
+    # Seule la version des tâches (ETag) est lue dans users
+    assert all("users.tasks_version" in statement for statement in query_counter if "FROM users" in statement)
+
+def test_token_state_cache_invalidated_on_change(authenticated_client, db_session, test_user):
+    """Test invalidation de l'état du token quand l'utilisateur est modifié"""
+    from auth import token_state_cache
+    from database import User
+
+    authenticated_client.get("/tasks/")
+    user = db_session.query(User).filter(User.email == test_user["email"]).first()
+    assert token_state_cache.get(user.id) is not None
+
+    user.is_active = False
+    db_session.commit()
+
+    assert token_state_cache.get(user.id) is None
+    assert authenticated_client.get("/tasks/").status_code == 401
+
+def test_current_user_does_not_block_event_loop(authenticated_client, monkeypatch):
+    """Test que des requêtes authentifiées concurrentes s'exécutent en parallèle"""
+    import asyncio
+    import time
+    import httpx
+    import auth
+    from main import app
+
+    delay = 0.3
+    concurrency = 5
+    original_load_token_state = auth.load_token_state
+
+    def slow_load_token_state(db, user_id):
+        time.sleep(delay)
+        return original_load_token_state(db, user_id)
+
+    monkeypatch.setattr(auth, "load_token_state", slow_load_token_state)
+    headers = {"Authorization": authenticated_client.headers["Authorization"]}
+
+    async def run_concurrently():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            start = time.perf_counter()
+            responses = await asyncio.gather(*[
+                client.get("/tasks/", headers=headers) for _ in range(concurrency)
+            ])
+            return time.perf_counter() - start, responses
+
+    elapsed, responses = asyncio.run(run_concurrently())
+
+    assert all(response.status_code == 200 for response in responses)
+    # En série il faudrait au moins concurrency * delay secondes
+    assert elapsed < concurrency * delay / 2
+
+def test_password_hasher_process_pool():
+    """Test hachage et vérification bcrypt dans le pool de processus"""
+    from hashing import PasswordHasher
+
+    hasher = PasswordHasher(max_workers=1, max_pending=4)
+    try:
+        hashed = hasher.hash("secret")
+        assert hasher.verify("secret", hashed) is True
+        assert hasher.verify("wrong", hashed) is False
+        assert hasher.snapshot()["completed"] == 3
+        assert hasher.snapshot()["pending"] == 0
+    finally:
+        hasher.shutdown()
+
+def test_password_hasher_single_pool(monkeypatch):
+    """Test premiers appels simultanés : un seul pool créé, arrêté avec l'application"""
+    import threading
+    import time
+    import hashing
+    from fastapi.testclient import TestClient
+    from main import app
+
+    created = []
+
+    class FakeExecutor:
+        def __init__(self, **kwargs):
+            time.sleep(0.05)  # élargit la fenêtre de course
+            created.append(self)
+
+        def shutdown(self, wait=True):
+            self.stopped = True
+
+    monkeypatch.setattr(hashing, "ProcessPoolExecutor", FakeExecutor)
+    hasher = hashing.PasswordHasher(max_workers=2, max_pending=4)
+    threads = [threading.Thread(target=hasher._get_executor) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(created) == 1
+
+    monkeypatch.setattr(hashing, "password_hasher", hasher)
+    monkeypatch.setattr("main.password_hasher", hasher)
+    with TestClient(app):
+        pass
+    assert created[0].stopped is True
+
+def test_password_hasher_admission_control():
+    """Test rejet immédiat quand la file du pool est pleine"""
+    import time
+    from hashing import HasherSaturated, PasswordHasher
+
+    hasher = PasswordHasher(max_workers=1, max_pending=2)
+    try:
+        futures = [hasher.submit(time.sleep, 0.3) for _ in range(2)]
+        assert hasher.snapshot()["queued"] == 1
+        with pytest.raises(HasherSaturated) as excinfo:
+            hasher.submit(time.sleep, 0.3)
+        assert excinfo.value.retry_after >= 1
+        for future in futures:
+            future.result()
+        assert hasher.snapshot()["rejected"] == 1
+        hasher.submit(time.sleep, 0).result()
+    finally:
+        hasher.shutdown()
+
+def test_login_rejected_when_hashing_saturated(client, test_user, monkeypatch):
+    """Test 429 avec Retry-After quand le pool de hachage est saturé"""
+    from hashing import password_hasher
+
+    client.post("/users/register", json=test_user)
+    monkeypatch.setattr(password_hasher, "pending", password_hasher.max_pending)
+
+    response = client.post("/users/token", data={
+        "username": test_user["email"],
+        "password": test_user["password"]
+    })
+
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    assert client.get("/health").json()["password_hashing"]["rejected"] >= 1
+
+def test_token_carries_user_id_and_version(authenticated_client, query_counter):
+    """Test claims uid / ver et validation sans chargement de l'utilisateur"""
+    from jose import jwt
+    from auth import SECRET_KEY, ALGORITHM, token_state_cache
+
+    token = authenticated_client.headers["Authorization"].split()[1]
+    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    assert payload["ver"] == 0
+    token_state_cache.clear()
+    query_counter.clear()
+
+    assert authenticated_client.get("/tasks/").status_code == 200
+    user_queries = [q for q in query_counter if "FROM users" in q and "tasks_version" not in q]
+    # Une seule lecture par clé primaire, sans hashed_password ni email
+    assert len(user_queries) == 1
+    assert "users.token_version" in user_queries[0]
+    assert "hashed_password" not in user_queries[0]
+
+def test_revoke_tokens(authenticated_client, test_user):
+    """Test révocation : les anciens tokens sont refusés, les nouveaux acceptés"""
+    assert authenticated_client.get("/tasks/").status_code == 200
+
+    response = authenticated_client.post("/users/token/revoke")
+    assert response.status_code == 200
+
+    assert authenticated_client.get("/tasks/").status_code == 401
+    response = authenticated_client.post("/users/token", data={
+        "username": test_user["email"],
+        "password": test_user["password"]
+    })
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    assert authenticated_client.get("/tasks/", headers=headers).status_code == 200
+
+def test_legacy_token_without_user_id(authenticated_client, test_user):
+    """Test compatibilité des tokens émis sans claim uid"""
+    from auth import create_access_token
+
+    token = create_access_token({"sub": test_user["email"]})
+    response = authenticated_client.get("/tasks/", headers={"Authorization": f"Bearer {token}"})
+
+    assert response.status_code == 200
+
+def login_tokens(client, test_user):
+    client.post("/users/register", json=test_user)
+    response = client.post("/users/token", data={
+        "username": test_user["email"],
+        "password": test_user["password"]
+    })
+    assert response.status_code == 200
+    return response.json()
+
+def test_refresh_token_rotation(client, test_user, monkeypatch):
+    """Test renouvellement sans bcrypt et rotation du refresh token"""
+    from hashing import password_hasher
+
+    tokens = login_tokens(client, test_user)
+    assert tokens["refresh_token"]
+
+    def no_bcrypt(*args):
+        raise AssertionError("bcrypt ne doit pas être appelé")
+
+    monkeypatch.setattr(password_hasher, "submit", no_bcrypt)
+    response = client.post("/users/token/refresh", json={"refresh_token": tokens["refresh_token"]})
+
+    assert response.status_code == 200
+    renewed = response.json()
+    assert renewed["refresh_token"] != tokens["refresh_token"]
+    headers = {"Authorization": f"Bearer {renewed['access_token']}"}
+    assert client.get("/tasks/", headers=headers).status_code == 200
+
+    response = client.post("/users/token/refresh", json={"refresh_token": renewed["refresh_token"]})
+    assert response.status_code == 200
+
+def test_refresh_token_reuse_revokes_family(client, test_user):
+    """Test réutilisation d'un refresh token : toute la famille est révoquée"""
+    tokens = login_tokens(client, test_user)
+    renewed = client.post(
+        "/users/token/refresh", json={"refresh_token": tokens["refresh_token"]}
+    ).json()
+
+    response = client.post("/users/token/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 401
+
+    response = client.post("/users/token/refresh", json={"refresh_token": renewed["refresh_token"]})
+    assert response.status_code == 401
+
+def test_refresh_token_invalid_or_revoked(client, test_user):
+    """Test refresh token inconnu ou révoqué avec les access tokens"""
+    response = client.post("/users/token/refresh", json={"refresh_token": "inconnu"})
+    assert response.status_code == 401
+
+    tokens = login_tokens(client, test_user)
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    assert client.post("/users/token/revoke", headers=headers).status_code == 200
+
+    response = client.post("/users/token/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 401
+
+def test_refresh_token_stored_as_hmac(client, db_session, test_user):
+    """Test que seule l'empreinte HMAC du refresh token est stockée"""
+    from auth import hash_refresh_token
+    from database import RefreshToken
+
+    tokens = login_tokens(client, test_user)
+
+    stored = db_session.query(RefreshToken).one()
+    assert stored.token_hash == hash_refresh_token(tokens["refresh_token"])
+    assert stored.token_hash != tokens["refresh_token"]
@@ -1,12 +1,12 @@
 import pytest
 from sqlalchemy.orm import Session
-from database import User, Task, get_db
+from database import User, Task
 from auth import get_password_hash
 import uuid
 
-def test_user_model(client):
+def test_user_model(db_session):
     """Test du modèle User"""
-    db = next(get_db())
+    db = db_session
     
     # Email unique pour éviter les conflits
     unique_email = f"test-{uuid.uuid4()}@db.com"
@@ -24,9 +24,9 @@ def test_user_model(client):
     assert user.is_active is True
     assert len(user.tasks) == 0
 
-def test_task_model(client):
+def test_task_model(db_session):
     """Test du modèle Task avec relation"""
-    db = next(get_db())
+    db = db_session
     
     # Email unique pour ce test aussi
     unique_email = f"test-task-{uuid.uuid4()}@db.com"
@@ -59,3 +59,161 @@ def test_task_model(client):
     db.refresh(user)
     assert len(user.tasks) == 1
     assert user.tasks[0].title == "Test Task"
+
+def test_engine_options_postgres(monkeypatch):
+    """Test options du pool et timeout de requête pour PostgreSQL"""
+    from config import settings
+    from database import engine_options, InstrumentedQueuePool, InstrumentedAsyncQueuePool
+
+    monkeypatch.setattr(settings, "db_pool_size", 20)
+    monkeypatch.setattr(settings, "db_max_overflow", 5)
+    monkeypatch.setattr(settings, "db_statement_timeout_ms", 2000)
+
+    options = engine_options("postgresql://user:pass@db/tasks")
+    assert options["poolclass"] is InstrumentedQueuePool
+    assert options["pool_size"] == 20
+    assert options["max_overflow"] == 5
+    assert options["connect_args"] == {"options": "-c statement_timeout=2000"}
+
+    options = engine_options("postgresql+asyncpg://user:pass@db/tasks", is_async=True)
+    assert options["poolclass"] is InstrumentedAsyncQueuePool
+    assert options["connect_args"] == {"server_settings": {"statement_timeout": "2000"}}
+
+def test_engine_options_sqlite_memory():
+    """Test SQLite en mémoire : pas d'options de pool"""
+    from database import engine_options
+
+    assert "pool_size" not in engine_options("sqlite://")
+    assert "pool_size" not in engine_options("sqlite:///:memory:")
+    assert "pool_size" in engine_options("sqlite:///./tasks.db")
+
+def test_database_url_normalized():
+    """Test conversion du schéma postgres:// et des URL asynchrones"""
+    from database import normalize_database_url, to_async_url
+
+    assert normalize_database_url("postgres://u:p@db/tasks") == "postgresql://u:p@db/tasks"
+    assert to_async_url("postgresql://u:p@db/tasks") == "postgresql+asyncpg://u:p@db/tasks"
+    assert to_async_url("sqlite:///./tasks.db") == "sqlite+aiosqlite:///./tasks.db"
+
+def test_pool_metrics(tmp_path):
+    """Test des compteurs du pool de connexions"""
+    from sqlalchemy import text
+    from database import create_db_engine, pool_metrics
+
+    pool_metrics.reset()
+    db_engine = create_db_engine(f"sqlite:///{tmp_path / 'pool.db'}")
+
+    with db_engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        assert pool_metrics.snapshot()["checked_out"] == 1
+        assert db_engine.pool.checkedout() == 1
+
+    snapshot = pool_metrics.snapshot()
+    assert snapshot["connects"] == 1
+    assert snapshot["checkouts"] == 1
+    assert snapshot["checked_out"] == 0
+    assert snapshot["wait_seconds_total"] >= 0
+    db_engine.dispose()
+
+def test_pool_metrics_concurrent(tmp_path):
+    """Test compteurs du pool sous checkouts concurrents : aucun incrément perdu"""
+    import threading
+    from sqlalchemy import text
+    from database import create_db_engine, pool_metrics
+
+    pool_metrics.reset()
+    db_engine = create_db_engine(f"sqlite:///{tmp_path / 'pool.db'}")
+
+    def work():
+        for _ in range(200):
+            with db_engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    snapshot = pool_metrics.snapshot()
+    assert snapshot["checkouts"] == snapshot["checkins"] == 1600
+    assert snapshot["checked_out"] == 0
+    db_engine.dispose()
+
+def test_sqlite_production_profile(tmp_path):
+    """Test profil SQLite production : lectures non bloquées pendant les écritures"""
+    import threading
+    import time
+    from sqlalchemy import create_engine, func, select, text
+    from sqlalchemy.orm import sessionmaker
+    from database import Base, SQLiteWriter, apply_sqlite_pragmas
+
+    db_engine = create_engine(
+        f"sqlite:///{tmp_path / 'wal.db'}", connect_args={"check_same_thread": False}
+    )
+    apply_sqlite_pragmas(db_engine)
+    WalSessionLocal = sessionmaker(autoflush=False, bind=db_engine)
+    SQLiteWriter().install(WalSessionLocal)
+    Base.metadata.create_all(bind=db_engine)
+
+    with db_engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+
+    with WalSessionLocal() as db:
+        owner = User(email="wal@db.com", hashed_password="x")
+        db.add(owner)
+        db.commit()
+        owner_id = owner.id
+
+    # Un écrivain garde un verrou exclusif pendant 300 ms (gros commit)
+    write_started = threading.Event()
+
+    def long_write():
+        connection = db_engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            cursor.execute("BEGIN EXCLUSIVE")
+            cursor.execute("INSERT INTO tasks (title, owner_id) VALUES ('long', ?)", (owner_id,))
+            write_started.set()
+            time.sleep(0.3)
+            connection.commit()
+        finally:
+            connection.close()
+
+    writer = threading.Thread(target=long_write)
+    writer.start()
+    write_started.wait()
+    latencies = []
+    with WalSessionLocal() as db:
+        for _ in range(10):
+            start = time.perf_counter()
+            db.scalar(select(func.count()).select_from(Task))
+            latencies.append(time.perf_counter() - start)
+            db.rollback()
+    writer.join()
+    # En mode journal classique chaque lecture attendrait la fin du commit
+    assert max(latencies) < 0.1
+
+    # Écritures concurrentes sérialisées par l'écrivain unique
+    errors = []
+
+    def write_burst():
+        try:
+            for i in range(20):
+                with WalSessionLocal() as db:
+                    db.add(Task(title=f"t{i}", owner_id=owner_id))
+                    db.commit()
+        except Exception as e:
+            errors.append(e)
+
+    writers = [threading.Thread(target=write_burst) for _ in range(4)]
+    for burst in writers:
+        burst.start()
+    for burst in writers:
+        burst.join()
+
+    assert errors == []
+    with WalSessionLocal() as db:
+        assert db.scalar(select(func.count()).select_from(Task)) == 81
+    db_engine.dispose()
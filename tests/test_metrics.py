@@ -0,0 +1,128 @@
+import re
+import threading
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from metrics import Counter, Histogram, MetricsMiddleware, instrument_engine
+
+def sample(text: str, name: str, **labels) -> float:
+    """Valeur d'une série dans le format texte Prometheus (0 si absente)."""
+    label_text = ",".join(f'{key}="{value}"' for key, value in labels.items())
+    pattern = re.escape(name + (f"{{{label_text}}}" if labels else "")) + r" (\S+)$"
+    match = re.search(pattern, text, re.MULTILINE)
+    return float(match.group(1)) if match else 0.0
+
+def test_metrics_endpoint(authenticated_client, db_session):
+    """Test /metrics : requêtes par route, authentification, bcrypt, SQL, sérialisation"""
+    # main.py instrumente database.engine ; ici, le moteur de test
+    instrument_engine(db_session.get_bind())
+    before = authenticated_client.get("/metrics").text
+
+    authenticated_client.post("/tasks/", json={"title": "Tâche"})
+    authenticated_client.get("/tasks/")
+    authenticated_client.get("/tasks/")
+    authenticated_client.get("/tasks/999999")
+    authenticated_client.post("/users/token", data={"username": "test@example.com", "password": "testpassword123"})
+
+    response = authenticated_client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    after = response.text
+
+    def delta(name, **labels):
+        return sample(after, name, **labels) - sample(before, name, **labels)
+
+    assert delta("http_requests_total", method="GET", route="/tasks/", status="200") == 2
+    # Modèle de la route, pas l'URL
+    assert delta("http_requests_total", method="GET", route="/tasks/{task_id}", status="404") == 1
+    assert delta("http_request_duration_seconds_count", method="GET", route="/tasks/") == 2
+    assert delta("http_request_duration_seconds_bucket", method="GET", route="/tasks/", le="+Inf") == 2
+    assert delta("auth_duration_seconds_count", step="get_current_principal") == 4
+    assert delta("password_hash_duration_seconds_count", operation="verify") == 1
+    assert delta("db_query_duration_seconds_count", operation="select") > 0
+    assert delta("db_query_duration_seconds_count", operation="insert") > 0
+    assert delta("response_serialization_duration_seconds_count") >= 4
+    assert "# TYPE http_request_duration_seconds histogram" in after
+
+def test_metrics_server_errors():
+    """Test erreurs 5xx comptées, y compris les exceptions non gérées"""
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/metrics-test/boom")
+    def boom():
+        raise RuntimeError("boom")
+
+    from metrics import REGISTRY
+    with TestClient(app, raise_server_exceptions=False) as client:
+        before = REGISTRY.render()
+        assert client.get("/metrics-test/boom").status_code == 500
+        assert client.get("/metrics-test/absent").status_code == 404
+        after = REGISTRY.render()
+
+    labels = {"method": "GET", "route": "/metrics-test/boom"}
+    assert sample(after, "http_request_errors_total", **labels) - sample(before, "http_request_errors_total", **labels) == 1
+    assert sample(after, "http_requests_total", **labels, status="500") - sample(before, "http_requests_total", **labels, status="500") == 1
+    # Chemin inconnu : une seule série, quelle que soit l'URL
+    assert sample(after, "http_requests_total", method="GET", route="unmatched", status="404") >= 1
+
+def test_metrics_sharded_counters():
+    """Test compteurs par thread : aucun incrément perdu, histogramme cumulatif"""
+    counter = Counter("test_total", "Test.", ("kind",))
+    histogram = Histogram("test_seconds", "Test.", buckets=(0.1, 1.0))
+
+    def work():
+        for _ in range(10000):
+            counter.labels("a").inc()
+        histogram.labels().observe(0.05)
+        histogram.labels().observe(0.5)
+        histogram.labels().observe(5.0)
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert counter.labels("a").value() == 80000
+    text = "\n".join(counter.render() + histogram.render())
+    assert sample(text, "test_total", kind="a") == 80000
+    assert sample(text, "test_seconds_bucket", le="0.1") == 8
+    assert sample(text, "test_seconds_bucket", le="1.0") == 16
+    assert sample(text, "test_seconds_bucket", le="+Inf") == 24
+    assert sample(text, "test_seconds_count") == 24
+    assert sample(text, "test_seconds_sum") == pytest.approx(8 * 5.55)
+
+def test_request_profiling(authenticated_client, db_session, monkeypatch):
+    """Test profilage : en-têtes Server-Timing / X-Query-Count et détail des requêtes SQL"""
+    from config import settings
+    from profiling import profile_queries
+
+    response = authenticated_client.get("/tasks/")
+    assert "server-timing" not in response.headers
+    assert "x-query-count" not in response.headers
+
+    monkeypatch.setattr(settings, "request_profiling", True)
+    # main.py profile database.engine ; ici, le moteur de test
+    profile_queries(db_session.get_bind())
+    authenticated_client.post("/tasks/", json={"title": "Tâche"})
+
+    response = authenticated_client.get("/tasks/")
+    assert response.status_code == 200
+    timing = {
+        entry.split(";")[0]: entry for entry in response.headers["server-timing"].split(", ")
+    }
+    assert set(timing) == {"auth", "db", "serialize", "total"}
+    query_count = int(response.headers["x-query-count"])
+    assert f'desc="{query_count} queries"' in timing["db"]
+
+    profile = authenticated_client.get(f"/debug/profiles/{response.headers['x-request-profile']}").json()
+    assert profile["method"] == "GET" and profile["path"] == "/tasks/"
+    assert profile["query_count"] == query_count == len(profile["statements"])
+    assert any("FROM tasks" in entry["statement"] for entry in profile["statements"])
+    assert set(profile["phases_ms"]) == {"auth", "db", "serialize"}
+
+    monkeypatch.setattr(settings, "request_profiling", False)
+    assert authenticated_client.get(f"/debug/profiles/{profile['id']}").status_code == 404
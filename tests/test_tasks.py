@@ -189,3 +189,1025 @@ def test_user_isolation(client, test_user):
     # User2 ne peut pas accéder à la tâche de User1
     response = client.get(f"/tasks/{user1_task['id']}")
     assert response.status_code == 404
+
+def test_get_tasks_cursor_pagination(authenticated_client):
+    """Test pagination par curseur sur GET /tasks/"""
+    for i in range(5):
+        authenticated_client.post("/tasks/", json={"title": f"Tâche {i}"})
+
+    titles = []
+    cursor = None
+    pages = 0
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = authenticated_client.get("/tasks/", params=params)
+        assert response.status_code == 200
+        titles.extend(task["title"] for task in response.json())
+        pages += 1
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    assert titles == [f"Tâche {i}" for i in range(5)]
+    assert pages == 3
+
+def test_get_tasks_skip_still_supported(authenticated_client):
+    """Test compatibilité de la pagination skip/limit"""
+    for i in range(3):
+        authenticated_client.post("/tasks/", json={"title": f"Tâche {i}"})
+
+    response = authenticated_client.get("/tasks/", params={"skip": 1, "limit": 1})
+
+    assert response.status_code == 200
+    assert [task["title"] for task in response.json()] == ["Tâche 1"]
+    assert "X-Next-Cursor" in response.headers
+
+def test_get_tasks_invalid_cursor(authenticated_client):
+    """Test curseur invalide"""
+    response = authenticated_client.get("/tasks/", params={"cursor": "pas-un-curseur"})
+
+    assert response.status_code == 400
+    assert "Invalid cursor" in response.json()["detail"]
+
+def test_get_tasks_query_count_constant(authenticated_client, query_counter):
+    """Test que le nombre de requêtes SQL ne dépend pas de la taille de la page"""
+    for i in range(2):
+        authenticated_client.post("/tasks/", json={"title": f"Tâche {i}"})
+    query_counter.clear()
+    response = authenticated_client.get("/tasks/")
+    assert len(response.json()) == 2
+    small_page_queries = len(query_counter)
+
+    for i in range(2, 20):
+        authenticated_client.post("/tasks/", json={"title": f"Tâche {i}"})
+    query_counter.clear()
+    response = authenticated_client.get("/tasks/")
+    assert len(response.json()) == 20
+    assert all(task["owner"]["email"] == "test@example.com" for task in response.json())
+
+    assert len(query_counter) == small_page_queries
+
+def test_get_tasks_without_owner(authenticated_client):
+    """Test liste des tâches sans l'objet owner imbriqué"""
+    authenticated_client.post("/tasks/", json={"title": "Tâche sans owner"})
+
+    response = authenticated_client.get("/tasks/", params={"include_owner": "false"})
+
+    assert response.status_code == 200
+    task = response.json()[0]
+    assert task["title"] == "Tâche sans owner"
+    assert "owner_id" in task
+    assert "owner" not in task
+
+def test_create_tasks_bulk(authenticated_client, query_counter):
+    """Test création en masse avec erreurs par élément"""
+    payload = [
+        {"title": "Tâche 1"},
+        {"description": "Sans titre"},
+        {"title": "Tâche 2", "status": "done"},
+        "pas un objet",
+    ]
+    query_counter.clear()
+
+    response = authenticated_client.post("/tasks/bulk", json=payload)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [task["title"] for task in data["created"]] == ["Tâche 1", "Tâche 2"]
+    assert data["created"][1]["status"] == "done"
+    assert [error["index"] for error in data["errors"]] == [1, 3]
+    assert data["errors"][0]["errors"][0]["loc"] == ["title"]
+    # Un seul INSERT pour tout le lot
+    assert len([q for q in query_counter if q.startswith("INSERT INTO tasks")]) == 1
+
+    response = authenticated_client.get("/tasks/")
+    assert len(response.json()) == 2
+
+def test_create_tasks_bulk_too_many(authenticated_client):
+    """Test limite du nombre d'éléments en masse"""
+    payload = [{"title": f"Tâche {i}"} for i in range(1001)]
+
+    response = authenticated_client.post("/tasks/bulk", json=payload)
+
+    assert response.status_code == 413
+
+def test_update_tasks_bulk_by_ids(authenticated_client, query_counter):
+    """Test mise à jour en masse par liste d'identifiants"""
+    response = authenticated_client.post("/tasks/bulk", json=[
+        {"title": f"Tâche {i}"} for i in range(3)
+    ])
+    ids = [task["id"] for task in response.json()["created"]]
+    query_counter.clear()
+
+    response = authenticated_client.patch("/tasks/bulk", json={
+        "ids": ids[:2], "changes": {"status": "done"}
+    })
+
+    assert response.status_code == 200
+    assert response.json()["affected"] == 2
+    assert len([q for q in query_counter if q.startswith("UPDATE tasks")]) == 1
+    assert not any(q.startswith("SELECT tasks") for q in query_counter)
+
+    statuses = {task["id"]: task["status"] for task in authenticated_client.get("/tasks/").json()}
+    assert statuses == {ids[0]: "done", ids[1]: "done", ids[2]: "todo"}
+
+def test_update_tasks_bulk_by_filter(authenticated_client):
+    """Test mise à jour en masse par filtre de statut"""
+    authenticated_client.post("/tasks/bulk", json=[
+        {"title": "A", "status": "in_progress"},
+        {"title": "B", "status": "in_progress"},
+        {"title": "C", "status": "todo"},
+    ])
+
+    response = authenticated_client.patch("/tasks/bulk", json={
+        "status": "in_progress", "changes": {"status": "done"}
+    })
+
+    assert response.json()["affected"] == 2
+
+def test_bulk_requires_criteria(authenticated_client):
+    """Test refus d'une opération en masse sans critère"""
+    response = authenticated_client.patch("/tasks/bulk", json={"changes": {"status": "done"}})
+    assert response.status_code == 400
+
+    response = authenticated_client.patch("/tasks/bulk", json={"ids": [1], "changes": {}})
+    assert response.status_code == 400
+
+    response = authenticated_client.request("DELETE", "/tasks/bulk", json={})
+    assert response.status_code == 400
+
+def test_bulk_rejects_null_fields(authenticated_client):
+    """Test null explicite refusé (422) pour title / status, en changement comme en filtre"""
+    task_id = authenticated_client.post("/tasks/", json={"title": "Tâche"}).json()["id"]
+
+    for changes in ({"status": None}, {"title": None}):
+        response = authenticated_client.patch("/tasks/bulk", json={"ids": [task_id], "changes": changes})
+        assert response.status_code == 422
+        response = authenticated_client.put(f"/tasks/{task_id}", json=changes)
+        assert response.status_code == 422
+    response = authenticated_client.request("DELETE", "/tasks/bulk", json={"ids": [task_id], "status": None})
+    assert response.status_code == 422
+
+    # La description reste effaçable
+    response = authenticated_client.patch("/tasks/bulk", json={"ids": [task_id], "changes": {"description": None}})
+    assert response.json()["affected"] == 1
+    assert authenticated_client.get(f"/tasks/{task_id}").json()["status"] == "todo"
+
+def test_delete_tasks_bulk(authenticated_client):
+    """Test suppression en masse par identifiants et par date"""
+    response = authenticated_client.post("/tasks/bulk", json=[
+        {"title": f"Tâche {i}"} for i in range(4)
+    ])
+    created = response.json()["created"]
+
+    response = authenticated_client.request("DELETE", "/tasks/bulk", json={
+        "ids": [created[0]["id"]]
+    })
+    assert response.json()["affected"] == 1
+
+    response = authenticated_client.request("DELETE", "/tasks/bulk", json={
+        "created_after": created[1]["created_at"]
+    })
+    assert response.json()["affected"] == 3
+    assert authenticated_client.get("/tasks/").json() == []
+
+def test_bulk_user_isolation(client):
+    """Test qu'une opération en masse ne touche que les tâches de l'utilisateur"""
+    tokens = []
+    for email in ("user1@test.com", "user2@test.com"):
+        client.post("/users/register", json={"email": email, "password": "pass123"})
+        response = client.post("/users/token", data={"username": email, "password": "pass123"})
+        tokens.append({"Authorization": f"Bearer {response.json()['access_token']}"})
+
+    response = client.post("/tasks/", json={"title": "Tâche de User1"}, headers=tokens[0])
+    task_id = response.json()["id"]
+
+    response = client.request("DELETE", "/tasks/bulk", json={"ids": [task_id]}, headers=tokens[1])
+    assert response.json()["affected"] == 0
+
+    response = client.get(f"/tasks/{task_id}", headers=tokens[0])
+    assert response.status_code == 200
+
+def test_get_tasks_filters(authenticated_client):
+    """Test filtres côté serveur sur GET /tasks/"""
+    created = authenticated_client.post("/tasks/bulk", json=[
+        {"title": "Rapport mensuel", "status": "done"},
+        {"title": "Rapport annuel", "status": "todo"},
+        {"title": "Réunion", "status": "todo"},
+    ]).json()["created"]
+
+    def titles(**params):
+        response = authenticated_client.get("/tasks/", params=params)
+        assert response.status_code == 200
+        return [task["title"] for task in response.json()]
+
+    assert titles(status="todo") == ["Rapport annuel", "Réunion"]
+    assert titles(title_prefix="Rapport") == ["Rapport mensuel", "Rapport annuel"]
+    assert titles(title_prefix="Rapport", status="todo") == ["Rapport annuel"]
+    assert titles(created_after=created[1]["created_at"]) == ["Rapport annuel", "Réunion"]
+    assert titles(created_before=created[1]["created_at"]) == ["Rapport mensuel"]
+
+def test_get_tasks_title_prefix_max_code_point(authenticated_client):
+    """Test préfixe finissant par U+10FFFF : pas d'erreur, intervalle correct"""
+    top = chr(0x10FFFF)
+    authenticated_client.post("/tasks/bulk", json=[
+        {"title": title} for title in ["a" + top + "x", "a" + top, "b", top + "z"]
+    ])
+
+    def titles(prefix):
+        response = authenticated_client.get("/tasks/", params={"title_prefix": prefix})
+        assert response.status_code == 200
+        return sorted(task["title"] for task in response.json())
+
+    assert titles("a" + top) == sorted(["a" + top + "x", "a" + top])
+    assert titles(top) == [top + "z"]
+
+def test_get_tasks_sort_with_cursor(authenticated_client):
+    """Test tri décroissant par titre avec pagination par curseur"""
+    authenticated_client.post("/tasks/bulk", json=[
+        {"title": title} for title in ["b", "d", "a", "c", "e"]
+    ])
+
+    titles = []
+    params = {"sort": "title", "order": "desc", "limit": 2}
+    while True:
+        response = authenticated_client.get("/tasks/", params=params)
+        titles.extend(task["title"] for task in response.json())
+        if "X-Next-Cursor" not in response.headers:
+            break
+        params["cursor"] = response.headers["X-Next-Cursor"]
+
+    assert titles == ["e", "d", "c", "b", "a"]
+
+    # Un curseur n'est valable que pour le tri qui l'a produit
+    response = authenticated_client.get("/tasks/", params={
+        "sort": "status", "cursor": params["cursor"]
+    })
+    assert response.status_code == 400
+
+def test_get_tasks_forged_cursor(authenticated_client):
+    """Test curseur forgé (valeur objet / liste, id non entier ou hors BIGINT) : 400, pas 500"""
+    import base64
+    import json
+
+    def forged(*payload):
+        return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+    for sort, value, task_id in [
+        ("title", {"a": 1}, 1),
+        ("status", [1, 2], 1),
+        ("title", "a", "1"),
+        ("title", "a", 1.5),
+        ("created_at", 12, 1),
+        ("created_at", "2024-01-01T00:00:00", 99999999999999999999999),
+        ("title", "a", -2 ** 63 - 1),
+    ]:
+        response = authenticated_client.get("/tasks/", params={
+            "sort": sort, "cursor": forged(sort, "asc", value, task_id)
+        })
+        assert response.status_code == 400, (sort, value, task_id)
+
+def test_task_list_cursor_null_values(db_session):
+    """Test pagination par curseur : les tâches au titre ou statut NULL ne sont pas sautées"""
+    from database import User, Task
+    from routers.tasks import TaskListParams, build_task_list_query, encode_cursor
+
+    user = User(email="nulls@example.com", hashed_password="x")
+    db_session.add(user)
+    db_session.commit()
+    db_session.add_all([
+        Task(title=title, status=status, owner_id=user.id)
+        for title, status in [("b", "todo"), (None, "done"), ("a", None), (None, None), ("c", "todo")]
+    ])
+    db_session.commit()
+    dialect = db_session.get_bind().dialect.name
+
+    for sort in ("title", "status"):
+        for order in ("asc", "desc"):
+            seen, cursor = [], None
+            while True:
+                params = TaskListParams(limit=2, cursor=cursor, include_owner=False, sort=sort, order=order)
+                page = db_session.scalars(build_task_list_query(user.id, params, dialect)).all()
+                seen.extend(task.id for task in page)
+                if len(page) < 2:
+                    break
+                cursor = encode_cursor(page[-1], sort, order)
+            assert sorted(seen) == sorted(set(seen)) and len(seen) == 5, (sort, order, seen)
+
+def test_get_tasks_invalid_sort(authenticated_client):
+    """Test tri non supporté"""
+    response = authenticated_client.get("/tasks/", params={"sort": "description"})
+    assert response.status_code == 422
+
+def test_task_list_queries_use_indexes(db_session):
+    """Test EXPLAIN : chaque tri, filtré ou non, avec ou sans curseur, parcourt un intervalle d'index"""
+    from datetime import datetime
+    from database import Task
+    from routers.tasks import TaskListParams, build_task_list_query, encode_cursor
+
+    connection = db_session.connection()
+    dialect = connection.dialect.name
+
+    def plan(**params):
+        query = build_task_list_query(1, TaskListParams(include_owner=False, **params), dialect)
+        compiled = query.compile(dialect=connection.dialect)
+        parameters = tuple(compiled.params[name] for name in compiled.positiontup)
+        details = [row[-1] for row in connection.exec_driver_sql(
+            f"EXPLAIN QUERY PLAN {compiled}", parameters
+        ).fetchall()]
+        assert not any(detail.startswith("SCAN tasks") for detail in details), (params, details)
+        assert not any("RIGHT PART OF ORDER BY" in detail for detail in details), (params, details)
+        return details
+
+    # Index attendu par tri, selon le filtre status
+    indexes = {
+        ("created_at", False): "ix_tasks_owner_created_id",
+        ("created_at", True): "ix_tasks_owner_status_created_id",
+        ("title", False): "ix_tasks_owner_title_id",
+        ("title", True): "ix_tasks_owner_status_title_id",
+        ("status", False): "ix_tasks_owner_status_id",
+        ("status", True): "ix_tasks_owner_status_id",
+    }
+    position = Task(id=7, title="Rap", status="todo", created_at=datetime(2024, 1, 1))
+    for (sort, filtered), index in indexes.items():
+        for order in ("asc", "desc"):
+            status = {"status": "todo"} if filtered else {}
+            prefix = "owner_id=? AND status=?" if filtered else "owner_id=?"
+            case = (sort, order, filtered)
+
+            # Première page : parcours de l'index dans l'ordre, sans tri
+            details = plan(sort=sort, order=order, **status)
+            assert f"SEARCH tasks USING INDEX {index} ({prefix})" in details, (case, details)
+            assert not any("TEMP B-TREE" in detail for detail in details), (case, details)
+
+            # Page suivante : égalités sur la valeur du curseur au-delà de son
+            # id, puis valeurs suivantes, chacune en intervalle d'index
+            cursor = encode_cursor(position, sort, order)
+            details = plan(sort=sort, order=order, cursor=cursor, **status)
+            after = "<" if order == "desc" else ">"
+            if sort == "status" and filtered:
+                # Statut fixé par le filtre : seules les égalités suivent
+                ranges = [f"{prefix} AND id{after}?"]
+            else:
+                ranges = [f"{prefix} AND {sort}=? AND id{after}?", f"{prefix} AND {sort}{after}?"]
+            for terms in ranges:
+                assert any(detail.endswith(f"{index} ({terms})") for detail in details), (case, terms, details)
+
+    # Filtres par intervalle : bornes dans l'index
+    for params, expected in [
+        ({"status": "todo", "created_after": datetime(2024, 1, 1)},
+         "ix_tasks_owner_status_created_id (owner_id=? AND status=? AND created_at>?)"),
+        ({"created_after": datetime(2024, 1, 1), "created_before": datetime(2025, 1, 1)},
+         "ix_tasks_owner_created_id (owner_id=? AND created_at>? AND created_at<?)"),
+        ({"title_prefix": "Rap", "sort": "title"},
+         "ix_tasks_owner_title_id (owner_id=? AND title>? AND title<?)"),
+        ({"title_prefix": "Rap", "status": "done", "sort": "title"},
+         "ix_tasks_owner_status_title_id (owner_id=? AND status=? AND title>? AND title<?)"),
+        # Préfixe avec le tri par défaut : intervalle du préfixe, puis tri des seules lignes retenues
+        ({"title_prefix": "Rap", "status": "done"},
+         "ix_tasks_owner_status_title_id (owner_id=? AND status=? AND title>? AND title<?)"),
+    ]:
+        details = plan(**params)
+        assert any(detail.endswith(expected) for detail in details), (params, details)
+
+def test_search_tasks(authenticated_client):
+    """Test recherche plein texte avec préfixes et classement"""
+    authenticated_client.post("/tasks/bulk", json=[
+        {"title": "Rapport mensuel", "description": "Chiffres du mois"},
+        {"title": "Réunion équipe", "description": "Préparer le rapport"},
+        {"title": "Courses", "description": "Pain, lait"},
+    ])
+
+    def titles(q):
+        response = authenticated_client.get("/tasks/search", params={"q": q})
+        assert response.status_code == 200
+        return [hit["title"] for hit in response.json()]
+
+    # Le titre pèse double (bm25 2.0 contre 1.0 pour la description) : mieux classé
+    assert titles("rapport") == ["Rapport mensuel", "Réunion équipe"]
+    assert titles("rap") == ["Rapport mensuel", "Réunion équipe"]
+    assert titles("reunion") == ["Réunion équipe"]
+    assert titles("rapport mois") == ["Rapport mensuel"]
+    assert titles("introuvable") == []
+    assert titles('"*') == []
+
+def test_search_index_follows_changes(authenticated_client):
+    """Test synchronisation de l'index après modification et suppression"""
+    task = authenticated_client.post("/tasks/", json={"title": "Ancien titre"}).json()
+
+    authenticated_client.put(f"/tasks/{task['id']}", json={"title": "Nouveau titre"})
+    response = authenticated_client.get("/tasks/search", params={"q": "ancien"})
+    assert response.json() == []
+    response = authenticated_client.get("/tasks/search", params={"q": "nouveau"})
+    assert [hit["id"] for hit in response.json()] == [task["id"]]
+
+    authenticated_client.request("DELETE", "/tasks/bulk", json={"ids": [task["id"]]})
+    response = authenticated_client.get("/tasks/search", params={"q": "nouveau"})
+    assert response.json() == []
+
+def test_search_user_isolation(client):
+    """Test que la recherche ne renvoie que les tâches de l'utilisateur"""
+    headers = []
+    for email in ("user1@test.com", "user2@test.com"):
+        client.post("/users/register", json={"email": email, "password": "pass123"})
+        response = client.post("/users/token", data={"username": email, "password": "pass123"})
+        headers.append({"Authorization": f"Bearer {response.json()['access_token']}"})
+
+    client.post("/tasks/", json={"title": "Secret"}, headers=headers[0])
+
+    response = client.get("/tasks/search", params={"q": "secret"}, headers=headers[1])
+    assert response.json() == []
+
+def test_search_query_postgres():
+    """Test requête de recherche générée pour PostgreSQL"""
+    from sqlalchemy.dialects import postgresql
+    from search import build_search_query
+
+    query = build_search_query("postgresql", 1, ["rap", "mois"], 20)
+    sql = str(query.compile(dialect=postgresql.dialect()))
+
+    assert "@@ to_tsquery" in sql
+    assert "to_tsvector('simple', coalesce(tasks.title, '')" in sql
+    assert "ts_rank" in sql
+
+def test_search_unsupported_dialect(authenticated_client, monkeypatch):
+    """Test recherche sur une base sans plein texte : 501, pas 500"""
+    import search
+
+    build = search.build_search_query
+    monkeypatch.setattr(
+        search, "build_search_query", lambda dialect, *args: build("mysql", *args)
+    )
+    response = authenticated_client.get("/tasks/search", params={"q": "rapport"})
+
+    assert response.status_code == 501
+    assert "not supported" in response.json()["detail"]
+
+def test_task_stats(authenticated_client, query_counter):
+    """Test statistiques : compteurs par statut tenus à jour à chaque écriture"""
+    ids = [
+        authenticated_client.post("/tasks/", json={"title": f"Tâche {i}"}).json()["id"]
+        for i in range(3)
+    ]
+    authenticated_client.put(f"/tasks/{ids[0]}", json={"status": "done"})
+    authenticated_client.delete(f"/tasks/{ids[1]}")
+    authenticated_client.post("/tasks/bulk", json=[
+        {"title": "A", "status": "in_progress"},
+        {"title": "B", "status": "in_progress"},
+        {"title": "C"},
+    ])
+    authenticated_client.patch("/tasks/bulk", json={
+        "status": "in_progress", "changes": {"status": "done"}
+    })
+    authenticated_client.request("DELETE", "/tasks/bulk", json={"ids": [ids[2]]})
+    query_counter.clear()
+
+    response = authenticated_client.get("/tasks/stats")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 4
+    assert data["by_status"] == {"done": 3, "todo": 1}
+    # Lecture des compteurs, sans GROUP BY sur les tâches
+    assert not any("GROUP BY tasks.status" in q for q in query_counter)
+
+    exact = authenticated_client.get("/tasks/stats", params={"exact": True}).json()
+    assert exact["by_status"] == data["by_status"]
+
+    assert len(data["created_per_day"]) == 30
+    assert data["created_per_day"][-1]["count"] == 4
+    assert sum(day["count"] for day in data["created_per_day"]) == 4
+    assert set(data["age_percentiles"]) == {"p50", "p90", "p99"}
+    assert all(age >= 0 for age in data["age_percentiles"].values())
+
+def test_task_counters_put_and_bulk_patch_interleaved(authenticated_client, db_session, test_user):
+    """Test compteurs : PATCH /tasks/bulk validé entre la lecture et l'écriture d'un PUT / DELETE"""
+    from sqlalchemy import event
+    from sqlalchemy.orm import Session
+    from database import Task
+    from routers.tasks import update_tasks_bulk
+    from schemas import Principal, TaskBulkUpdate
+
+    ids = [
+        authenticated_client.post("/tasks/", json={"title": f"Tâche {i}"}).json()["id"]
+        for i in range(3)
+    ]
+    owner_id = authenticated_client.get("/tasks/").json()[0]["owner_id"]
+    principal = Principal(id=owner_id, email=test_user["email"])
+    bind = db_session.get_bind()
+
+    def interleaved(request):
+        # La tâche est chargée (todo) ; un PATCH en masse la passe à done
+        # et valide avant que la requête ne prenne le verrou du propriétaire
+        pending = [True]
+
+        def bulk_patch(session, instance):
+            if isinstance(instance, Task) and pending:
+                pending.clear()
+                with Session(bind) as other:
+                    update_tasks_bulk(TaskBulkUpdate(ids=ids, changes={"status": "done"}), other, principal)
+
+        event.listen(Session, "loaded_as_persistent", bulk_patch)
+        try:
+            assert request().status_code == 200
+        finally:
+            event.remove(Session, "loaded_as_persistent", bulk_patch)
+
+    interleaved(lambda: authenticated_client.put(f"/tasks/{ids[0]}", json={"status": "in_progress"}))
+    authenticated_client.patch("/tasks/bulk", json={"ids": ids, "changes": {"status": "todo"}})
+    interleaved(lambda: authenticated_client.delete(f"/tasks/{ids[1]}"))
+
+    counted = authenticated_client.get("/tasks/stats").json()["by_status"]
+    exact = authenticated_client.get("/tasks/stats", params={"exact": True}).json()["by_status"]
+    assert counted == exact == {"done": 2}
+
+def test_task_stats_empty(authenticated_client):
+    """Test statistiques sans tâche"""
+    response = authenticated_client.get("/tasks/stats", params={"days": 7})
+
+    data = response.json()
+    assert data["total"] == 0
+    assert data["by_status"] == {}
+    assert [day["count"] for day in data["created_per_day"]] == [0] * 7
+    assert data["age_percentiles"] == {}
+
+def test_task_stats_percentiles(db_session):
+    """Test percentiles d'âge par rang"""
+    from datetime import datetime, timedelta
+    from database import User, Task
+    from stats import task_stats
+
+    user = User(email="stats@example.com", hashed_password="x")
+    db_session.add(user)
+    db_session.commit()
+    now = datetime.utcnow()
+    db_session.add_all([
+        Task(title=f"T{i}", owner_id=user.id, created_at=now - timedelta(days=i))
+        for i in range(100)
+    ])
+    db_session.commit()
+
+    stats = task_stats(db_session, user.id, days=10)
+
+    assert stats["total"] == 100
+    assert round(stats["age_percentiles"]["p50"] / 86400) == 49
+    assert round(stats["age_percentiles"]["p90"] / 86400) == 89
+    assert round(stats["age_percentiles"]["p99"] / 86400) == 98
+    assert [day["count"] for day in stats["created_per_day"]] == [1] * 10
+
+def test_get_tasks_etag_not_modified(authenticated_client, query_counter):
+    """Test ETag : liste inchangée servie en 304 sans requête de liste"""
+    authenticated_client.post("/tasks/", json={"title": "Tâche"})
+    response = authenticated_client.get("/tasks/")
+    etag = response.headers["ETag"]
+    query_counter.clear()
+
+    response = authenticated_client.get("/tasks/", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+    assert not any("FROM tasks" in q for q in query_counter)
+
+    task_id = authenticated_client.get("/tasks/").json()[0]["id"]
+    task_etag = authenticated_client.get(f"/tasks/{task_id}").headers["ETag"]
+    assert task_etag != etag
+    response = authenticated_client.get(f"/tasks/{task_id}", headers={"If-None-Match": task_etag})
+    assert response.status_code == 304
+    # L'ETag de la liste ne vaut pas pour une tâche
+    response = authenticated_client.get(f"/tasks/{task_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+
+def test_get_task_etag_missing_task(authenticated_client):
+    """Test ETag : une tâche inexistante renvoie 404 même avec un If-None-Match valide"""
+    authenticated_client.post("/tasks/", json={"title": "Tâche"})
+    etag = authenticated_client.get("/tasks/").headers["ETag"]
+
+    for if_none_match in (etag, "*", '"tasks-1-1-99999"'):
+        response = authenticated_client.get("/tasks/99999", headers={"If-None-Match": if_none_match})
+        assert response.status_code == 404
+
+def test_get_tasks_etag_changes_on_write(authenticated_client):
+    """Test ETag : chaque écriture (unitaire ou en masse) change la version"""
+    task_id = authenticated_client.post("/tasks/", json={"title": "Tâche"}).json()["id"]
+    writes = [
+        lambda: authenticated_client.put(f"/tasks/{task_id}", json={"title": "Renommée"}),
+        lambda: authenticated_client.post("/tasks/bulk", json=[{"title": "A"}]),
+        lambda: authenticated_client.patch("/tasks/bulk", json={"ids": [task_id], "changes": {"status": "done"}}),
+        lambda: authenticated_client.request("DELETE", "/tasks/bulk", json={"status": "done"}),
+        lambda: authenticated_client.post("/tasks/", json={"title": "B"}),
+    ]
+    etags = [authenticated_client.get("/tasks/").headers["ETag"]]
+    for write in writes:
+        assert write().status_code == 200
+        etags.append(authenticated_client.get("/tasks/").headers["ETag"])
+
+    assert len(set(etags)) == len(etags)
+    response = authenticated_client.get("/tasks/", headers={"If-None-Match": etags[0]})
+    assert response.status_code == 200
+    assert [task["title"] for task in response.json()] == ["A", "B"]
+
+def test_get_tasks_etag_user_isolation(client):
+    """Test ETag : les écritures d'un autre utilisateur ne changent pas la version"""
+    clients = {}
+    for email in ("alice@example.com", "bob@example.com"):
+        client.post("/users/register", json={"email": email, "password": "password123"})
+        token = client.post("/users/token", data={"username": email, "password": "password123"}).json()["access_token"]
+        clients[email] = {"Authorization": f"Bearer {token}"}
+
+    etag = client.get("/tasks/", headers=clients["alice@example.com"]).headers["ETag"]
+    client.post("/tasks/", json={"title": "Bob"}, headers=clients["bob@example.com"])
+
+    response = client.get("/tasks/", headers={**clients["alice@example.com"], "If-None-Match": etag})
+    assert response.status_code == 304
+
+def collect_events(owner_id, last_event_id=None, count=1, publish=None):
+    """Lit `count` messages du flux SSE (hors message `retry`)"""
+    import asyncio
+    from events import task_event_stream
+
+    class ConnectedRequest:
+        async def is_disconnected(self):
+            return False
+
+    async def run():
+        stream = task_event_stream(ConnectedRequest(), owner_id, last_event_id, heartbeat=0.05)
+        messages = []
+        try:
+            async for message in stream:
+                if message.startswith("retry:"):
+                    if publish is not None:
+                        # Publication depuis un autre thread, comme une route synchrone
+                        await asyncio.to_thread(publish)
+                    continue
+                messages.append(message)
+                if len(messages) == count:
+                    return messages
+        finally:
+            await stream.aclose()
+
+    return asyncio.run(asyncio.wait_for(run(), 5))
+
+def test_task_events_published_after_writes(authenticated_client, monkeypatch):
+    """Test événements created / updated / bulk_updated / deleted rejoués depuis Last-Event-ID"""
+    import json
+    import events
+
+    monkeypatch.setattr(events, "broker", events.InMemoryBroker(buffer_size=100))
+    task_id = authenticated_client.post("/tasks/", json={"title": "Tâche"}).json()["id"]
+    authenticated_client.put(f"/tasks/{task_id}", json={"status": "done"})
+    authenticated_client.post("/tasks/bulk", json=[{"title": "A"}, {"title": "B"}])
+    authenticated_client.patch("/tasks/bulk", json={"status": "todo", "changes": {"status": "in_progress"}})
+    authenticated_client.delete(f"/tasks/{task_id}")
+    owner_id = authenticated_client.get("/tasks/").json()[0]["owner_id"]
+
+    messages = collect_events(owner_id, last_event_id=0, count=5)
+
+    parsed = [dict(line.split(": ", 1) for line in message.strip().split("\n")) for message in messages]
+    assert [message["event"] for message in parsed] == ["created", "updated", "created", "bulk_updated", "deleted"]
+    assert [int(message["id"]) for message in parsed] == [1, 2, 3, 4, 5]
+    assert json.loads(parsed[1]["data"])["tasks"][0]["status"] == "done"
+    # Mise à jour groupée : nombre de tâches seul, sans leur contenu
+    assert json.loads(parsed[3]["data"]) == {"count": 2}
+    assert json.loads(parsed[4]["data"]) == {"ids": [task_id]}
+
+    # Reprise après le 3e événement : seuls les suivants sont rejoués
+    messages = collect_events(owner_id, last_event_id=3, count=2)
+    assert [message.split("\n")[0] for message in messages] == ["id: 4", "id: 5"]
+
+def test_task_events_live_and_isolated(monkeypatch):
+    """Test diffusion en direct, filtrée par utilisateur, publiée depuis un autre thread"""
+    import events
+
+    broker = events.InMemoryBroker(buffer_size=100)
+    monkeypatch.setattr(events, "broker", broker)
+
+    def publish():
+        broker.publish(2, "created", {"tasks": [{"title": "autre utilisateur"}]})
+        broker.publish(1, "deleted", {"ids": [7]})
+
+    messages = collect_events(1, count=1, publish=publish)
+
+    assert messages == ['id: 2\nevent: deleted\ndata: {"ids": [7]}\n\n']
+    assert broker.subscriber_count() == 0
+
+def test_task_events_reset_when_history_lost(monkeypatch):
+    """Test événement reset quand les événements manqués ne sont plus en mémoire"""
+    import events
+
+    broker = events.InMemoryBroker(buffer_size=2)
+    monkeypatch.setattr(events, "broker", broker)
+    for task_id in range(4):
+        broker.publish(1, "deleted", {"ids": [task_id]})
+
+    messages = collect_events(1, last_event_id=1, count=3)
+
+    assert messages[0].startswith("event: reset")
+    assert [message.split("\n")[0] for message in messages[1:]] == ["id: 3", "id: 4"]
+    # Id inconnu (redémarrage du serveur) : reset aussi
+    assert collect_events(1, last_event_id=99, count=1)[0].startswith("event: reset")
+    # Rien de manqué : simple battement de cœur
+    assert collect_events(1, last_event_id=4, count=1) == [": keepalive\n\n"]
+
+def test_task_events_requires_auth(client):
+    """Test flux d'événements sans authentification"""
+    response = client.get("/tasks/events")
+
+    assert response.status_code == 401
+
+def test_event_broker_interface():
+    """Test broker incomplet refusé dès l'instanciation"""
+    from events import EventBroker
+
+    class PublishOnly(EventBroker):
+        def publish(self, owner_id, event_type, data):
+            return {}
+
+    with pytest.raises(TypeError):
+        PublishOnly()
+
+def test_task_changes_since_token(authenticated_client):
+    """Test synchronisation incrémentale : modifications et suppressions depuis un jeton"""
+    created = authenticated_client.post("/tasks/bulk", json=[
+        {"title": f"Tâche {i}"} for i in range(3)
+    ]).json()["created"]
+    ids = [task["id"] for task in created]
+
+    response = authenticated_client.get("/tasks/changes")
+    assert response.status_code == 200
+    full = response.json()
+    assert [task["id"] for task in full["changed"]] == ids
+    assert full["deleted"] == []
+    assert full["has_more"] is False
+
+    authenticated_client.put(f"/tasks/{ids[0]}", json={"title": "Renommée"})
+    authenticated_client.delete(f"/tasks/{ids[1]}")
+    authenticated_client.request("DELETE", "/tasks/bulk", json={"ids": [ids[2]]})
+    new_id = authenticated_client.post("/tasks/", json={"title": "Nouvelle"}).json()["id"]
+
+    delta = authenticated_client.get("/tasks/changes", params={"since": full["next_since"]}).json()
+    assert [task["id"] for task in delta["changed"]] == [ids[0], new_id]
+    assert delta["changed"][0]["title"] == "Renommée"
+    assert delta["changed"][0]["updated_at"] is not None
+    assert delta["deleted"] == [ids[1], ids[2]]
+
+    empty = authenticated_client.get("/tasks/changes", params={"since": delta["next_since"]}).json()
+    assert empty == {"changed": [], "deleted": [], "next_since": delta["next_since"], "has_more": False}
+
+def test_task_changes_pagination(authenticated_client):
+    """Test pagination des changements, y compris au milieu d'une écriture en masse"""
+    authenticated_client.post("/tasks/bulk", json=[{"title": f"Tâche {i}"} for i in range(5)])
+    authenticated_client.patch("/tasks/bulk", json={"status": "todo", "changes": {"status": "done"}})
+
+    seen, since = [], None
+    while True:
+        params = {"limit": 2, **({"since": since} if since else {})}
+        page = authenticated_client.get("/tasks/changes", params=params).json()
+        seen.extend(task["id"] for task in page["changed"])
+        since = page["next_since"]
+        if not page["has_more"]:
+            break
+
+    assert len(seen) == 5 == len(set(seen))
+    response = authenticated_client.get("/tasks/changes", params={"since": "invalide"})
+    assert response.status_code == 400
+
+def test_task_changes_forged_token(authenticated_client):
+    """Test jeton forgé (flottant, hors BIGINT, booléen, chaîne) : 400, pas 500"""
+    import base64
+
+    for raw in [
+        "[1e999,1]", "[99999999999999999999999,1]", "[1,99999999999999999999999]",
+        "[1,-9223372036854775809]", "[true,1]", "[1,\"2\"]", "[1.5,1]", "[1]", "{}",
+    ]:
+        token = base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+        response = authenticated_client.get("/tasks/changes", params={"since": token})
+        assert response.status_code == 400, raw
+
+    token = base64.urlsafe_b64encode(b"[9223372036854775807,1]").decode().rstrip("=")
+    assert authenticated_client.get("/tasks/changes", params={"since": token}).status_code == 200
+
+def test_task_changes_user_isolation(client):
+    """Test synchronisation : seuls les changements de l'utilisateur sont renvoyés"""
+    headers = {}
+    for email in ("alice@example.com", "bob@example.com"):
+        client.post("/users/register", json={"email": email, "password": "password123"})
+        token = client.post("/users/token", data={"username": email, "password": "password123"}).json()["access_token"]
+        headers[email] = {"Authorization": f"Bearer {token}"}
+    since = client.get("/tasks/changes", headers=headers["alice@example.com"]).json()["next_since"]
+
+    task_id = client.post("/tasks/", json={"title": "Bob"}, headers=headers["bob@example.com"]).json()["id"]
+    client.delete(f"/tasks/{task_id}", headers=headers["bob@example.com"])
+
+    delta = client.get("/tasks/changes", params={"since": since}, headers=headers["alice@example.com"]).json()
+    assert delta["changed"] == [] and delta["deleted"] == []
+
+def test_task_changes_query_uses_indexes(db_session):
+    """Test EXPLAIN : la synchronisation parcourt les index (owner_id, version, ...)"""
+    from changes import build_changes_query
+
+    connection = db_session.connection()
+    query = build_changes_query(1, 10, 5, 100)
+    compiled = query.compile(dialect=connection.dialect)
+    parameters = tuple(compiled.params[name] for name in compiled.positiontup)
+    plan = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", parameters).fetchall()
+    details = [row[-1] for row in plan]
+
+    # Intervalle sur la version, pas seulement sur le propriétaire
+    assert any("ix_tasks_owner_version_id (owner_id=? AND version>?)" in detail for detail in details), details
+    assert any("ix_task_tombstones_owner_version_task (owner_id=? AND version>?)" in detail for detail in details), details
+    assert not any(detail.startswith("SCAN") and "tasks" in detail for detail in details), details
+
+def test_export_tasks_ndjson(authenticated_client):
+    """Test export NDJSON : une tâche par ligne"""
+    import json
+
+    authenticated_client.post("/tasks/bulk", json=[
+        {"title": "Tâche 1", "description": "Première"},
+        {"title": "Tâche 2", "status": "done"},
+    ])
+
+    response = authenticated_client.get("/tasks/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert response.headers["content-disposition"] == 'attachment; filename="tasks.ndjson"'
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["title"] for row in rows] == ["Tâche 1", "Tâche 2"]
+    assert rows[0]["description"] == "Première"
+    assert rows[1]["status"] == "done"
+
+def test_export_tasks_csv(authenticated_client):
+    """Test export CSV : en-tête puis une ligne par tâche"""
+    import csv
+    import io
+
+    authenticated_client.post("/tasks/", json={"title": "Virgule, \"guillemets\""})
+
+    response = authenticated_client.get("/tasks/export", params={"format": "csv"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 1
+    assert rows[0]["title"] == "Virgule, \"guillemets\""
+
+    response = authenticated_client.get("/tasks/export", params={"format": "xml"})
+    assert response.status_code == 422
+
+def test_export_tasks_user_isolation(client):
+    """Test export : seules les tâches de l'utilisateur sont exportées"""
+    headers = {}
+    for email in ("alice@example.com", "bob@example.com"):
+        client.post("/users/register", json={"email": email, "password": "password123"})
+        token = client.post("/users/token", data={"username": email, "password": "password123"}).json()["access_token"]
+        headers[email] = {"Authorization": f"Bearer {token}"}
+    client.post("/tasks/", json={"title": "Bob"}, headers=headers["bob@example.com"])
+
+    response = client.get("/tasks/export", headers=headers["alice@example.com"])
+    assert response.status_code == 200
+    assert response.text == ""
+
+def test_export_tasks_constant_memory(tmp_path):
+    """Test export : le pic mémoire ne dépend pas du nombre de tâches"""
+    import tracemalloc
+    from sqlalchemy import create_engine
+    from database import Base
+    from export import export_tasks
+
+    def export_peak(tasks):
+        engine = create_engine(f"sqlite:///{tmp_path / f'export_{tasks}.db'}")
+        Base.metadata.create_all(bind=engine)
+        connection = engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            cursor.execute("INSERT INTO users (id, email, hashed_password, is_active) VALUES (1, 'a@b.c', 'x', 1)")
+            cursor.executemany(
+                "INSERT INTO tasks (title, description, status, created_at, owner_id, version) "
+                "VALUES (?, 'description', 'todo', '2024-01-01 00:00:00', 1, 0)",
+                ((f"Tâche {i}",) for i in range(tasks)),
+            )
+            connection.commit()
+        finally:
+            connection.close()
+
+        tracemalloc.start()
+        lines = sum(chunk.count("\n") for chunk in export_tasks(engine, 1, "csv"))
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        engine.dispose()
+        assert lines == tasks + 1
+        return peak
+
+    # 1M lignes : voir benchmarks/export.py (trop long pour la suite de tests)
+    small, large = export_peak(5000), export_peak(50000)
+    assert large < small * 1.5 + 256 * 1024, (small, large)
+    assert large < 8 * 1024 * 1024
+
+def test_import_tasks_ndjson(authenticated_client):
+    """Test import NDJSON par lots : lignes valides insérées, invalides rejetées"""
+    body = "\n".join([
+        '{"title": "Tâche 1"}',
+        '{"title": "Tâche 2", "status": "done"}',
+        '{"description": "sans titre"}',
+        '',
+        '{"title": "Tâche 3", "description": "Troisième"}',
+        '{pas du json',
+        '{"title": "Tâche 4", "status": "done"}',
+    ])
+
+    response = authenticated_client.post(
+        "/tasks/import", params={"batch_size": 2}, content=body.encode(),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 200
+    result = response.json()
+    assert result["accepted"] == 4
+    assert result["rejected"] == 2
+    assert [error["index"] for error in result["errors"]] == [2, 4]
+    assert result["errors"][0]["errors"][0]["loc"] == ["title"]
+    assert result["errors"][1]["errors"][0]["type"] == "json_invalid"
+
+    tasks = authenticated_client.get("/tasks/", params={"limit": 100}).json()
+    assert [task["title"] for task in tasks] == ["Tâche 1", "Tâche 2", "Tâche 3", "Tâche 4"]
+    # Compteurs par statut tenus à jour par l'import
+    stats = authenticated_client.get("/tasks/stats").json()
+    assert stats["total"] == 4
+    assert stats["by_status"] == {"todo": 2, "done": 2}
+
+def test_import_tasks_csv(authenticated_client):
+    """Test import CSV : en-tête, champs entre guillemets, fichier multipart"""
+    body = (
+        "﻿title,description,status\n"
+        "Simple,,\n"
+        "\"Virgule, \"\"guillemets\"\"\",\"Sur\ndeux lignes\",done\n"
+    )
+
+    response = authenticated_client.post(
+        "/tasks/import", content=body.encode(), headers={"Content-Type": "text/csv"}
+    )
+    assert response.json() == {"accepted": 2, "rejected": 0, "errors": []}
+    tasks = authenticated_client.get("/tasks/").json()
+    assert tasks[0]["title"] == "Simple"
+    assert tasks[0]["description"] is None
+    assert tasks[0]["status"] == "todo"
+    assert tasks[1]["title"] == "Virgule, \"guillemets\""
+    assert tasks[1]["description"] == "Sur\ndeux lignes"
+
+    # Aller-retour : un export CSV se réimporte tel quel (colonnes en trop ignorées)
+    exported = authenticated_client.get("/tasks/export", params={"format": "csv"}).content
+    response = authenticated_client.post(
+        "/tasks/import", files={"file": ("tasks.csv", exported, "application/octet-stream")}
+    )
+    assert response.json() == {"accepted": 2, "rejected": 0, "errors": []}
+    assert len(authenticated_client.get("/tasks/").json()) == 4
+
+def test_import_tasks_limits(authenticated_client):
+    """Test import : taille de lot bornée, enregistrement trop long, auth requise"""
+    from importer import IMPORT_MAX_BATCH_SIZE, IMPORT_MAX_RECORD_LENGTH
+
+    response = authenticated_client.post(
+        "/tasks/import", params={"batch_size": IMPORT_MAX_BATCH_SIZE + 1}, content=b""
+    )
+    assert response.status_code == 422
+
+    body = b'{"title": "' + b"x" * IMPORT_MAX_RECORD_LENGTH + b'"}'
+    response = authenticated_client.post("/tasks/import", content=body)
+    assert response.status_code == 413
+
+    response = authenticated_client.post("/tasks/import", content=b"", headers={"Authorization": ""})
+    assert response.status_code == 401
+
+def test_import_tasks_constant_memory(tmp_path):
+    """Test import : le pic mémoire ne dépend pas du nombre de lignes importées"""
+    import asyncio
+    import tracemalloc
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+    from database import Base, User
+    from importer import csv_records, decoded_lines, import_tasks
+
+    async def chunks(rows):
+        yield b"title,description,status\n"
+        for start in range(0, rows, 500):
+            yield "".join(
+                f"Tâche {i},description,todo\n" for i in range(start, min(start + 500, rows))
+            ).encode()
+
+    def import_peak(rows):
+        engine = create_engine(f"sqlite:///{tmp_path / f'import_{rows}.db'}")
+        Base.metadata.create_all(bind=engine)
+        with Session(engine) as db:
+            db.add(User(id=1, email="a@b.c", hashed_password="x"))
+            db.commit()
+            tracemalloc.start()
+            records = csv_records(decoded_lines(chunks(rows)))
+            result = asyncio.run(import_tasks(db, 1, records, batch_size=500))
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        engine.dispose()
+        assert result.accepted == rows
+        return peak
+
+    small, large = import_peak(2000), import_peak(20000)
+    assert large < small * 1.5 + 256 * 1024, (small, large)